@@ -0,0 +1,66 @@
+"""
+Import-time benchmark for oompy.
+
+Every scenario is run in a fresh interpreter; the reported time is the median
+wall time over several runs with the bare interpreter startup subtracted.
+
+The "eager" scenario reproduces what `import oompy` used to do (import sympy and
+matplotlib, and build every unit and constant), so that the gain of the lazy
+import can be read directly from the output.
+
+Usage:
+    python benchmarks/import_time.py [--repeat N] [--json]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from typing import Iterable, Optional
+
+SCENARIOS = {
+    "import": "import oompy",
+    "import + first access": (
+        "import oompy; oompy.Units.kpc; oompy.Constants.c; oompy.Constants.G"
+    ),
+    "eager": (
+        "import oompy, numpy, sympy, matplotlib.units\n"
+        "from oompy.units import GetUnitTable\n"
+        "[getattr(oompy.Units, u) for u in GetUnitTable()]\n"
+        "[getattr(oompy.Constants, c) for c in dir(oompy.Constants)"
+        " if not c.startswith('_') and c not in ('all', 'constants')]"
+    ),
+}
+
+
+def TimeCommand(code: str, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def Run(repeat: int = 10, names: Optional[Iterable[str]] = None) -> dict:
+    scenarios = {name: SCENARIOS[name] for name in (names or SCENARIOS)}
+    startup = TimeCommand("pass", repeat)
+    return {
+        name: 1e3 * (TimeCommand(code, repeat) - startup)
+        for name, code in scenarios.items()
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+    results = Run(args.repeat)
+    if args.json:
+        print(json.dumps({k: round(v, 3) for k, v in results.items()}, indent=2))
+    else:
+        for name, ms in results.items():
+            print(f"{name:>24s}: {ms:8.1f} ms")
@@ -0,0 +1,69 @@
+"""
+Memory and comparison benchmark for `Quantity`.
+
+Measures the memory taken by a list of quantities (via tracemalloc), and the
+time to sort, hash (into a set) and pairwise compare a list of lengths given in
+mixed units.
+
+Usage:
+    python benchmarks/quantities.py [--size N] [--repeat N] [--json]
+"""
+
+import argparse
+import json
+import random
+import time
+import tracemalloc
+
+from oompy import Units as u
+
+LENGTHS = [u.m, u.km, u.ft, u.pc, u.au, u.cm]
+
+
+def MakeLengths(size: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    return [rng.uniform(0, 1e3) * rng.choice(LENGTHS) for _ in range(size)]
+
+
+def BytesPerQuantity(size: int) -> float:
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    lengths = MakeLengths(size)
+    used = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    return (used - size * 8) / len(lengths)  # minus the list itself
+
+
+def BestTime(func, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def Run(size: int = 100000, repeat: int = 5) -> dict:
+    lengths = MakeLengths(size)
+    return {
+        "bytes per quantity": BytesPerQuantity(size),
+        "make [ms]": 1e3 * BestTime(lambda: MakeLengths(size), repeat),
+        "sort [ms]": 1e3 * BestTime(lambda: sorted(lengths), repeat),
+        "hash [ms]": 1e3 * BestTime(lambda: set(lengths), repeat),
+        "compare [ms]": 1e3
+        * BestTime(lambda: [a <= b for a, b in zip(lengths, lengths[1:])], repeat),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+    results = Run(args.size, args.repeat)
+    if args.json:
+        print(json.dumps({k: round(v, 3) for k, v in results.items()}, indent=2))
+    else:
+        for name, value in results.items():
+            print(f"{name:>20s}: {value:10.1f}")
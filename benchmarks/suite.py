@@ -0,0 +1,394 @@
+"""
+Benchmark suite for oompy.
+
+Runs offline against the working tree (or, with --installed, against the
+installed oompy) and covers:
+    * micro: single unit parsing, reduction, arithmetic and conversions,
+    * workload: catalog-scale redshift/distance and spectrum conversions,
+    * import: the import-time scenarios of `import_time.py`.
+
+Every benchmark is timed with `timeit` (auto-ranged number of calls, best of
+several repeats) and reported as seconds per call. Benchmarks relying on APIs
+missing from the benchmarked version (e.g., `QuantityArray`) are skipped, so that
+results of different oompy versions can be compared.
+
+Usage:
+    python benchmarks/suite.py run [-o results.json] [-k FILTER] [--repeat N]
+    python benchmarks/suite.py compare base.json new.json [--threshold 1.2]
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import timeit
+from typing import Callable, Dict, List, Optional, Tuple
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# name -> (group, setup returning the callable to time)
+Benchmarks = {}  # type: Dict[str, Tuple[str, Callable[[], Callable[[], object]]]]
+
+
+def Benchmark(group: str, name: str) -> Callable:
+    def decorator(setup: Callable[[], Callable[[], object]]) -> Callable:
+        Benchmarks[name] = (group, setup)
+        return setup
+
+    return decorator
+
+
+# --- micro-benchmarks ------------------------------------------------------
+
+UNIT = "erg sec^-1 cm^-2 Hz^-1 Msun^-1"
+
+
+@Benchmark("micro", "parse unit")
+def _():
+    from oompy.utils import ParseUnit
+
+    return lambda: ParseUnit(UNIT)
+
+
+@Benchmark("micro", "reduce unit to base")
+def _():
+    from oompy.units import ReduceUnitToBase
+
+    return lambda: ReduceUnitToBase(UNIT)
+
+
+@Benchmark("micro", "reduce unit to base (cold caches)")
+def _():
+    from oompy.units import ReduceUnitToBase
+    from oompy.cache import ClearCaches
+
+    def run():
+        ClearCaches()
+        ReduceUnitToBase(UNIT)
+
+    return run
+
+
+@Benchmark("micro", "base type")
+def _():
+    from oompy.units import GetBaseType
+
+    return lambda: GetBaseType(UNIT)
+
+
+@Benchmark("micro", "quantity from string")
+def _():
+    from oompy import Quantity
+
+    return lambda: Quantity(2.5, UNIT)
+
+
+@Benchmark("micro", "units/constants lookup")
+def _():
+    from oompy.oom import UnitsClass, ConstantsClass
+
+    def run():
+        UnitsClass().kpc
+        ConstantsClass().G
+
+    return run
+
+
+@Benchmark("micro", "multiply")
+def _():
+    from oompy import Units as u
+
+    a, b = 3 * u.km, 2 * u.sec
+    return lambda: a * b
+
+
+@Benchmark("micro", "add (mixed units)")
+def _():
+    from oompy import Units as u
+
+    a, b = 3 * u.km, 2 * u.ft
+    return lambda: a + b
+
+
+@Benchmark("micro", "power")
+def _():
+    from oompy import Units as u
+
+    a = 3 * u.km / u.sec
+    return lambda: a**2
+
+
+@Benchmark("micro", "compare (mixed units)")
+def _():
+    from oompy import Units as u
+
+    a, b = 3 * u.km, 2 * u.ft
+    return lambda: a < b
+
+
+@Benchmark("micro", "convert")
+def _():
+    from oompy import Units as u
+
+    a = 3 * u.pc
+    return lambda: a >> "ly"
+
+
+@Benchmark("micro", "convert to CGS")
+def _():
+    from oompy import Units as u
+
+    a = 3 * u.Msun / u.pc**3
+    return lambda: a >> "CGS"
+
+
+@Benchmark("micro", "convert assuming light")
+def _():
+    from oompy import Units as u, Assumptions as assume
+
+    a = 500 * u.nm
+    return lambda: a >> assume.Light >> "eV"
+
+
+@Benchmark("micro", "convert assuming thermal")
+def _():
+    from oompy import Units as u, Assumptions as assume
+
+    a = 6000 * u.K
+    return lambda: a >> assume.Thermal >> "eV"
+
+
+@Benchmark("micro", "convert assuming redshift")
+def _():
+    from oompy import Quantity, Assumptions as assume
+
+    z = Quantity(2.0, "")
+    return lambda: z >> assume.Redshift >> "Gpc"
+
+
+@Benchmark("micro", "precompiled converter")
+def _():
+    import oompy
+
+    to_ly = oompy.converter("pc", "ly")
+    return lambda: to_ly(3.0)
+
+
+# --- realistic workloads ---------------------------------------------------
+
+CATALOG_SIZE = 1000000
+
+
+@Benchmark("workload", "catalog: redshift -> comoving distance (1e6)")
+def _():
+    import numpy as np
+    from oompy import QuantityArray, Assumptions as assume
+
+    z = QuantityArray(np.random.default_rng(0).uniform(0, 5, CATALOG_SIZE))
+    return lambda: z >> assume.Redshift >> "Gpc"
+
+
+@Benchmark("workload", "catalog: comoving distance -> redshift (1e6)")
+def _():
+    import numpy as np
+    from oompy import QuantityArray, Assumptions as assume
+
+    D = QuantityArray(np.random.default_rng(0).uniform(0, 8, CATALOG_SIZE), "Gpc")
+    return lambda: D >> assume.Redshift >> ""
+
+
+@Benchmark("workload", "catalog: redshifts one by one (1e3)")
+def _():
+    import numpy as np
+    from oompy import Quantity, Assumptions as assume
+
+    zs = [Quantity(z, "") for z in np.random.default_rng(0).uniform(0, 5, 1000)]
+    return lambda: [z >> assume.Redshift >> "Gpc" for z in zs]
+
+
+@Benchmark("workload", "spectrum: wavelength -> photon energy (1e6)")
+def _():
+    import numpy as np
+    from oompy import QuantityArray, Assumptions as assume
+
+    wavelengths = QuantityArray(np.linspace(100.0, 1e4, CATALOG_SIZE), "nm")
+    return lambda: wavelengths >> assume.Light >> "keV"
+
+
+@Benchmark("workload", "spectrum: flux density units (1e6)")
+def _():
+    import numpy as np
+    from oompy import QuantityArray
+
+    flux = QuantityArray(np.linspace(1.0, 1e3, CATALOG_SIZE), "W m^-2 Hz^-1")
+    return lambda: flux >> "erg sec^-1 cm^-2 Hz^-1"
+
+
+@Benchmark("workload", "spectrum: scalar conversions (1e4)")
+def _():
+    from oompy import Units as u, Assumptions as assume
+
+    wavelengths = [(100 + i) * u.nm for i in range(10000)]
+    return lambda: [w >> assume.Light >> "eV" for w in wavelengths]
+
+
+@Benchmark("workload", "parse quantity strings (1e5)")
+def _():
+    import numpy as np
+    from oompy import Quantity
+
+    units = ["km", "pc", "ly", "au", "cm"]
+    rng = np.random.default_rng(0)
+    values = rng.uniform(0, 1e3, 100000)
+    strings = [f"{x:.6g} {units[i % len(units)]}" for i, x in enumerate(values)]
+    return lambda: Quantity.parse_many(strings, "pc")
+
+
+@Benchmark("workload", "sort mixed-unit lengths (1e4)")
+def _():
+    sys.path.insert(0, BENCHMARKS_DIR)
+    from quantities import MakeLengths
+
+    lengths = MakeLengths(10000)
+    return lambda: sorted(lengths)
+
+
+# --- running and comparing -------------------------------------------------
+
+
+def TimeBenchmark(setup: Callable, repeat: int) -> dict:
+    func = setup()
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=repeat, number=number)) / number
+    return {"seconds": best, "number": number}
+
+
+def Metadata() -> dict:
+    import oompy
+
+    meta = {
+        "oompy": getattr(oompy, "__version__", "unknown"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+    }
+    try:
+        import numpy
+
+        meta["numpy"] = numpy.__version__
+    except ImportError:
+        pass
+    return meta
+
+
+def Run(
+    pattern: Optional[str] = None, repeat: int = 5, import_repeat: int = 10
+) -> dict:
+    results = {}  # type: Dict[str, dict]
+    for name, (group, setup) in Benchmarks.items():
+        if pattern and pattern.lower() not in name.lower():
+            continue
+        try:
+            result = TimeBenchmark(setup, repeat)
+        except (ImportError, AttributeError) as e:
+            result = {"skipped": f"{type(e).__name__}: {e}"}
+        results[name] = {"group": group, **result}
+        Report(name, results[name])
+    sys.path.insert(0, BENCHMARKS_DIR)
+    import import_time
+
+    names = [
+        name
+        for name in import_time.SCENARIOS
+        if not pattern or pattern.lower() in f"import: {name}".lower()
+    ]
+    if names:
+        for name, ms in import_time.Run(import_repeat, names).items():
+            results[f"import: {name}"] = {"group": "import", "seconds": 1e-3 * ms}
+            Report(f"import: {name}", results[f"import: {name}"])
+    return {"meta": Metadata(), "results": results}
+
+
+def Format(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:8.2f} {unit}"
+    return f"{seconds / 1e-9:8.1f} ns"
+
+
+def Report(name: str, result: dict) -> None:
+    value = result.get("skipped") or Format(result["seconds"])
+    print(f"{name:>52s}: {value}", flush=True)
+
+
+def Compare(base: dict, new: dict, threshold: float) -> List[str]:
+    """
+    Prints the ratio new/base of every benchmark present in both results and
+    returns the names of those slower than `threshold`.
+    """
+    slower = []
+    for name, result in new["results"].items():
+        old = base["results"].get(name, {})
+        if "seconds" not in result or "seconds" not in old:
+            continue
+        ratio = result["seconds"] / old["seconds"]
+        flag = ""
+        if ratio > threshold:
+            flag = "  SLOWER"
+            slower.append(name)
+        elif ratio < 1 / threshold:
+            flag = "  faster"
+        print(
+            f"{name:>52s}: {Format(old['seconds'])} -> {Format(result['seconds'])}"
+            f"  x{ratio:5.2f}{flag}"
+        )
+    return slower
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="run the benchmarks")
+    run.add_argument("-o", "--output", help="write the results to a JSON file")
+    run.add_argument("-k", "--filter", help="only run benchmarks matching FILTER")
+    run.add_argument("--repeat", type=int, default=5)
+    run.add_argument("--import-repeat", type=int, default=10)
+    run.add_argument(
+        "--installed",
+        action="store_true",
+        help="benchmark the installed oompy instead of the working tree",
+    )
+    compare = commands.add_parser("compare", help="compare two JSON results")
+    compare.add_argument("base")
+    compare.add_argument("new")
+    compare.add_argument(
+        "--threshold",
+        type=float,
+        default=1.2,
+        help="flag benchmarks slower than base by more than this factor",
+    )
+    args = parser.parse_args()
+
+    if args.command == "run":
+        if not args.installed:
+            root = os.path.dirname(BENCHMARKS_DIR)
+            sys.path.insert(0, root)
+            os.environ["PYTHONPATH"] = os.pathsep.join(
+                [root] + os.environ.get("PYTHONPATH", "").split(os.pathsep)
+            ).rstrip(os.pathsep)
+        results = Run(args.filter, args.repeat, args.import_repeat)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(results, f, indent=2)
+    else:
+        with open(args.base) as f:
+            base = json.load(f)
+        with open(args.new) as f:
+            new = json.load(f)
+        slower = Compare(base, new, args.threshold)
+        if slower:
+            print(f"\n{len(slower)} benchmark(s) slower than x{args.threshold}")
+            sys.exit(1)
@@ -1,14 +1,93 @@
 __version__ = "2.0.1"
 
-from .oom import UnitsClass, ConstantsClass, Quantity, Assumptions, MplUnitConverter
+from .oom import UnitsClass, ConstantsClass, Quantity, Assumptions
+from .units import Unit
+from .converter import Converter, converter
+from .profiling import profile
+from .checked import units_checked
+from .registry import (
+    define_unit,
+    define_units,
+    define_alias,
+    define_aliases,
+    define_constant,
+    define_constants,
+)
 
 Units = UnitsClass()
 Constants = ConstantsClass()
 
-__all__ = ["Quantity", "Units", "Constants", "Assumptions", "Utils", "MplUnitConverter"]
+__all__ = [
+    "Quantity",
+    "QuantityArray",
+    "Unit",
+    "Units",
+    "Constants",
+    "Assumptions",
+    "MplUnitConverter",
+    "Converter",
+    "converter",
+    "profile",
+    "units_checked",
+    "define_unit",
+    "define_units",
+    "define_alias",
+    "define_aliases",
+    "define_constant",
+    "define_constants",
+    "map_convert",
+    "map_quantities",
+    "save",
+    "load",
+    "compile_formula",
+    "format_table",
+    "write_table",
+    "UncertainArray",
+    "Cosmology",
+]
+
+
+def __getattr__(name):
+    # matplotlib is only imported when the converter is actually requested
+    if name == "MplUnitConverter":
+        from .mpl import MplUnitConverter
+
+        return MplUnitConverter
+    elif name == "QuantityArray":
+        from .arrays import QuantityArray
+
+        return QuantityArray
+    elif name in ("map_convert", "map_quantities"):
+        from . import parallel
+
+        return getattr(parallel, name)
+    elif name in ("save", "load"):
+        from . import storage
+
+        return getattr(storage, name)
+    elif name in ("format_table", "write_table"):
+        from . import tables
+
+        return getattr(tables, name)
+    elif name == "UncertainArray":
+        from .uncertainty import UncertainArray
+
+        return UncertainArray
+    elif name == "Cosmology":
+        from .cosmology import Cosmology
+
+        return Cosmology
+    elif name == "compile_formula":
+        from .symbolic import compile_formula
+
+        return compile_formula
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def matplotlib_support():
     import matplotlib.units as units
+    from .mpl import MplUnitConverter
+
+    from .arrays import QuantityArray
 
-    units.registry[Quantity] = MplUnitConverter()
+    units.registry[Quantity] = units.registry[QuantityArray] = MplUnitConverter()
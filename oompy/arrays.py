@@ -0,0 +1,403 @@
+from enum import Enum
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+from fractions import Fraction
+from operator import itemgetter
+import re
+import numpy as np
+
+from .converter import Converter, _Parse
+from .oom import Quantity, ConvertAssuming, RelativeTolerance
+from .units import Type, Unit
+from .utils import NUMBER
+
+ValidQuantityArray = Union[
+    "QuantityArray", Quantity, tuple, list, int, float, np.ndarray
+]
+
+
+def _isquantities(obj) -> bool:
+    return (
+        isinstance(obj, (list, tuple))
+        or (isinstance(obj, np.ndarray) and obj.dtype == object)
+    ) and any(isinstance(q, Quantity) for q in np.ravel(np.asarray(obj, dtype=object)))
+
+
+class QuantityArray:
+    """
+    Array of values sharing a single unit.
+
+    The values are stored in one contiguous `numpy.ndarray`, so arithmetic and
+    unit conversions are a single vectorized operation (a conversion is just a
+    multiplication by a precomputed factor).
+
+    Examples
+    --------
+    >>> QuantityArray([1, 2, 3], "km") >> "m"
+    >>> QuantityArray([1 * u.ft, 2 * u.m])  # converted to the unit of the first
+    """
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        from .ufuncs import ArrayUfunc
+
+        return ArrayUfunc(ufunc, method, *inputs, **kwargs)
+
+    def __array_function__(self, func, types, args, kwargs):
+        from .ufuncs import ArrayFunction
+
+        return ArrayFunction(func, types, args, kwargs)
+
+    def __init__(self, *args) -> None:
+        if (len(args) == 1) and isinstance(args[0], QuantityArray):
+            self.value = args[0].value  # type: np.ndarray
+            self.unit = args[0].unit  # type: Unit
+        elif (len(args) == 1) and isinstance(args[0], Quantity):
+            self.value = np.asarray(args[0].value)
+            self.unit = args[0].unit
+        elif (len(args) == 1) and _isquantities(args[0]):
+            quantities = [
+                q if isinstance(q, Quantity) else Quantity(q)
+                for q in np.ravel(np.asarray(args[0], dtype=object))
+            ]
+            unit = quantities[0].unit
+            # one conversion factor per distinct unit
+            factors = {}  # type: Dict[Unit, float]
+            for q in quantities:
+                if q.unit not in factors:
+                    factors[q.unit] = q.unit.factor_to(unit)
+            values = np.fromiter((q.value for q in quantities), float, len(quantities))
+            if len(factors) > 1:
+                values *= np.fromiter(
+                    (factors[q.unit] for q in quantities), float, len(quantities)
+                )
+            self.value = values.reshape(np.shape(args[0]))
+            self.unit = unit
+        elif len(args) == 1:
+            self.value = np.asarray(args[0])
+            self.unit = Unit("")
+        elif (len(args) == 2) and isinstance(args[1], str):
+            value = Quantity(1.0, args[1])
+            self.value = np.asarray(args[0])
+            if value.value != 1:
+                self.value = self.value * value.value
+            self.unit = value.unit
+        else:
+            raise Exception("Invalid arguments for QuantityArray.__init__")
+        if self.value.dtype == object:
+            raise Exception("Invalid values for QuantityArray.__init__")
+        self.assumption = None  # type: Union[Enum, None]
+
+    def _new(self, value: np.ndarray, unit: Unit) -> "QuantityArray":
+        new = QuantityArray.__new__(QuantityArray)
+        new.value, new.unit, new.assumption = value, unit, None
+        return new
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return self.value.shape
+
+    @property
+    def ndim(self) -> int:
+        return self.value.ndim
+
+    @property
+    def size(self) -> int:
+        return self.value.size
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self.value.dtype
+
+    def __len__(self) -> int:
+        return len(self.value)
+
+    def __getitem__(self, key) -> Union[Quantity, "QuantityArray"]:
+        value = self.value[key]
+        if np.ndim(value) == 0:
+            return Quantity(value.item(), self.unit)
+        return self._new(value, self.unit)
+
+    def __iter__(self) -> Iterator[Union[Quantity, "QuantityArray"]]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def __repr__(self) -> str:
+        return f"{self.value} {self.unit}"
+
+    def __str__(self) -> str:
+        return self.__repr__()
+
+    def __invert__(self) -> Dict["Type", "Fraction"]:
+        return self.unit.base_type
+
+    @property
+    def cgs(self) -> "QuantityArray":
+        return self._new(self.value * self.unit.scale, self.unit.cgs)
+
+    def __to(self, unit: str) -> "QuantityArray":
+        if unit == "CGS":
+            return self.cgs
+        target = Unit(unit)
+        if self.unit.dims == target.dims:
+            return self._new(self.value * self.unit.factor_to(target), target)
+        return ConvertAssuming(self, target)
+
+    def __rshift__(
+        self, unit: Union[str, Quantity, "QuantityArray", Enum]
+    ) -> "QuantityArray":
+        if isinstance(unit, (Quantity, QuantityArray)):
+            return self >> unit.unit
+        elif isinstance(unit, str):
+            return self.__to(unit)
+        elif isinstance(unit, Enum):
+            new = self._new(self.value, self.unit)
+            new.assumption = unit
+            return new
+        else:
+            raise Exception("Invalid unit")
+
+    def __coerce(self, other) -> Tuple[np.ndarray, Unit]:
+        if isinstance(other, (Quantity, QuantityArray)):
+            return np.asarray(other.value), other.unit
+        elif isinstance(other, tuple) and (len(other) == 2):
+            other = Quantity(*other)
+            return np.asarray(other.value), other.unit
+        elif _isquantities(other):
+            other = QuantityArray(other)
+            return other.value, other.unit
+        elif isinstance(other, (int, float, list, np.ndarray, np.generic)):
+            return np.asarray(other), Unit("")
+        raise TypeError
+
+    def __add__(self, other: ValidQuantityArray) -> "QuantityArray":
+        try:
+            value, unit = self.__coerce(other)
+        except TypeError:
+            return NotImplemented
+        if unit is not self.unit:
+            value = value * unit.factor_to(self.unit)
+        return self._new(self.value + value, self.unit)
+
+    def __radd__(self, other: ValidQuantityArray) -> "QuantityArray":
+        try:
+            value, unit = self.__coerce(other)
+        except TypeError:
+            return NotImplemented
+        return self._new(value, unit) + self
+
+    def __neg__(self) -> "QuantityArray":
+        return self._new(-self.value, self.unit)
+
+    def __abs__(self) -> "QuantityArray":
+        return self._new(np.abs(self.value), self.unit)
+
+    def __sub__(self, other: ValidQuantityArray) -> "QuantityArray":
+        try:
+            value, unit = self.__coerce(other)
+        except TypeError:
+            return NotImplemented
+        return self + self._new(-value, unit)
+
+    def __rsub__(self, other: ValidQuantityArray) -> "QuantityArray":
+        try:
+            value, unit = self.__coerce(other)
+        except TypeError:
+            return NotImplemented
+        return self._new(value, unit) - self
+
+    def __mul__(self, other: ValidQuantityArray) -> "QuantityArray":
+        try:
+            value, unit = self.__coerce(other)
+        except TypeError:
+            return NotImplemented
+        return self._new(self.value * value, self.unit * unit)
+
+    def __rmul__(self, other: ValidQuantityArray) -> "QuantityArray":
+        return self * other
+
+    def __truediv__(self, other: ValidQuantityArray) -> "QuantityArray":
+        try:
+            value, unit = self.__coerce(other)
+        except TypeError:
+            return NotImplemented
+        return self._new(self.value / value, self.unit / unit)
+
+    def __rtruediv__(self, other: ValidQuantityArray) -> "QuantityArray":
+        try:
+            value, unit = self.__coerce(other)
+        except TypeError:
+            return NotImplemented
+        return self._new(value / self.value, unit / self.unit)
+
+    def __pow__(self, other: Union[int, float, Quantity]) -> "QuantityArray":
+        if isinstance(other, Quantity):
+            assert other.unit == "", "Invalid arguments for QuantityArray.__pow__"
+            other = other.value
+        if not isinstance(other, (int, float)):
+            return NotImplemented
+        return self._new(self.value**other, self.unit**other)
+
+    def __cgs_pair(self, other) -> Tuple[np.ndarray, np.ndarray]:
+        value, unit = self.__coerce(other)
+        if unit.dims != self.unit.dims:
+            raise Exception("Cannot compare different base types")
+        return self.value * self.unit.scale, value * unit.scale
+
+    def __eq__(self, other) -> np.ndarray:  # type: ignore[override]
+        try:
+            a, b = self.__cgs_pair(other)
+        except TypeError:
+            return NotImplemented
+        except Exception:
+            return np.zeros(self.shape, dtype=bool)
+        return np.isclose(a, b, rtol=RelativeTolerance, atol=0)
+
+    def __ne__(self, other) -> np.ndarray:  # type: ignore[override]
+        return ~(self == other)
+
+    def __lt__(self, other) -> np.ndarray:
+        a, b = self.__cgs_pair(other)
+        return (a < b) & ~np.isclose(a, b, rtol=RelativeTolerance, atol=0)
+
+    def __le__(self, other) -> np.ndarray:
+        a, b = self.__cgs_pair(other)
+        return (a < b) | np.isclose(a, b, rtol=RelativeTolerance, atol=0)
+
+    def __gt__(self, other) -> np.ndarray:
+        return ~(self <= other)
+
+    def __ge__(self, other) -> np.ndarray:
+        return ~(self < other)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __reduced(self, value) -> Union[Quantity, "QuantityArray"]:
+        if np.ndim(value) == 0:
+            return Quantity(value.item(), self.unit)
+        return self._new(value, self.unit)
+
+    def sum(self, axis=None) -> Union[Quantity, "QuantityArray"]:
+        return self.__reduced(self.value.sum(axis=axis))
+
+    def mean(self, axis=None) -> Union[Quantity, "QuantityArray"]:
+        return self.__reduced(self.value.mean(axis=axis))
+
+    def min(self, axis=None) -> Union[Quantity, "QuantityArray"]:
+        return self.__reduced(self.value.min(axis=axis))
+
+    def max(self, axis=None) -> Union[Quantity, "QuantityArray"]:
+        return self.__reduced(self.value.max(axis=axis))
+
+
+# leading coefficient and unit of every line of a joined text (the grammar of
+# `StripCoeff`, line by line); a lone number is taken as a dimensionless value
+_LineCoeff = re.compile(
+    rf"^[ \t]*(?:({NUMBER})(?:[ \t]*\*[ \t]*(?=\S)|[ \t]+(?=\S)|[ \t]*$))?"
+    r"(.*?)[ \t]*$",
+    re.M,
+)
+
+
+def ParseQuantities(
+    strings: Sequence[str],
+    target: Optional[Union[str, Unit]] = None,
+    assumption: Optional[Enum] = None,
+    return_indices: bool = False,
+) -> Any:
+    """
+    Parses many quantity strings (e.g., "3.2 km") at once.
+
+    The coefficients are split from the units by a single regular expression
+    over the whole batch and converted to floats in one go; the entries are
+    then grouped by unit string, every distinct unit is parsed only once, and
+    all the values are scaled by one vectorized multiplication.
+
+    Parameters
+    ----------
+    strings : sequence of str
+        quantity strings, as accepted by `Quantity` (plain numbers are
+        dimensionless)
+    target : str, optional
+        unit to convert all the values to
+    assumption : Enum, optional
+        assumption for the units whose dimensions differ from `target`
+    return_indices : bool
+        (without `target`) also return the positions of the entries of each unit
+
+    Returns
+    -------
+    QuantityArray
+        with `target`: all the values in `target`, in the order (and shape) of
+        `strings`
+    dict
+        without `target`: unit -> `QuantityArray` of the entries in that unit
+        (in order); with `return_indices`, also unit -> positions of these
+        entries in `strings`
+
+    Examples
+    --------
+    >>> Quantity.parse_many(["1 km", "2 mi", "3e5 cm"], "m")
+    [1000. 3218.688 3000.] m
+    >>> Quantity.parse_many(["1 km", "2 sec", "3 km"])
+    {Unit('km'): [1. 3.] km, Unit('sec'): [2.] sec}
+    >>> Quantity.parse_many(["5 GHz", "1 keV"], "nm", assume.Light)
+    """
+    shape = np.shape(strings) if isinstance(strings, np.ndarray) else None
+    lines = np.ravel(strings).tolist() if shape is not None else list(strings)
+    dst = None if target is None else Unit(target)
+    if not lines:
+        if dst is not None:
+            return QuantityArray(np.zeros(shape or 0), dst)
+        return ({}, {}) if return_indices else {}
+    parts = _LineCoeff.findall("\n".join(lines))
+    if len(parts) != len(lines):
+        raise Exception("Quantity strings cannot contain line breaks")
+    # (`map` rather than `zip(*parts)`, which is much slower on long lists)
+    coeffs = list(map(itemgetter(0), parts))
+    names = list(map(itemgetter(1), parts))
+    if "" in coeffs:
+        coeffs = [coeff or "1" for coeff in coeffs]
+    values = np.array(coeffs, dtype=float)
+
+    distinct = {name: i for i, name in enumerate(dict.fromkeys(names))}
+    codes = np.fromiter(map(distinct.__getitem__, names), np.intp, len(names))
+    # (unit strings such as "1e3 m" and "m" share a group)
+    units = {}  # type: Dict[Unit, int]
+    factors = np.empty(len(distinct))
+    groups = np.empty(len(distinct), np.intp)
+    for i, name in enumerate(distinct):
+        factors[i], unit = _Parse(name)
+        groups[i] = units.setdefault(unit, len(units))
+
+    if dst is None:
+        if np.any(factors != 1):
+            values *= factors[codes]
+        codes = groups[codes]
+        if len(units) == 1:
+            indices = [np.arange(len(values))]  # type: List[np.ndarray]
+        else:
+            order = np.argsort(codes, kind="stable")
+            indices = np.split(order, np.cumsum(np.bincount(codes))[:-1])
+        result = {
+            unit: QuantityArray(values if len(units) == 1 else values[index], unit)
+            for unit, index in zip(units, indices)
+        }
+        if return_indices:
+            return result, dict(zip(units, indices))
+        return result
+
+    converters = []  # type: List[Tuple[int, Converter]]
+    scales = np.ones(len(units))
+    for unit, group in units.items():
+        if unit.dims == dst.dims:
+            scales[group] = unit.factor_to(dst)
+        else:
+            converters.append((group, Converter(unit, dst, assumption)))
+    factors *= scales[groups]
+    if np.any(factors != 1):
+        values *= factors[codes]
+    if converters:
+        codes = groups[codes]
+        for group, convert in converters:
+            mask = codes == group
+            values[mask] = convert(values[mask])
+    return QuantityArray(values if shape is None else values.reshape(shape), dst)
@@ -0,0 +1,248 @@
+import threading
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, Dict, Hashable, List, Set
+
+
+class LRUCache:
+    """
+    Bounded least-recently-used cache with hit/miss/eviction counters.
+
+    All the operations hold a (per-cache) lock, so caches can be shared by
+    threads (also without the GIL).
+
+    Parameters
+    ----------
+    name : str
+        name of the cache (as it appears in `CacheInfo`)
+    maxsize : int
+        maximum number of stored entries
+    resizable : bool
+        whether `SetCacheSize` applies to the cache (False for caches of large
+        entries, which are sized on their own)
+    """
+
+    def __init__(self, name: str, maxsize: int = 1024, resizable: bool = True) -> None:
+        self.name = name
+        self.maxsize = maxsize
+        self.resizable = resizable
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()  # type: OrderedDict[Hashable, Any]
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            self._evict()
+
+    def resize(self, maxsize: int) -> None:
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def discard(self, predicate: Callable[[Hashable], bool]) -> int:
+        """
+        Removes the entries whose key satisfies `predicate` (returns their number).
+        """
+        with self._lock:
+            keys = list(self._data)
+        # (the predicate may use other caches: it is called without the lock)
+        stale = [key for key in keys if predicate(key)]
+        with self._lock:
+            for key in stale:
+                self._data.pop(key, None)
+        return len(stale)
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.hits = self.misses = self.evictions = 0
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+            }
+
+    def _evict(self) -> None:
+        # (called with the lock held)
+        while len(self._data) > max(self.maxsize, 0):
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+
+Caches = {}  # type: Dict[str, LRUCache]
+
+_MISSING = object()
+
+
+def NormalizeUnit(unit: str) -> str:
+    return " ".join(unit.split())
+
+
+def Memoize(
+    name: str,
+    key: Callable[..., Hashable],
+    copy=None,
+    maxsize: int = 1024,
+    resizable: bool = True,
+) -> Callable:
+    """
+    Memoizes a function in a named `LRUCache` registered in `Caches`.
+
+    The function itself is called without holding the lock of the cache
+    (concurrent misses may compute the same value twice).
+
+    Parameters
+    ----------
+    name : str
+        name of the cache
+    key : callable
+        maps the arguments of the function to the cache key
+    copy : callable, optional
+        applied to the cached value before returning it (for mutable results)
+    maxsize : int
+        maximum number of stored entries
+    resizable : bool
+        whether `SetCacheSize` applies to the cache
+    """
+    cache = Caches.setdefault(name, LRUCache(name, maxsize, resizable))
+
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args):
+            k = key(*args)
+            value = cache.get(k, _MISSING)
+            if value is _MISSING:
+                value = func(*args)
+                cache.put(k, value)
+            return value if copy is None else copy(value)
+
+        wrapper.cache = cache  # type: ignore[attr-defined]
+        return wrapper
+
+    return decorator
+
+
+def CacheInfo() -> Dict[str, Dict[str, int]]:
+    """
+    Hit/miss/eviction counters and sizes of all the unit caches.
+    """
+    return {name: cache.stats for name, cache in Caches.items()}
+
+
+def SetCacheSize(maxsize: int) -> None:
+    """
+    Changes the maximum number of entries of all the unit caches (the caches
+    created with `resizable=False` keep their own size).
+    """
+    for cache in Caches.values():
+        if cache.resizable:
+            cache.resize(maxsize)
+
+
+def ClearCaches() -> None:
+    """
+    Empties all the unit caches (counters are kept).
+    """
+    for cache in Caches.values():
+        cache.clear()
+
+
+OnRegistryChange = [ClearCaches]  # type: List[Callable[[], None]]
+
+# serializes the changes of the registry (and the builds of the unit table);
+# lookups do not take it
+RegistryLock = threading.RLock()
+
+
+def RegistryChanged() -> None:
+    """
+    Notifies all the dependent caches that the unit registry has changed.
+    """
+    with RegistryLock:
+        for callback in OnRegistryChange:
+            callback()
+
+
+OnUnitsChange = []  # type: List[Callable[[Set[str]], None]]
+
+
+def UnitsChanged(tokens: Set[str]) -> None:
+    """
+    Notifies the dependent caches that the definitions of the unit tokens
+    `tokens` have changed (only the entries depending on them are dropped).
+    """
+    with RegistryLock:
+        for callback in OnUnitsChange:
+            callback(tokens)
+
+
+class RegistryDict(dict):
+    """
+    Dictionary which calls `RegistryChanged` whenever it is modified.
+    """
+
+    def __setitem__(self, key, value) -> None:
+        super().__setitem__(key, value)
+        RegistryChanged()
+
+    def __delitem__(self, key) -> None:
+        super().__delitem__(key)
+        RegistryChanged()
+
+    def update(self, *args, **kwargs) -> None:
+        super().update(*args, **kwargs)
+        RegistryChanged()
+
+    def __ior__(self, other):  # type: ignore[misc]
+        self.update(other)
+        return self
+
+    def pop(self, *args):
+        value = super().pop(*args)
+        RegistryChanged()
+        return value
+
+    def popitem(self):
+        item = super().popitem()
+        RegistryChanged()
+        return item
+
+    def setdefault(self, key, default=None):
+        if key in self:
+            return self[key]
+        self[key] = default
+        return default
+
+    def clear(self) -> None:
+        super().clear()
+        RegistryChanged()
@@ -0,0 +1,139 @@
+"""
+Decorator for functions of quantities written in terms of plain numbers.
+
+The decorated function receives raw values (floats or arrays) in the declared
+units of its arguments, and returns raw values in the declared unit of its
+result. The dimensions of the arguments are checked, and their conversion
+factors computed, only the first time a given combination of input units is
+seen: the factors of every such signature are cached, so that later calls only
+cost one multiplication per argument.
+
+Examples
+--------
+>>> @units_checked(B="G", n="cm^-3", returns="erg cm^-3")
+... def magnetization(B, n):
+...     return B**2 / (4 * np.pi * n * 1.67e-24 * 2.998e10**2)
+>>> magnetization(1 * u.mG, 1 * u.m**-3)  # any compatible units
+"""
+
+import inspect
+from functools import wraps
+from typing import Any, Callable, List, Optional, Sequence, Tuple, Union
+
+from .cache import Caches, LRUCache
+from .converter import _Format, _Parse
+from .oom import Quantity, _isndarray
+from .units import Unit
+
+# (declared units, units of the arguments) -> conversion factors
+_Signatures = Caches.setdefault("signatures", LRUCache("signatures"))
+
+_MISSING = object()
+
+
+def _Factors(
+    names: Sequence[str], declared: Sequence[Tuple[float, Unit]], units: Sequence[Any]
+) -> Tuple[Optional[float], ...]:
+    factors = []  # type: List[Optional[float]]
+    for name, (coeff, unit), src in zip(names, declared, units):
+        if src is None:
+            # plain values are taken to be in the declared unit
+            factors.append(None)
+        elif src.dims != unit.dims:
+            raise Exception(
+                f"Argument {name} in {src.base_type} cannot be converted to "
+                f"{unit.base_type} ({_Format(coeff, unit)})"
+            )
+        else:
+            factors.append(src.factor_to(unit) / coeff)
+    return tuple(factors)
+
+
+def _Wrap(value: Any, coeff: float, unit: Unit) -> Any:
+    if isinstance(value, Quantity) or (
+        hasattr(value, "unit") and not _isndarray(value)
+    ):
+        return value >> unit
+    elif _isndarray(value):
+        from .arrays import QuantityArray
+
+        return QuantityArray(value, _Format(coeff, unit))
+    return Quantity._new(value if coeff == 1 else value * coeff, unit)
+
+
+def units_checked(
+    returns: Optional[Union[str, Sequence[str]]] = None, **units: str
+) -> Callable:
+    """
+    Declares the units of the arguments (and of the result) of a function
+    written in terms of plain numbers.
+
+    `Quantity`/`QuantityArray` arguments are converted to plain values in the
+    declared units (raising if their dimension differs), while plain numbers
+    and arrays are passed as they are (i.e., taken to be in the declared
+    units). The result is wrapped into a `Quantity` (or a `QuantityArray` for
+    arrays) in the unit `returns`.
+
+    Parameters
+    ----------
+    returns : str or tuple of str, optional
+        unit(s) of the result (a tuple for functions returning several values);
+        if None, the result is returned as it is
+    **units : str
+        unit of each checked argument
+
+    Examples
+    --------
+    >>> @oompy.units_checked(T="K", returns="eV")
+    ... def thermal_energy(T):
+    ...     return 8.617333262e-5 * T
+    >>> thermal_energy(1 * u.kK)
+    """
+    declared = [_Parse(spec) for spec in units.values()]
+    names = list(units)
+    if returns is None:
+        results = None  # type: Optional[List[Tuple[float, Unit]]]
+    elif isinstance(returns, str):
+        results = [_Parse(returns)]
+    else:
+        results = [_Parse(spec) for spec in returns]
+    single = isinstance(returns, str)
+    spec = tuple(declared)
+
+    def decorator(func: Callable) -> Callable:
+        params = list(inspect.signature(func).parameters)
+        for name in names:
+            if name not in params:
+                raise TypeError(f"{func.__qualname__}() has no argument {name!r}")
+        positions = [params.index(name) for name in names]
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            values = [
+                args[i] if i < len(args) else kwargs.get(name, _MISSING)
+                for name, i in zip(names, positions)
+            ]
+            key = (spec, tuple(getattr(v, "unit", None) for v in values))
+            factors = _Signatures.get(key)
+            if factors is None:
+                factors = _Factors(names, declared, key[1])
+                _Signatures.put(key, factors)
+            args = list(args)
+            for name, i, value, factor in zip(names, positions, values, factors):
+                if factor is None:
+                    continue
+                raw = value.value if factor == 1 else value.value * factor
+                if i < len(args):
+                    args[i] = raw
+                else:
+                    kwargs[name] = raw
+            result = func(*args, **kwargs)
+            if results is None:
+                return result
+            elif single:
+                return _Wrap(result, *results[0])
+            return tuple(_Wrap(r, *out) for r, out in zip(result, results))
+
+        return wrapper
+
+    return decorator
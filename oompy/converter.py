@@ -0,0 +1,118 @@
+from enum import Enum
+from typing import Any, Callable, Optional, Tuple, Union
+
+from .oom import Quantity, _isndarray
+from .units import Unit
+
+
+def _Parse(unit: Union[str, Unit, Quantity]) -> Tuple[float, Unit]:
+    # splits e.g. "1e3 m" into the coefficient and the unit
+    if isinstance(unit, Quantity):
+        return 1.0, unit.unit
+    if isinstance(unit, Unit):
+        return 1.0, unit
+    q = Quantity(1.0, unit)
+    return q.value, q.unit
+
+
+def _Format(coeff: float, unit: Unit) -> str:
+    # inverse of `_Parse`
+    return str(unit) if coeff == 1 else f"{coeff!r} {unit}"
+
+
+class Converter:
+    """
+    Precompiled conversion between two units.
+
+    The dimensions are validated once on construction; calling the converter
+    then only applies a precomputed factor (or, with an assumption, a compiled
+    equivalency from `oompy.equivalencies`).
+
+    Plain numbers and arrays are taken to be in `src` and are returned as plain
+    values in `dst`; a `Quantity`/`QuantityArray` (in any unit compatible with
+    `src`) is returned as a `Quantity`/`QuantityArray` in `dst`.
+
+    Parameters
+    ----------
+    src : str
+        unit of the input values
+    dst : str
+        unit of the output values
+    assumption : Enum, optional
+        assumption for conversions between incompatible units
+
+    Examples
+    --------
+    >>> to_keV = Converter("K", "keV", Assumptions.Thermal)
+    >>> to_keV(np.array([1e6, 1e7]))
+    """
+
+    def __init__(
+        self,
+        src: Union[str, Unit, Quantity],
+        dst: Union[str, Unit, Quantity],
+        assumption: Optional[Enum] = None,
+    ) -> None:
+        self.src_coeff, self.src = _Parse(src)
+        self.dst_coeff, self.dst = _Parse(dst)
+        src_coeff, dst_coeff = self.src_coeff, self.dst_coeff
+        self.assumption = assumption
+        self.factor = None  # type: Optional[float]
+        if self.src.dims == self.dst.dims:
+            self.factor = src_coeff * self.src.factor_to(self.dst) / dst_coeff
+            factor = self.factor
+            self._func = lambda v: v * factor  # type: Callable[[Any], Any]
+        elif assumption is None:
+            raise Exception(
+                f"Cannot convert from {self.src.base_type} to {self.dst.base_type} (no assumption)"
+            )
+        else:
+            from .equivalencies import CompileEquivalency
+
+            func = CompileEquivalency(assumption, self.src, self.dst)
+            if src_coeff == 1 and dst_coeff == 1:
+                self._func = func
+            else:
+                self._func = lambda v: func(v * src_coeff) / dst_coeff
+
+    def __reduce__(self):
+        # the compiled functions are rebuilt on unpickling
+        src, dst = _Format(self.src_coeff, self.src), _Format(self.dst_coeff, self.dst)
+        return (Converter, (src, dst, self.assumption))
+
+    def __repr__(self) -> str:
+        assumption = "" if self.assumption is None else f", {self.assumption}"
+        return f"Converter({self.src!s} -> {self.dst!s}{assumption})"
+
+    def __call__(self, x: Any) -> Any:
+        if isinstance(x, Quantity):
+            return Quantity(self._apply(x), self.dst)
+        elif hasattr(x, "unit") and not _isndarray(x):
+            # QuantityArray
+            return x._new(self._apply(x), self.dst)
+        return self._func(x)
+
+    def _apply(self, q: Any) -> Any:
+        # values of a quantity (in any unit compatible with `src`) -> values in `dst`
+        if q.unit is self.src and self.src_coeff == 1:
+            value = q.value
+        else:
+            value = q.value * q.unit.factor_to(self.src) / self.src_coeff
+        value = self._func(value)
+        return value if self.dst_coeff == 1 else value * self.dst_coeff
+
+
+def converter(
+    src: Union[str, Unit, Quantity],
+    dst: Union[str, Unit, Quantity],
+    assumption: Optional[Enum] = None,
+) -> Converter:
+    """
+    Precompiles the conversion from `src` to `dst` (see `Converter`).
+
+    Examples
+    --------
+    >>> to_cm = oompy.converter("au", "cm")
+    >>> to_cm(1.5), to_cm(np.arange(10)), to_cm(2 * u.pc)
+    """
+    return Converter(src, dst, assumption)
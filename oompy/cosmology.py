@@ -0,0 +1,559 @@
+"""
+Tabulated cosmological distances and times.
+
+The comoving distance (in units of the Hubble distance c/H_0) and the lookback
+time (in units of the Hubble time 1/H_0) are integrated once per set of density
+parameters on a shared grid uniform in ln(1+z), and cached (the least recently
+used tables are evicted). Evaluations then interpolate the tables with cubic
+Hermite polynomials (the derivatives of the integrals are known exactly), and
+the inverse (distance to redshift) is found by monotone interpolation followed
+by a few vectorized Newton iterations. Beyond the tables (`MaxRedshift`), the
+integrals are continued by direct quadrature from the last grid node.
+
+`Cosmology` answers the usual distances and times for a set of parameters, and
+can be registered as the cosmology of `Assumptions.Redshift` (or of any other
+assumption).
+
+Examples
+--------
+>>> planck = Cosmology(67.5, 0.315, 0.685)
+>>> planck.luminosity_distance([0.5, 1, 2])
+>>> planck.age(0) >> "Gyr"
+"""
+
+import math
+from enum import Enum
+from typing import Any, Optional, Union
+
+import numpy as np
+
+from .arrays import QuantityArray
+from .cache import Memoize
+from .constants import ConstantValues
+from .oom import Assumptions, Quantity
+from .units import Unit
+
+# maximum redshift covered by the tables (the integrals are continued by direct
+# quadrature beyond)
+MaxRedshift = 1e4
+
+# width in ln(1+z) of the quadrature cells beyond the tables
+BeyondCell = 0.125
+
+# quadrature cells of the age integral beyond the tables (uniform in
+# (1+z)^(-1/2), from 0)
+_TailEdges = np.linspace(0.0, 1.0, 17)
+
+# requested relative accuracy of the tabulated distances
+RelativeAccuracy = 1e-12
+
+_GaussNodes, _GaussWeights = np.polynomial.legendre.leggauss(8)
+
+
+def _Hermite(
+    t: np.ndarray, h: float, y0: Any, dy0: Any, y1: Any, dy1: Any
+) -> np.ndarray:
+    # cubic Hermite interpolation within a cell of width h (t in [0, 1])
+    t2, t3 = t * t, t * t * t
+    return (
+        (2 * t3 - 3 * t2 + 1) * y0
+        + (t3 - 2 * t2 + t) * h * dy0
+        + (-2 * t3 + 3 * t2) * y1
+        + (t3 - t2) * h * dy1
+    )
+
+
+class ComovingDistanceTable:
+    """
+    Cumulative comoving distance integral, D(z) = int_0^z dz' / E(z'), and
+    lookback time integral, T(z) = int_0^z dz' / ((1 + z') E(z')), with
+    E(z) = sqrt(omega_Matter (1+z)^3 + omega_k (1+z)^2 + omega_Lambda) and
+    omega_k = 1 - omega_Matter - omega_Lambda.
+
+    Parameters
+    ----------
+    omega_Matter : float
+        matter density parameter
+    omega_Lambda : float
+        dark energy density parameter
+    num : int
+        number of cells of the grid in ln(1+z)
+    z_max : float
+        maximum tabulated redshift (the integrals are evaluated directly beyond)
+    """
+
+    def __init__(
+        self,
+        omega_Matter: float,
+        omega_Lambda: float,
+        num: int = 4096,
+        z_max: float = MaxRedshift,
+    ) -> None:
+        self.omega_Matter = omega_Matter
+        self.omega_Lambda = omega_Lambda
+        self.omega_k = 1.0 - omega_Matter - omega_Lambda
+        if abs(self.omega_k) < 1e-12:
+            self.omega_k = 0.0
+        self.z_max = z_max
+        self.x = np.linspace(0.0, math.log1p(z_max), num + 1)
+        self.h = self.x[1] - self.x[0]
+        cells = self.Integral(self.x[:-1], self.x[1:])
+        self.D = np.concatenate([[0.0], np.cumsum(cells)])
+        self.dD = self.Integrand(self.x)
+        cells = self.Integral(self.x[:-1], self.x[1:], self.InverseE)
+        self.T = np.concatenate([[0.0], np.cumsum(cells)])
+        self.dT = self.InverseE(self.x)
+        # int_{x_max}^inf dx / E (finite if the matter or the curvature dominate
+        # at high redshift), and the age int_x^inf dx / E on the grid (summed
+        # from the end of the table, without the cancellation of T_inf - T(x))
+        finite = omega_Matter > 0 or self.omega_k > 0
+        self.tail = float(self._AgeTail(self.x[-1])) if finite else math.inf
+        self.A = self.tail + np.concatenate([np.cumsum(cells[::-1])[::-1], [0.0]])
+
+    def InverseE(self, x: np.ndarray) -> np.ndarray:
+        # 1 / E = dT/dx with x = ln(1+z)
+        a = np.exp(x)
+        # (1/E underflows to 0 at huge redshifts)
+        with np.errstate(over="ignore"):
+            E2 = self.omega_Matter * a**3 + self.omega_Lambda
+            if self.omega_k:
+                E2 = E2 + self.omega_k * a**2
+        return 1 / np.sqrt(E2)
+
+    def _TailIntegrand(self, s: np.ndarray) -> np.ndarray:
+        # dx / E with s = exp(-x/2) = (1+z)^(-1/2), i.e., 2 s^2 ds / (s^3 E)
+        s2 = s * s
+        return (
+            2
+            * s2
+            / np.sqrt(
+                self.omega_Matter + self.omega_k * s2 + self.omega_Lambda * s2**3
+            )
+        )
+
+    def _AgeTail(self, x: Any) -> np.ndarray:
+        # int_x^inf dx' / E (the integrand is smooth in s, on [0, exp(-x/2)])
+        edges = np.multiply.outer(np.exp(-np.asarray(x) / 2), _TailEdges)
+        return np.sum(
+            self.Integral(edges[..., :-1], edges[..., 1:], self._TailIntegrand),
+            axis=-1,
+        )
+
+    def Integrand(self, x: np.ndarray) -> np.ndarray:
+        # dD/dx with x = ln(1+z)
+        return np.exp(x) * self.InverseE(x)
+
+    def Integral(self, a: np.ndarray, b: np.ndarray, integrand=None) -> np.ndarray:
+        """
+        Integral of dD/dx (or of `integrand`) between a and b (Gauss-Legendre,
+        elementwise).
+        """
+        integrand = integrand or self.Integrand
+        half = 0.5 * (b - a)
+        x = 0.5 * (a + b) + np.multiply.outer(_GaussNodes, half)
+        return half * np.tensordot(_GaussWeights, integrand(x), axes=1)
+
+    def _Cells(self, x: np.ndarray) -> np.ndarray:
+        if np.any(x < 0):
+            raise Exception("Negative redshift for the conversion")
+        return np.clip(np.searchsorted(self.x, x, side="right") - 1, 0, len(self.x) - 2)
+
+    def _Beyond(self, x: np.ndarray, integrand) -> np.ndarray:
+        # integral from the end of the table to x > x_max, over cells of
+        # `BeyondCell` (the integrands are smooth, ~ (1+z)^(-1/2) or (1+z)^(-3/2))
+        n = math.ceil((np.max(x) - self.x[-1]) / BeyondCell)
+        nodes = self.x[-1] + BeyondCell * np.arange(n + 1)
+        i = np.minimum(((x - self.x[-1]) // BeyondCell).astype(int), n - 1)
+        cells = self.Integral(nodes[:-1], nodes[1:], integrand)
+        cumulative = np.concatenate([[0.0], np.cumsum(cells)])
+        return cumulative[i] + self.Integral(nodes[i], x, integrand)
+
+    def _Interpolate(
+        self, x: np.ndarray, y: np.ndarray, dy: np.ndarray, integrand, exact: bool
+    ) -> np.ndarray:
+        beyond = np.atleast_1d(x > self.x[-1])
+        if np.any(beyond):
+            result = np.empty(np.shape(beyond))
+            xa = np.atleast_1d(x)
+            result[beyond] = y[-1] + self._Beyond(xa[beyond], integrand)
+            inside = ~beyond
+            result[inside] = self._Interpolate(xa[inside], y, dy, integrand, exact)
+            return result.reshape(np.shape(x))
+        i = self._Cells(x)
+        if exact:
+            return y[i] + self.Integral(self.x[i], x, integrand)
+        t = (x - self.x[i]) / self.h
+        result = _Hermite(t, self.h, y[i], dy[i], y[i + 1], dy[i + 1])
+        # the relative error of the interpolation is largest in the first cell
+        first = np.atleast_1d(i == 0)
+        if np.any(first):
+            result = np.atleast_1d(result).copy()
+            xf = np.atleast_1d(x)[first]
+            result[first] = self.Integral(np.zeros_like(xf), xf, integrand)
+            result = result.reshape(np.shape(x))
+        return result
+
+    def DistanceFromLog(self, x: np.ndarray, exact: bool = False) -> np.ndarray:
+        return self._Interpolate(x, self.D, self.dD, self.Integrand, exact)
+
+    def Distance(self, z, exact: bool = False) -> np.ndarray:
+        """
+        Comoving distance (in units of c/H_0) for the redshift(s) `z`.
+
+        Parameters
+        ----------
+        z : float or array_like
+            redshift(s)
+        exact : bool
+            integrate from the nearest grid node instead of interpolating
+        """
+        return self.DistanceFromLog(np.log1p(np.asarray(z, dtype=float)), exact)
+
+    def TransverseDistance(self, z, exact: bool = False) -> np.ndarray:
+        """
+        Transverse comoving distance (in units of c/H_0), equal to the comoving
+        distance in a flat universe.
+        """
+        D = self.Distance(z, exact)
+        if self.omega_k > 0:
+            k = math.sqrt(self.omega_k)
+            return np.sinh(k * D) / k
+        elif self.omega_k < 0:
+            k = math.sqrt(-self.omega_k)
+            return np.sin(k * D) / k
+        return D
+
+    def LookbackTime(self, z, exact: bool = False) -> np.ndarray:
+        """
+        Lookback time (in units of 1/H_0) for the redshift(s) `z`.
+        """
+        x = np.log1p(np.asarray(z, dtype=float))
+        return self._Interpolate(x, self.T, self.dT, self.InverseE, exact)
+
+    def Age(self, z, exact: bool = False) -> np.ndarray:
+        """
+        Age of the universe (in units of 1/H_0) at the redshift(s) `z`.
+        """
+        x = np.log1p(np.asarray(z, dtype=float))
+        i = self._Cells(np.minimum(x, self.x[-1]))
+        if not math.isfinite(self.tail):
+            return np.full(np.shape(x), math.inf)
+        if exact:
+            age = self.A[i + 1] + self.Integral(x, self.x[i + 1], self.InverseE)
+        else:
+            t = (x - self.x[i]) / self.h
+            age = _Hermite(
+                t, self.h, self.A[i], -self.dT[i], self.A[i + 1], -self.dT[i + 1]
+            )
+        beyond = x > self.x[-1]
+        if np.any(beyond):
+            age = np.where(beyond, self._AgeTail(np.maximum(x, self.x[-1])), age)
+        return age
+
+    def Redshift(self, D, refine: bool = True, iterations: int = 1) -> np.ndarray:
+        """
+        Redshift(s) for the comoving distance(s) `D` (in units of c/H_0).
+
+        Parameters
+        ----------
+        D : float or array_like
+            comoving distance(s) in units of c/H_0
+        refine : bool
+            polish the interpolated result with Newton iterations on the exact
+            integral
+        iterations : int
+            number of Newton iterations
+        """
+        D = np.asarray(D, dtype=float)
+        if np.any(D < 0):
+            raise Exception("Negative comoving distance")
+        beyond = np.atleast_1d(D > self.D[-1])
+        if np.any(beyond):
+            result = np.empty(np.shape(beyond))
+            Da = np.atleast_1d(D)
+            result[beyond] = self._RedshiftBeyond(Da[beyond])
+            inside = ~beyond
+            result[inside] = self.Redshift(Da[inside], refine, iterations)
+            return result.reshape(np.shape(D))
+        i = np.clip(np.searchsorted(self.D, D, side="right") - 1, 0, len(self.D) - 2)
+        # monotone (Hermite) interpolation of the inverse function x(D)
+        dD = self.D[i + 1] - self.D[i]
+        t = (D - self.D[i]) / dD
+        x = _Hermite(
+            t, 1.0, self.x[i], dD / self.dD[i], self.x[i + 1], dD / self.dD[i + 1]
+        )
+        if refine:
+            for _ in range(iterations):
+                x = np.clip(x, 0.0, self.x[-1])
+                x = x - (self.DistanceFromLog(x, exact=True) - D) / self.Integrand(x)
+            x = np.clip(x, 0.0, self.x[-1])
+        return np.expm1(x)
+
+    def _RedshiftBeyond(self, D: np.ndarray, iterations: int = 12) -> np.ndarray:
+        # beyond the table, D(x) ~ D_inf - 2 dD(x) is nearly linear in
+        # u = exp(-x/2): Newton iterations on u
+        if self.omega_Matter <= 0:
+            raise Exception(
+                f"Distance out of the tabulated range [0, {self.D[-1]}] c/H_0"
+            )
+        u_max = math.exp(-self.x[-1] / 2)
+        u = u_max * np.maximum(1 - (D - self.D[-1]) / (2 * self.dD[-1]), 1e-3)
+        for _ in range(iterations):
+            x = -2 * np.log(u)
+            error = self.DistanceFromLog(x, exact=True) - D
+            u_next = u + error * u / (2 * self.Integrand(x))
+            # (halved instead of stepping to or past the horizon, u = 0)
+            u = np.where(u_next > 0, u_next, u / 2)
+        if np.any(np.abs(error) > 4 * RelativeAccuracy * D):
+            raise Exception("Distance at or beyond the particle horizon")
+        return np.expm1(-2 * np.log(u))
+
+
+def TableSize(rtol: float) -> int:
+    """
+    Number of grid cells needed to interpolate the distances to `rtol`.
+    """
+    # the Hermite interpolation error scales as h^4 (~2e-10 for 4096 cells)
+    return int(min(max(64, math.ceil(16 * rtol ** (-0.25))), 2**20))
+
+
+@Memoize(
+    "comoving_tables",
+    key=lambda om, ol, rtol, z_max: (om, ol, rtol, z_max),
+    maxsize=16,
+    resizable=False,
+)
+def GetComovingDistanceTable(
+    omega_Matter: float,
+    omega_Lambda: float,
+    rtol: float = RelativeAccuracy,
+    z_max: float = MaxRedshift,
+) -> ComovingDistanceTable:
+    """
+    Comoving distance table for the given density parameters (cached).
+    """
+    return ComovingDistanceTable(omega_Matter, omega_Lambda, TableSize(rtol), z_max)
+
+
+def ComovingDistance(
+    z, omega_Matter: float, omega_Lambda: float, exact: bool = False
+) -> np.ndarray:
+    """
+    Comoving distance (in units of c/H_0) for the redshift(s) `z`.
+    """
+    table = GetComovingDistanceTable(
+        omega_Matter, omega_Lambda, RelativeAccuracy, MaxRedshift
+    )
+    return table.Distance(z, exact)
+
+
+def RedshiftFromComovingDistance(
+    D, omega_Matter: float, omega_Lambda: float, refine: bool = True
+) -> np.ndarray:
+    """
+    Redshift(s) for the comoving distance(s) `D` (in units of c/H_0).
+    """
+    table = GetComovingDistanceTable(
+        omega_Matter, omega_Lambda, RelativeAccuracy, MaxRedshift
+    )
+    return table.Redshift(D, refine)
+
+
+def _Redshifts(z: Any) -> np.ndarray:
+    if isinstance(z, (Quantity, QuantityArray)):
+        z = z >> ""
+        return np.asarray(z.value, dtype=float)
+    return np.asarray(z, dtype=float)
+
+
+def _Result(values: np.ndarray, base: str, unit: str, scalar: bool) -> Any:
+    # values in the CGS unit `base` -> Quantity/QuantityArray in `unit`
+    if unit != base:
+        values = values * Unit(base).factor_to(Unit(unit))
+    if scalar:
+        return Quantity(values.item(), unit)
+    return QuantityArray(values, str(unit))
+
+
+class Cosmology:
+    """
+    Distances and times of a (Lambda-CDM) cosmology.
+
+    The integrals are tabulated once per set of density parameters and shared
+    by all the `Cosmology` objects with those parameters (see
+    `GetComovingDistanceTable`); every method is a vectorized interpolation of
+    the tables, returning a `Quantity` for a scalar redshift and a
+    `QuantityArray` otherwise.
+
+    Parameters
+    ----------
+    H_0 : float or Quantity, optional
+        Hubble constant (in km sec^-1 Mpc^-1 if a number)
+    omega_Matter : float, optional
+        matter density parameter
+    omega_Lambda : float, optional
+        dark energy density parameter (the curvature is 1 - omega_Matter -
+        omega_Lambda)
+    rtol : float
+        relative accuracy of the tables
+    z_max : float
+        maximum tabulated redshift (higher redshifts are integrated directly)
+
+    The default parameters are those of the constants `H_0`, `omega_Matter`
+    and `omega_Lambda`.
+
+    Examples
+    --------
+    >>> wmap = Cosmology(70, 0.3, 0.7)
+    >>> wmap.angular_diameter_distance(np.linspace(0.1, 5, 50)) >> "kpc"
+    >>> wmap.lookback_time(1.0)
+    """
+
+    def __init__(
+        self,
+        H_0: Optional[Union[float, Quantity]] = None,
+        omega_Matter: Optional[float] = None,
+        omega_Lambda: Optional[float] = None,
+        rtol: float = RelativeAccuracy,
+        z_max: float = MaxRedshift,
+    ) -> None:
+        if H_0 is None:
+            H_0 = Quantity(*ConstantValues["H_0"])
+        elif not isinstance(H_0, Quantity):
+            H_0 = Quantity(H_0, "km sec^-1 Mpc^-1")
+        if omega_Matter is None:
+            omega_Matter = ConstantValues["omega_Matter"][0]
+        if omega_Lambda is None:
+            omega_Lambda = ConstantValues["omega_Lambda"][0]
+        self.H_0 = H_0 >> "km sec^-1 Mpc^-1"
+        self.omega_Matter = float(omega_Matter)
+        self.omega_Lambda = float(omega_Lambda)
+        self.rtol = rtol
+        self.z_max = z_max
+        # c/H_0 in cm and 1/H_0 in sec
+        self._distance = (Quantity(*ConstantValues["c"]) / self.H_0).cgs.value
+        self._time = (1 / self.H_0).cgs.value
+
+    def __repr__(self) -> str:
+        return (
+            f"Cosmology(H_0={self.H_0.value}, omega_Matter={self.omega_Matter}, "
+            f"omega_Lambda={self.omega_Lambda})"
+        )
+
+    @property
+    def omega_k(self) -> float:
+        return self.table.omega_k
+
+    @property
+    def table(self) -> ComovingDistanceTable:
+        return GetComovingDistanceTable(
+            self.omega_Matter, self.omega_Lambda, self.rtol, self.z_max
+        )
+
+    @property
+    def hubble_distance(self) -> Quantity:
+        return Quantity(self._distance, "cm")
+
+    @property
+    def hubble_time(self) -> Quantity:
+        return Quantity(self._time, "sec")
+
+    def _Distance(self, z: Any) -> np.ndarray:
+        # comoving distance in cm (used by the `Assumptions.Redshift` conversions)
+        return self._distance * self.table.Distance(z)
+
+    def _Redshift(self, D: Any) -> np.ndarray:
+        return self.table.Redshift(np.asarray(D) / self._distance)
+
+    def comoving_distance(self, z: Any, unit: str = "Mpc") -> Any:
+        """
+        Line-of-sight comoving distance to the redshift(s) `z`.
+        """
+        values = self._distance * self.table.Distance(_Redshifts(z))
+        return _Result(values, "cm", unit, np.ndim(z) == 0)
+
+    def transverse_comoving_distance(self, z: Any, unit: str = "Mpc") -> Any:
+        """
+        Transverse comoving distance to the redshift(s) `z`.
+        """
+        values = self._distance * self.table.TransverseDistance(_Redshifts(z))
+        return _Result(values, "cm", unit, np.ndim(z) == 0)
+
+    def luminosity_distance(self, z: Any, unit: str = "Mpc") -> Any:
+        """
+        Luminosity distance to the redshift(s) `z`, (1 + z) D_M.
+        """
+        z = _Redshifts(z)
+        values = self._distance * (1 + z) * self.table.TransverseDistance(z)
+        return _Result(values, "cm", unit, np.ndim(z) == 0)
+
+    def angular_diameter_distance(self, z: Any, unit: str = "Mpc") -> Any:
+        """
+        Angular diameter distance to the redshift(s) `z`, D_M / (1 + z).
+        """
+        z = _Redshifts(z)
+        values = self._distance * self.table.TransverseDistance(z) / (1 + z)
+        return _Result(values, "cm", unit, np.ndim(z) == 0)
+
+    def distance_modulus(self, z: Any) -> Any:
+        """
+        Distance modulus, 5 log10(D_L / 10 pc), at the redshift(s) `z`.
+        """
+        z = _Redshifts(z)
+        D_L = self._distance * (1 + z) * self.table.TransverseDistance(z)
+        with np.errstate(divide="ignore"):
+            values = 5 * np.log10(D_L / (10 * Unit("pc").scale))
+        return _Result(values, "", "", np.ndim(z) == 0)
+
+    def lookback_time(self, z: Any, unit: str = "Gyr") -> Any:
+        """
+        Lookback time to the redshift(s) `z`.
+        """
+        values = self._time * self.table.LookbackTime(_Redshifts(z))
+        return _Result(values, "sec", unit, np.ndim(z) == 0)
+
+    def age(self, z: Any, unit: str = "Gyr") -> Any:
+        """
+        Age of the universe at the redshift(s) `z`.
+        """
+        values = self._time * self.table.Age(_Redshifts(z))
+        return _Result(values, "sec", unit, np.ndim(z) == 0)
+
+    def redshift(self, distance: Any) -> Any:
+        """
+        Redshift(s) at the comoving distance(s) `distance` (quantities).
+        """
+        D = np.asarray((distance >> "cm").value, dtype=float)
+        return _Result(self._Redshift(D), "", "", np.ndim(D) == 0)
+
+    def register(self, assumption: Enum = Assumptions.Redshift) -> "Cosmology":
+        """
+        Makes the redshift <-> comoving distance conversions of `assumption`
+        use this cosmology.
+
+        Examples
+        --------
+        >>> Cosmology(70, 0.3, 0.7).register()
+        >>> Quantity(1, "") >> Assumptions.Redshift >> "Gpc"
+        """
+        from .equivalencies import AddRedshiftEquivalency
+
+        AddRedshiftEquivalency(assumption, lambda: self)
+        return self
+
+
+# constants defining the default cosmology
+_CosmologyConstants = ("H_0", "omega_Matter", "omega_Lambda", "c")
+
+
+@Memoize("cosmologies", key=lambda *constants: constants, maxsize=16)
+def _GetCosmology(H_0: tuple, omega_Matter: tuple, omega_Lambda: tuple, c: tuple):
+    return Cosmology(Quantity(*H_0), omega_Matter[0], omega_Lambda[0])
+
+
+def DefaultCosmology() -> Cosmology:
+    """
+    Cosmology of the constants `H_0`, `omega_Matter` and `omega_Lambda` (with
+    their current values; cached).
+    """
+    return _GetCosmology(*(ConstantValues[name] for name in _CosmologyConstants))
@@ -0,0 +1,230 @@
+"""
+Conversions between incompatible units under an assumption.
+
+Every assumption (e.g., `Assumptions.Light`) owns a set of edges connecting two
+units by a function of the values (e.g., Hz -> erg via E = h nu). A conversion
+from one unit to another under an assumption is compiled once into a single
+callable (unit factors plus the chain of edge functions along the shortest path
+between the two dimensions), and cached. All the built-in edge functions are
+plain arithmetic, so compiled conversions work on scalars and arrays alike.
+
+New assumptions are members of any `Enum`, registered with `AddEquivalency`
+(e.g., `q >> MyAssumptions.Doppler >> "km/s"`).
+"""
+
+from collections import deque
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .cache import Caches, LRUCache, RegistryLock
+from .constants import ConstantValues
+from .oom import Assumptions, Quantity
+from .units import Unit
+
+
+class Edge:
+    """
+    Conversion from values in `src` to values in `dst` under an assumption.
+    """
+
+    def __init__(self, src: str, dst: str, func: Callable[[Any], Any]) -> None:
+        self.src = Unit(src)
+        self.dst = Unit(dst)
+        self.func = func
+
+    def __repr__(self) -> str:
+        return f"Edge({self.src!s} -> {self.dst!s})"
+
+
+Equivalencies = {}  # type: Dict[Enum, List[Edge]]
+
+_Compiled = Caches.setdefault("equivalencies", LRUCache("equivalencies"))
+
+
+def AddEquivalency(
+    assumption: Enum,
+    src: str,
+    dst: str,
+    forward: Callable[[Any], Any],
+    backward: Optional[Callable[[Any], Any]] = None,
+) -> None:
+    """
+    Registers a conversion between two units under an assumption.
+
+    Parameters
+    ----------
+    assumption : Enum
+        the assumption (a member of `Assumptions` or of a user-defined `Enum`)
+    src : str
+        unit of the values accepted by `forward`
+    dst : str
+        unit of the values returned by `forward`
+    forward : callable
+        maps values in `src` to values in `dst`
+    backward : callable, optional
+        maps values in `dst` to values in `src`
+
+    Examples
+    --------
+    >>> AddEquivalency(Assumptions.Thermal, "K", "erg", lambda T: k_B * T, lambda E: E / k_B)
+    """
+    with RegistryLock:
+        # (copy-on-write: concurrent path searches keep a consistent list)
+        edges = list(Equivalencies.get(assumption, []))
+        edges.append(Edge(src, dst, forward))
+        if backward is not None:
+            edges.append(Edge(dst, src, backward))
+        Equivalencies[assumption] = edges
+        _Compiled.clear()
+
+
+def FindPath(assumption: Enum, src: Unit, dst: Unit) -> List[Edge]:
+    """
+    Shortest chain of edges connecting the dimensions of `src` and `dst`.
+    """
+    if src.dims == dst.dims:
+        return []
+    edges = Equivalencies.get(assumption, [])
+    previous = {src.dims: None}  # type: Dict[Tuple, Optional[Edge]]
+    queue = deque([src.dims])
+    while queue:
+        node = queue.popleft()
+        if node == dst.dims:
+            path = []
+            while previous[node] is not None:
+                edge = previous[node]
+                assert edge is not None
+                path.append(edge)
+                node = edge.src.dims
+            return path[::-1]
+        for edge in edges:
+            if edge.src.dims == node and edge.dst.dims not in previous:
+                previous[edge.dst.dims] = edge
+                queue.append(edge.dst.dims)
+    raise Exception(
+        f"Cannot convert from {src.base_type} to {dst.base_type} with the assumption of {assumption}"
+    )
+
+
+def _Scaled(func: Callable, before: float, after: float) -> Callable:
+    if before == 1 and after == 1:
+        return func
+    return lambda v: func(v * before) * after
+
+
+def CompileEquivalency(assumption: Enum, src: Unit, dst: Unit) -> Callable:
+    """
+    Callable converting values in `src` to values in `dst` under an assumption.
+
+    The result is cached per (assumption, src, dst).
+    """
+    key = (assumption, str(src), str(dst))
+    compiled = _Compiled.get(key)
+    if compiled is not None:
+        return compiled
+    path = FindPath(assumption, src, dst)
+    if not path:
+        factor = src.factor_to(dst)
+        compiled = lambda v: v * factor
+    else:
+        units = [src] + [u for e in path for u in (e.src, e.dst)] + [dst]
+        # factors between consecutive edges (and at both ends of the chain)
+        factors = [
+            units[2 * i].factor_to(units[2 * i + 1]) for i in range(len(path) + 1)
+        ]
+        funcs = [
+            _Scaled(e.func, factors[i] if i == 0 else 1, factors[i + 1])
+            for i, e in enumerate(path)
+        ]
+        if len(funcs) == 1:
+            compiled = funcs[0]
+        else:
+
+            def compiled(v):
+                for func in funcs:
+                    v = func(v)
+                return v
+
+    _Compiled.put(key, compiled)
+    return compiled
+
+
+def _CGS(name: str) -> float:
+    return Quantity(*ConstantValues[name]).cgs.value
+
+
+def AddRedshiftEquivalency(assumption: Enum, cosmology: Callable[[], Any]) -> None:
+    """
+    Registers redshift <-> comoving distance conversions under an assumption,
+    replacing those already registered.
+
+    Parameters
+    ----------
+    assumption : Enum
+        the assumption (e.g., `Assumptions.Redshift`)
+    cosmology : callable
+        returns the `oompy.cosmology.Cosmology` to use (called on every
+        conversion)
+    """
+    length = Unit("cm").dims
+
+    def Redshift(edge: Edge) -> bool:
+        return {edge.src.dims, edge.dst.dims} == {Unit("").dims, length}
+
+    def distance(z):
+        import numpy as np
+
+        D = cosmology()._Distance(z)
+        return D.item() if np.ndim(D) == 0 else D
+
+    def redshift(D):
+        import numpy as np
+
+        z = cosmology()._Redshift(D)
+        return z.item() if np.ndim(z) == 0 else z
+
+    with RegistryLock:
+        edges = [e for e in Equivalencies.get(assumption, []) if not Redshift(e)]
+        edges += [Edge("", "cm", distance), Edge("cm", "", redshift)]
+        Equivalencies[assumption] = edges
+        _Compiled.clear()
+
+
+def _DefaultCosmology() -> Any:
+    from .cosmology import DefaultCosmology
+
+    return DefaultCosmology()
+
+
+def RegisterDefaultEquivalencies() -> None:
+    """
+    (Re)registers the built-in assumptions with the current constant values.
+    """
+    with RegistryLock:
+        _RegisterDefaultEquivalencies()
+
+
+def _RegisterDefaultEquivalencies() -> None:
+    for assumption in Assumptions:
+        Equivalencies.pop(assumption, None)
+    h, hbar, c, k_B = _CGS("h"), _CGS("hbar"), _CGS("c"), _CGS("k_B")
+
+    # photons: energy <-> frequency <-> wavelength
+    AddEquivalency(Assumptions.Light, "Hz", "erg", lambda nu: h * nu, lambda E: E / h)
+    AddEquivalency(
+        Assumptions.Light, "cm", "erg", lambda l: h * c / l, lambda E: h * c / E
+    )
+    AddEquivalency(Assumptions.Light, "Hz", "cm", lambda nu: c / nu, lambda l: c / l)
+    AddEquivalency(
+        Assumptions.Light, "rad Hz", "erg", lambda w: hbar * w, lambda E: E / hbar
+    )
+    AddEquivalency(Assumptions.Light, "rad Hz", "cm", lambda w: c / w)
+    # thermal energy <-> temperature
+    AddEquivalency(
+        Assumptions.Thermal, "K", "erg", lambda T: k_B * T, lambda E: E / k_B
+    )
+    # redshift <-> comoving distance (with the cosmological constants)
+    AddRedshiftEquivalency(Assumptions.Redshift, _DefaultCosmology)
+
+
+RegisterDefaultEquivalencies()
@@ -0,0 +1,65 @@
+import matplotlib.units as units
+import numpy as np
+
+from .arrays import QuantityArray
+from .cache import Memoize
+from .oom import Quantity
+from .units import Unit
+
+
+@Memoize("mpl_labels", key=lambda unit: unit)
+def AxisLabel(unit: Unit) -> str:
+    """
+    LaTeX axis label of a unit (empty for dimensionless units).
+    """
+    latex = Quantity._new(1.0, unit).unit_latex()
+    return f"${latex}$" if latex else ""
+
+
+def _Quantities(value) -> bool:
+    return isinstance(value, (list, tuple)) or (
+        isinstance(value, np.ndarray) and value.dtype == object
+    )
+
+
+class MplUnitConverter(units.ConversionInterface):
+    """
+    Matplotlib support for `Quantity` and `QuantityArray`.
+
+    The unit of an axis is the unit of the first series plotted on it (or the
+    one set with `axis.set_units`/the `xunits`/`yunits` keywords); every series
+    is converted to it with one factor per distinct unit of the series, applied
+    as a single vectorized multiply.
+    """
+
+    @staticmethod
+    def convert(value, unit, axis):
+        unit = Unit(unit)
+        if isinstance(value, (Quantity, QuantityArray)):
+            return value.value * value.unit.factor_to(unit)
+        elif _Quantities(value):
+            quantities = np.ravel(np.asarray(value, dtype=object))
+            factors = {}
+            for q in quantities:
+                if q.unit not in factors:
+                    factors[q.unit] = q.unit.factor_to(unit)
+            values = np.fromiter((q.value for q in quantities), float, len(quantities))
+            if len(factors) == 1:
+                values *= next(iter(factors.values()))
+            else:
+                values *= np.fromiter(
+                    (factors[q.unit] for q in quantities), float, len(quantities)
+                )
+            return values.reshape(np.shape(value))
+        return value
+
+    @staticmethod
+    def axisinfo(unit, axis):
+        return units.AxisInfo(label=AxisLabel(Unit(unit)))
+
+    @staticmethod
+    def default_units(x, axis):
+        if isinstance(x, (Quantity, QuantityArray)):
+            return x.unit
+        elif _Quantities(x):
+            return np.ravel(np.asarray(x, dtype=object))[0].unit
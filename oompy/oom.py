@@ -1,74 +1,190 @@
 from enum import Enum
 from fractions import Fraction
-from typing import Union, Dict
-import matplotlib.units as units
-import sympy as sp
-import numpy as np
+from typing import TYPE_CHECKING, Union, Dict, List, Set, Tuple
+import math
+import sys
 
-from .utils import Stringize, ParseUnit, StripCoeff, JoinUnits
+from .cache import Memoize, OnRegistryChange, OnUnitsChange
+from .utils import ParseUnit, StripCoeff
 from .constants import ConstantValues
 from .units import (
     Type,
-    CGSUnits,
-    GetBaseType,
-    ConvertUnit,
-    RaiseUnitsToPower,
-    Powers,
+    Unit,
+    GetUnitTable,
     BaseUnits,
     LatexUnitMapping,
     UnitEquivalencies,
 )
 
 
-ValidQuantity = Union["Quantity", tuple, int, float, np.ndarray]
+if TYPE_CHECKING:
+    import numpy as np
+
+ValidQuantity = Union["Quantity", tuple, int, float, "np.ndarray"]
+
+# relative tolerance used when comparing arrays of quantities (in CGS)
+RelativeTolerance = 1e-12
+
+
+def _isclose(a: float, b: float) -> bool:
+    return math.isclose(a, b, rel_tol=RelativeTolerance)
+
+
+def _isndarray(obj) -> bool:
+    # numpy is not imported by oompy itself: if it is not loaded, obj is no array
+    np = sys.modules.get("numpy")
+    return np is not None and isinstance(obj, np.ndarray)
+
+
+def _asarray(q: "Quantity"):
+    from .arrays import QuantityArray
+
+    return QuantityArray(q.value, q.unit)
+
+
+@Memoize("latex", key=lambda unit: unit)
+def UnitLatex(unit: str) -> str:
+    """
+    LaTeX representation of a unit (cached per unit).
+    """
+    units = [f.split("^")[0] for f in unit.split(" ")]
+    units_ = []
+    for u in units:
+        for k, v in LatexUnitMapping.items():
+            u = u.replace(k, v)
+        units_.append(u)
+    units = units_
+    pows = [
+        (f"{{}}^{{{f.split('^')[1]}}}" if len(f.split("^")) > 1 else "")
+        for f in unit.split(" ")
+    ]
+    units = [
+        u if "_" in u else f"\\text{{{u}}}" + p for u, p in zip(units, pows) if u != ""
+    ]
+    return "~".join(units)
+
+
+_set = object.__setattr__
+
+
+def _RestoreQuantity(value: float, unit: str, assumption) -> "Quantity":
+    return Quantity._new(value, Unit(unit), assumption)
 
 
 class Quantity:
+    """
+    Immutable physical quantity: a value and a `Unit` (and, optionally, an
+    assumption for conversions between incompatible units).
+    """
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        from .ufuncs import ArrayUfunc
+
+        return ArrayUfunc(ufunc, method, *inputs, **kwargs)
+
+    def __array_function__(self, func, types, args, kwargs):
+        from .ufuncs import ArrayFunction
+
+        return ArrayFunction(func, types, args, kwargs)
+
+    __slots__ = ("value", "unit", "assumption", "_magnitude", "_hash")
+
+    value: float
+    unit: Unit
+    assumption: Union[Enum, None]
+    _magnitude: Union[float, None]  # value in CGS, computed on first use
+    _hash: Union[int, None]
+
     def __init__(self, *args) -> None:
         if (len(args) == 1) and isinstance(args[0], Quantity):
-            self.value = args[0].value  # type: float
-            self.unit = args[0].unit  # type: str
+            value, unit = args[0].value, args[0].unit
         elif (len(args) == 1) and isinstance(args[0], str):
-            self.value, self.unit = StripCoeff(args[0])
+            value, name = StripCoeff(args[0])
+            unit = Unit(name)
         elif (len(args) == 1) and isinstance(args[0], (int, float)):
-            self.value = args[0]
-            self.unit = ""
+            value, unit = args[0], Unit("")
         elif (
             (len(args) == 2)
             and isinstance(args[0], (int, float))
             and isinstance(args[1], str)
         ):
-            self.value = args[0]
-            self.unit = args[1]
+            value = args[0]
+            if isinstance(args[1], Unit):
+                unit = args[1]
+            else:
+                coeff, factorized = ParseUnit(args[1])
+                if coeff != 1:
+                    value = args[0] * coeff
+                unit = Unit._FromFactors(factorized)
         else:
             raise Exception("Invalid arguments for Quantity.__init__")
-        self.assumption = None  # type: Union[Assumptions, None]
+        _set(self, "value", value)
+        _set(self, "unit", unit)
+        _set(self, "assumption", None)
+        _set(self, "_magnitude", None)
+        _set(self, "_hash", None)
+
+    @classmethod
+    def _new(
+        cls, value: float, unit: Unit, assumption: Union[Enum, None] = None
+    ) -> "Quantity":
+        # fast path for already validated values and units
+        new = object.__new__(cls)
+        _set(new, "value", value)
+        _set(new, "unit", unit)
+        _set(new, "assumption", assumption)
+        _set(new, "_magnitude", None)
+        _set(new, "_hash", None)
+        return new
+
+    @staticmethod
+    def parse_many(
+        strings, target=None, assumption: Union[Enum, None] = None, **kwargs
+    ):
+        """
+        Parses many quantity strings at once into array-backed quantities, one
+        `QuantityArray` per unit or, with `target`, a single `QuantityArray` in
+        that unit (see `oompy.arrays.ParseQuantities`).
+
+        Examples
+        --------
+        >>> Quantity.parse_many(["1 km", "2 mi", "3e5 cm"], "m")
+        """
+        from .arrays import ParseQuantities
+
+        return ParseQuantities(strings, target, assumption, **kwargs)
+
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError("Quantity is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("Quantity is immutable")
+
+    def __reduce__(self):
+        return (_RestoreQuantity, (self.value, str(self.unit), self.assumption))
+
+    @property
+    def magnitude(self) -> float:
+        """
+        Value in CGS (computed once).
+        """
+        magnitude = self._magnitude
+        if magnitude is None:
+            magnitude = self.unit.convert(self.value, self.unit.cgs)
+            _set(self, "_magnitude", magnitude)
+        return magnitude
 
     @property
     def cgs(self) -> "Quantity":
-        return self >> Stringize(
-            {CGSUnits[b]: p for b, p in GetBaseType(self.unit).items()}
-        )
+        return Quantity._new(self.magnitude, self.unit.cgs)
 
     def __to(self, unit: str) -> "Quantity":
         if unit == "CGS":
             return self.cgs
-        target = Quantity(unit)
-        if ~self == ~target:
-            return Quantity(*ConvertUnit(Stringize((self.value, self.unit)), unit))
-        elif self.assumption is None:
-            raise Exception(
-                "Cannot convert between different base types (no assumption)"
-            )
-        elif self.assumption == Assumptions.Light:
-            return ConvertAssuming_Light(self, target)
-        elif self.assumption == Assumptions.Thermal:
-            return ConvertAssuming_Thermal(self, target)
-        elif self.assumption == Assumptions.Redshift:
-            return ConvertAssuming_Redshift(self, target)
-        raise Exception(
-            f"Cannot convert from {~self} to {~target} with the assumption of {self.assumption}"
-        )
+        target = Unit(unit)
+        if self.unit.dims == target.dims:
+            return Quantity._new(self.unit.convert(self.value, target), target)
+        return ConvertAssuming(self, target)
 
     def __repr__(self) -> str:
         return f"{self.value} {self.unit}"
@@ -85,23 +201,7 @@ class Quantity:
         )
 
     def unit_latex(self) -> str:
-        units = [f.split("^")[0] for f in self.unit.split(" ")]
-        units_ = []
-        for u in units:
-            for k, v in LatexUnitMapping.items():
-                u = u.replace(k, v)
-            units_.append(u)
-        units = units_
-        pows = [
-            (f"{{}}^{{{f.split('^')[1]}}}" if len(f.split("^")) > 1 else "")
-            for f in self.unit.split(" ")
-        ]
-        units = [
-            u if "_" in u else f"\\text{{{u}}}" + p
-            for u, p in zip(units, pows)
-            if u != ""
-        ]
-        return "~".join(units)
+        return UnitLatex(self.unit)
 
     def _repr_latex_(self) -> str:
         nval = self.value_latex()
@@ -115,48 +215,75 @@ class Quantity:
         return self.__repr__()
 
     def __hash__(self) -> int:
-        return hash(self.cgs.value)
+        h = self._hash
+        if h is None:
+            h = hash(self.magnitude)
+            _set(self, "_hash", h)
+        return h
 
     def __format__(self, format_spec: str) -> str:
-        if GetBaseType(self.unit) == GetBaseType(""):
+        if self.unit.dimensionless:
             return f"{self.value:{format_spec}}"
         else:
             return f"{self.value:{format_spec}} {self.unit}"
 
     def __invert__(self) -> Dict["Type", "Fraction"]:
-        return GetBaseType(self.unit)
+        return self.unit.base_type
 
-    def __eq__(self, other) -> bool:
+    def __magnitudes(self, other, op: str) -> Tuple[float, float]:
+        # CGS values of both operands (which must have the same dimensions)
         if isinstance(other, Quantity):
-            return (self.__invert__() == ~other) and (self.cgs.value == other.cgs.value)
+            dims = other.unit.dims
+            if dims is not self.unit.dims and dims != self.unit.dims:
+                raise Exception("Cannot compare different base types")
+            return self.magnitude, other.magnitude
         elif isinstance(other, tuple):
-            return self.value == Quantity(*other)
+            return self.__magnitudes(Quantity(*other), op)
         elif isinstance(other, (int, float)):
-            return (self.cgs.value == other) and (
-                ParseUnit(self.cgs.unit) == ParseUnit("")
-            )
+            if not self.unit.dimensionless:
+                raise Exception("Cannot compare different base types")
+            return self.magnitude, other
+        raise Exception(f"Invalid type for Quantity.{op}")
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, tuple):
+            other = Quantity(*other)
+        if isinstance(other, Quantity):
+            dims = other.unit.dims
+            if dims is not self.unit.dims and dims != self.unit.dims:
+                return False
+            v2 = other.magnitude
+        elif isinstance(other, (int, float)):
+            if not self.unit.dimensionless:
+                return False
+            v2 = other
         else:
             raise Exception("Invalid type for Quantity.__eq__")
+        return self.magnitude == v2
 
     def __ne__(self, other) -> bool:
         return not self.__eq__(other)
 
+    # the orderings below are on the hot path of sorting: they read the cached
+    # CGS values directly
+
     def __lt__(self, other) -> bool:
-        if isinstance(other, Quantity):
-            if ~other != self.__invert__():
-                raise Exception("Cannot compare different base types")
-            return self.cgs.value < other.cgs.value
-        elif isinstance(other, tuple):
-            return self < Quantity(*other)
-        elif isinstance(other, (int, float)):
-            if self.unit != "":
-                raise Exception("Cannot compare different base types")
-            return self.cgs.value < other
+        if isinstance(other, Quantity) and other.unit.dims is self.unit.dims:
+            v1, v2 = self._magnitude, other._magnitude
+            if v1 is None or v2 is None:
+                v1, v2 = self.magnitude, other.magnitude
         else:
-            raise Exception("Invalid type for Quantity.__lt__")
+            v1, v2 = self.__magnitudes(other, "__lt__")
+        return v1 < v2
 
     def __le__(self, other) -> bool:
-        return self.__lt__(other) or self.__eq__(other)
+        if isinstance(other, Quantity) and other.unit.dims is self.unit.dims:
+            v1, v2 = self._magnitude, other._magnitude
+            if v1 is None or v2 is None:
+                v1, v2 = self.magnitude, other.magnitude
+        else:
+            v1, v2 = self.__magnitudes(other, "__le__")
+        return v1 <= v2
 
     def __gt__(self, other) -> bool:
         return not self.__le__(other)
@@ -164,14 +291,13 @@ class Quantity:
     def __ge__(self, other) -> bool:
         return not self.__lt__(other)
 
-    def __rshift__(self, unit: Union[str, "Quantity", "Assumptions"]) -> "Quantity":
+    def __rshift__(self, unit: Union[str, "Quantity", Enum]) -> "Quantity":
         if isinstance(unit, Quantity):
             return self >> unit.unit
         elif isinstance(unit, str):
             return self.__to(unit)
-        elif isinstance(unit, Assumptions):
-            self.assume(unit)
-            return self
+        elif isinstance(unit, Enum):
+            return self.assume(unit)
         elif self.unit == unit:
             return self
         else:
@@ -179,49 +305,57 @@ class Quantity:
 
     def __add__(self, other: ValidQuantity) -> "Quantity":
         if isinstance(other, Quantity):
-            if self.unit == other.unit:
-                return Quantity(self.value + other.value, self.unit)
+            if self.unit is other.unit:
+                return Quantity._new(self.value + other.value, self.unit)
             else:
-                return self + (other >> self.unit)
+                return Quantity._new(
+                    self.value + other.unit.convert(other.value, self.unit),
+                    self.unit,
+                )
         elif isinstance(other, tuple):
             return self + Quantity(*other)
         elif isinstance(other, (int, float)):
             assert self.unit == "", "Invalid arguments for Quantity.__add__"
-            return Quantity(self.value + other, self.unit)
+            return Quantity._new(self.value + other, self.unit)
+        elif _isndarray(other):
+            return _asarray(self) + other
         else:
-            raise Exception("Invalid arguments for Quantity.__add__")
+            return NotImplemented
 
-    def assume(self, assumption: "Assumptions") -> None:
-        self.assumption = assumption
+    def assume(self, assumption: Enum) -> "Quantity":
+        """
+        Copy of the quantity carrying an assumption (see `Assumptions`).
+        """
+        return Quantity._new(self.value, self.unit, assumption)
 
     def __radd__(self, other: ValidQuantity) -> "Quantity":
         return self + other
 
     def __neg__(self) -> "Quantity":
-        return Quantity(-self.value, self.unit)
+        return Quantity._new(-self.value, self.unit)
 
     def __abs__(self) -> "Quantity":
-        return Quantity(abs(self.value), self.unit)
+        return Quantity._new(abs(self.value), self.unit)
 
     def __sub__(self, other: ValidQuantity) -> "Quantity":
-        return self + (-Quantity(other))
+        if isinstance(other, tuple):
+            other = Quantity(*other)
+        return self + (-other)
 
     def __rsub__(self, other: ValidQuantity) -> "Quantity":
         return (-self) + other
 
     def __mul__(self, other: ValidQuantity) -> "Quantity":
         if isinstance(other, Quantity):
-            return Quantity(
-                self.value * other.value, JoinUnits(" ".join([self.unit, other.unit]))
-            )
+            return Quantity._new(self.value * other.value, self.unit * other.unit)
         elif isinstance(other, tuple):
             return self * Quantity(*other)
         elif isinstance(other, (int, float)):
-            return Quantity(self.value * other, self.unit)
-        elif isinstance(other, np.ndarray):
-            return other * self
+            return Quantity._new(self.value * other, self.unit)
+        elif _isndarray(other):
+            return _asarray(self) * other
         else:
-            raise Exception("Invalid arguments for Quantity.__mul__")
+            return NotImplemented
 
     def __rmul__(self, other: ValidQuantity) -> "Quantity":
         return self * other
@@ -233,12 +367,22 @@ class Quantity:
         elif isinstance(other, tuple):
             return self ** Quantity(*other)
         elif isinstance(other, (int, float)):
-            return Quantity(self.value**other, RaiseUnitsToPower(self.unit, other))
+            return Quantity(self.value**other, self.unit**other)
         else:
-            raise Exception("Invalid arguments for Quantity.__pow__")
+            return NotImplemented
 
     def __truediv__(self, other: ValidQuantity) -> "Quantity":
-        return self * (Quantity(other) ** (-1))
+        # (times the inverse, which is not always bit-for-bit the quotient)
+        if isinstance(other, Quantity):
+            return Quantity._new(self.value * other.value**-1, self.unit / other.unit)
+        elif isinstance(other, tuple):
+            return self / Quantity(*other)
+        elif isinstance(other, (int, float)):
+            return Quantity._new(self.value * other**-1, self.unit)
+        elif _isndarray(other):
+            return _asarray(self) / other
+        else:
+            return NotImplemented
 
     def __rtruediv__(self, other: ValidQuantity) -> "Quantity":
         return (self ** (-1)) * other
@@ -247,42 +391,63 @@ class Quantity:
         return self.value
 
 
-class MplUnitConverter(units.ConversionInterface):
-    @staticmethod
-    def convert(value, _, __):
-        if isinstance(value, Quantity):
-            return value.value
-        elif isinstance(value, list):
-            return [(v >> value[0].unit).value for v in value]
-        elif isinstance(value, np.ndarray):
-            return np.array([(v >> value[0].unit).value for v in value])
+# entries of `UnitsClass` and `ConstantsClass`, shared by all their instances
+_UnitQuantities = {}  # type: Dict[str, Quantity]
+_ConstantQuantities = {}  # type: Dict[str, Quantity]
 
-    @staticmethod
-    def axisinfo(unit, _):
-        return units.AxisInfo(label=str(unit))
 
-    @staticmethod
-    def default_units(x, _):
-        if isinstance(x, Quantity):
-            return f"${x.unit_latex()}$"
-        elif isinstance(x, list) or isinstance(x, np.ndarray):
-            return f"${x[0].unit_latex()}$"
+def _ForgetQuantities(tokens: Set[str]) -> None:
+    for quantities in (_UnitQuantities, _ConstantQuantities):
+        for name, q in list(quantities.items()):
+            if not tokens.isdisjoint(q.unit.factors):
+                del quantities[name]
+
+
+def _ClearQuantities() -> None:
+    _UnitQuantities.clear()
+    _ConstantQuantities.clear()
+
+
+OnUnitsChange.append(_ForgetQuantities)
+OnRegistryChange.append(_ClearQuantities)
 
 
 class UnitsClass:
+    """
+    All the (prefixed) units as `Quantity` objects, created on first access.
+    """
+
     def __init__(self) -> None:
-        allunits = [
-            [p + u for p in [""] + list(Powers.keys())]
-            for u in list(BaseUnits.values()) + list(UnitEquivalencies.keys())
-            if u != ""
-        ]
-        self.units = {u: Quantity(u) for u in sum(allunits, [])}
-
-    def __getattribute__(self, name):
-        if name == "all":
-            return list(BaseUnits.values()) + list(UnitEquivalencies.keys())
-        else:
-            return super().__getattribute__("units")[name]
+        _set(self, "units", _UnitQuantities)
+
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError("Units are immutable (see oompy.define_unit)")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("Units are immutable (see oompy.define_unit)")
+
+    def __reduce__(self):
+        # pickled empty: the entries are recreated on first access
+        return (UnitsClass, ())
+
+    @property
+    def all(self) -> List[str]:
+        return list(BaseUnits.values()) + list(UnitEquivalencies.keys())
+
+    def __getattr__(self, name: str) -> Quantity:
+        units = self.__dict__.get("units")
+        if units is None or name.startswith("__"):
+            raise AttributeError(name)
+        try:
+            return units[name]
+        except KeyError:
+            pass
+        if name not in GetUnitTable():
+            raise AttributeError(f"Unknown unit: {name}")
+        return units.setdefault(name, Quantity(1.0, Unit(name)))
+
+    def __dir__(self) -> List[str]:
+        return list(super().__dir__()) + list(GetUnitTable())
 
 
 class Assumptions(Enum):
@@ -292,81 +457,53 @@ class Assumptions(Enum):
 
 
 class ConstantsClass:
+    """
+    All the physical constants as `Quantity` objects, created on first access.
+    """
+
     def __init__(self) -> None:
-        self.constants = {k: Quantity(*v) for k, v in ConstantValues.items()}
+        _set(self, "constants", _ConstantQuantities)
 
-    def __getattribute__(self, name):
-        if name == "all":
-            return {k: Quantity(*v).cgs for k, v in ConstantValues.items()}
-        else:
-            return super().__getattribute__("constants")[name]
-
-
-def ConvertAssuming_Light(source: "Quantity", target: "Quantity") -> "Quantity":
-    Constants = ConstantsClass()
-    Units = UnitsClass()
-    unit = target.unit
-    if ~target == ~Quantity("erg"):
-        if ~source == ~Quantity("Hz"):
-            return (Constants.h * source) >> (unit)
-        elif ~source == ~Quantity("cm"):
-            return (Constants.h * Constants.c / source) >> (unit)
-        elif ~source == ~Quantity("Hz rad"):
-            return (Constants.hbar * source / Units.rad) >> (unit)
-    elif ~target == ~Quantity("Hz"):
-        if ~source == ~Quantity("erg"):
-            return (source / Constants.h) >> (unit)
-        elif ~source == ~Quantity("cm"):
-            return (Constants.c / source) >> (unit)
-    elif ~target == ~Quantity("cm"):
-        if ~source == ~Quantity("erg"):
-            return (Constants.h * Constants.c / source) >> (unit)
-        elif ~source == ~Quantity("Hz"):
-            return (Constants.c / source) >> (unit)
-        elif ~source == ~Quantity("Hz rad"):
-            return (Constants.c * Units.rad / source) >> (unit)
-    raise Exception("Cannot convert between different base types")
-
-
-def ConvertAssuming_Thermal(source: "Quantity", target: "Quantity") -> "Quantity":
-    Constants = ConstantsClass()
-    unit = target.unit
-    if ~target == ~Quantity("erg"):
-        if ~source == ~Quantity("K"):
-            return (Constants.k_B * source) >> (unit)
-    elif ~target == ~Quantity("K"):
-        if ~source == ~Quantity("erg"):
-            return (source / Constants.k_B) >> (unit)
-    raise Exception("Cannot convert between different base types")
-
-
-def ConvertAssuming_Redshift(source: "Quantity", target: "Quantity") -> "Quantity":
-    import scipy.integrate as integrate  # type: ignore
-    from scipy.optimize import fsolve  # type: ignore
-    import math
-
-    def integrand(x):
-        return 1 / math.sqrt(
-            Constants.omega_Matter.value * (1 + x) ** 3 + Constants.omega_Lambda.value
-        )
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError("Constants are immutable (see oompy.define_constant)")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("Constants are immutable (see oompy.define_constant)")
 
-    Constants = ConstantsClass()
-    unit = target.unit
-    if ~target == ~Quantity("cm"):
-        assert ~source == ~Quantity("")
-
-        return (Constants.c / Constants.H_0) * integrate.quad(
-            integrand,
-            0,
-            (source >> "").value,
-        )[0] >> (unit)
-    elif ~target == ~Quantity(""):
-        assert ~source == ~Quantity("cm")
-
-        def func(Z):
-            return (Constants.c / Constants.H_0 >> "Gpc").value * integrate.quad(
-                integrand, 0, Z[0]
-            )[0] - (source >> "Gpc").value
-
-        return Quantity(fsolve(func, 1)[0], "")
-    raise Exception("Cannot convert between different base types")
+    def __reduce__(self):
+        # pickled empty: the entries are recreated on first access
+        return (ConstantsClass, ())
+
+    @property
+    def all(self) -> Dict[str, Quantity]:
+        return {k: Quantity(*v).cgs for k, v in ConstantValues.items()}
+
+    def __getattr__(self, name: str) -> Quantity:
+        constants = self.__dict__.get("constants")
+        if constants is None or name.startswith("__"):
+            raise AttributeError(name)
+        try:
+            return constants[name]
+        except KeyError:
+            pass
+        if name not in ConstantValues:
+            raise AttributeError(f"Unknown constant: {name}")
+        return constants.setdefault(name, Quantity(*ConstantValues[name]))
+
+    def __dir__(self) -> List[str]:
+        return list(super().__dir__()) + list(ConstantValues.keys())
+
+
+def ConvertAssuming(source, target: Unit):
+    """
+    Converts a `Quantity`/`QuantityArray` to an incompatible unit using the
+    equivalencies registered for its assumption (see `oompy.equivalencies`).
+    """
+    if source.assumption is None:
+        raise Exception("Cannot convert between different base types (no assumption)")
+    from .equivalencies import CompileEquivalency
+
+    convert = CompileEquivalency(source.assumption, source.unit, target)
+    if isinstance(source, Quantity):
+        return Quantity._new(convert(source.value), target)
+    return source._new(convert(source.value), target)
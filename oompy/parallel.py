@@ -0,0 +1,200 @@
+"""
+Batch evaluation of conversions (or of any function of quantities) in a pool of
+threads or processes.
+
+The inputs are split into chunks which are sent to the workers in a compact
+form: a chunk of quantities is pickled as the list of its distinct units (as
+plain strings) and two arrays, the index of the unit of every quantity and the
+values. Every worker converts all the values sharing a unit with a single
+vectorized `Converter` call (the converters are cached per worker), and the
+results come back in the order of the inputs.
+
+Note that the workers of a process pool started with the "spawn" method (the
+default on macOS and Windows) import oompy afresh: units, constants or
+equivalencies registered at runtime in the parent are not seen there.
+
+Examples
+--------
+>>> redshifts = [Quantity(z, "") for z in np.random.uniform(0, 5, 100000)]
+>>> oompy.map_convert(redshifts, "Gpc", Assumptions.Redshift, n_jobs=-1)
+"""
+
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from enum import Enum
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from typing import Union
+
+import numpy as np
+
+from .arrays import QuantityArray
+from .cache import Memoize
+from .converter import Converter, _Format, _Parse
+from .oom import Quantity
+from .units import Unit
+
+# distinct (unit, assumption) pairs, the index of the pair of every value, values
+Chunk = Tuple[List[Tuple[str, Optional[Enum]]], np.ndarray, np.ndarray]
+
+
+@Memoize("converters", key=lambda src, dst, assumption: (src, dst, assumption))
+def _GetConverter(src: str, dst: str, assumption: Optional[Enum]) -> Converter:
+    return Converter(src, dst, assumption)
+
+
+def _ConvertChunk(target: str, assumption: Optional[Enum], chunk: Chunk) -> np.ndarray:
+    kinds, codes, values = chunk
+    if len(kinds) == 1:
+        unit, own = kinds[0]
+        return np.asarray(_GetConverter(unit, target, assumption or own)(values))
+    result = np.empty(len(values))
+    for code, (unit, own) in enumerate(kinds):
+        mask = codes == code
+        result[mask] = _GetConverter(unit, target, assumption or own)(values[mask])
+    return result
+
+
+def _ApplyChunk(func: Callable, chunk: Sequence[Any]) -> List[Any]:
+    return [func(q) for q in chunk]
+
+
+def _QuantityChunks(quantities: Sequence[Quantity], chunksize: int) -> List[Chunk]:
+    chunks = []  # type: List[Chunk]
+    for start in range(0, len(quantities), chunksize):
+        block = quantities[start : start + chunksize]
+        kinds = {}  # type: Dict[Tuple[Unit, Optional[Enum]], int]
+        codes = np.fromiter(
+            (kinds.setdefault((q.unit, q.assumption), len(kinds)) for q in block),
+            dtype=np.intp,
+            count=len(block),
+        )
+        values = np.fromiter((q.value for q in block), dtype=float, count=len(block))
+        chunks.append(([(str(u), a) for u, a in kinds], codes, values))
+    return chunks
+
+
+def _Workers(n_jobs: int, executor: Optional[Executor], workers: Optional[int]) -> int:
+    if executor is not None:
+        return workers or os.cpu_count() or 1
+    return (os.cpu_count() or 1) if n_jobs < 0 else max(n_jobs, 1)
+
+
+def _Chunksize(size: int, workers: int, chunksize: Optional[int]) -> int:
+    # a few chunks per worker balances the load without much pickling overhead
+    return chunksize or max(-(-size // (4 * workers)), 1)
+
+
+def _Map(
+    worker: Callable,
+    chunks: Iterable[Any],
+    n_jobs: int,
+    executor: Optional[Executor],
+    processes: bool,
+) -> List[Any]:
+    if executor is not None:
+        return list(executor.map(worker, chunks))
+    workers = _Workers(n_jobs, None, None)
+    if workers == 1:
+        return [worker(chunk) for chunk in chunks]
+    pool = ProcessPoolExecutor if processes else ThreadPoolExecutor
+    with pool(max_workers=workers) as ex:
+        return list(ex.map(worker, chunks))
+
+
+def map_convert(
+    quantities: Union[Sequence[Quantity], QuantityArray],
+    target: Union[str, Unit],
+    assumption: Optional[Enum] = None,
+    n_jobs: int = 1,
+    executor: Optional[Executor] = None,
+    chunksize: Optional[int] = None,
+    processes: bool = True,
+    workers: Optional[int] = None,
+) -> Union[List[Quantity], QuantityArray]:
+    """
+    Converts many quantities to `target`, in parallel.
+
+    Parameters
+    ----------
+    quantities : list of Quantity or QuantityArray
+        quantities to convert (in any units compatible with `target`, possibly
+        under their own assumptions)
+    target : str
+        target unit
+    assumption : Enum, optional
+        assumption for all the conversions (overrides those of the quantities)
+    n_jobs : int
+        number of workers (-1 for all the cores, 1 to convert in this process)
+    executor : concurrent.futures.Executor, optional
+        pool to run the chunks in (instead of one created for the call)
+    chunksize : int, optional
+        number of quantities per chunk (default: 4 chunks per worker)
+    processes : bool
+        whether the pool created for the call is a process or a thread pool
+    workers : int, optional
+        number of workers of `executor`, to size the chunks (default: the number
+        of cores)
+
+    Returns
+    -------
+    list of Quantity or QuantityArray
+        the converted quantities, in the order of the inputs
+    """
+    dst_coeff, dst = _Parse(target)
+    target = _Format(dst_coeff, dst)
+    size = (
+        np.size(quantities.value)
+        if isinstance(quantities, QuantityArray)
+        else len(quantities)
+    )
+    chunksize = _Chunksize(size, _Workers(n_jobs, executor, workers), chunksize)
+    if isinstance(quantities, QuantityArray):
+        values = np.ravel(quantities.value).astype(float)
+        kinds = [(str(quantities.unit), quantities.assumption)]
+        codes = np.zeros(0, dtype=np.intp)
+        chunks = [
+            (kinds, codes, values[start : start + chunksize])
+            for start in range(0, size, chunksize)
+        ]  # type: List[Chunk]
+    else:
+        chunks = _QuantityChunks(quantities, chunksize)
+    worker = partial(_ConvertChunk, target, assumption)
+    results = _Map(worker, chunks, n_jobs, executor, processes)
+    converted = np.concatenate(results) if results else np.zeros(0)
+    if dst_coeff != 1:
+        converted = converted * dst_coeff
+    if isinstance(quantities, QuantityArray):
+        return quantities._new(converted.reshape(np.shape(quantities.value)), dst)
+    return [Quantity._new(v, dst) for v in converted.tolist()]
+
+
+def map_quantities(
+    func: Callable[[Quantity], Any],
+    quantities: Sequence[Quantity],
+    n_jobs: int = 1,
+    executor: Optional[Executor] = None,
+    chunksize: Optional[int] = None,
+    processes: bool = True,
+    workers: Optional[int] = None,
+) -> List[Any]:
+    """
+    Applies `func` to many quantities, in parallel (see `map_convert` for the
+    parameters). With a process pool, `func` has to be picklable, i.e., defined
+    at the top level of a module.
+
+    Examples
+    --------
+    >>> def luminosity(flux):
+    ...     return 4 * np.pi * (flux * u.Mpc**2) >> "erg sec^-1"
+    >>> oompy.map_quantities(luminosity, fluxes, n_jobs=8)
+    """
+    quantities = list(quantities)
+    n_workers = _Workers(n_jobs, executor, workers)
+    chunksize = _Chunksize(len(quantities), n_workers, chunksize)
+    chunks = [
+        quantities[start : start + chunksize]
+        for start in range(0, len(quantities), chunksize)
+    ]
+    results = _Map(partial(_ApplyChunk, func), chunks, n_jobs, executor, processes)
+    return [r for chunk in results for r in chunk]
@@ -0,0 +1,215 @@
+"""
+Opt-in instrumentation of the hot paths of oompy.
+
+Nothing is instrumented by default: `profile()` swaps timed wrappers in for the
+instrumented functions when the first profile starts, and puts the original
+functions back when the last one ends, so there is no overhead at all outside
+of a `with oompy.profile():` block.
+
+Examples
+--------
+>>> with oompy.profile() as stats:
+...     run_my_pipeline()
+>>> print(stats.report())
+>>> monitoring.send(stats.as_dict())  # or stats.to_json()
+"""
+
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+from .cache import CacheInfo
+
+# instrumented functions: name in the report -> "module:attribute" paths
+Instrumented = {
+    "parse": ["oompy.utils:ParseUnit"],
+    "unit": ["oompy.units:Unit._FromFactors"],
+    "reduce": ["oompy.units:ReduceUnitToBase"],
+    "base_type": ["oompy.units:GetBaseType", "oompy.units:Unit.base_type"],
+    "convert": [
+        "oompy.oom:Quantity._Quantity__to",
+        "oompy.arrays:QuantityArray._QuantityArray__to",
+        "oompy.units:ConvertUnit",
+    ],
+    "assumption": ["oompy.oom:ConvertAssuming"],
+    "compile_equivalency": ["oompy.equivalencies:CompileEquivalency"],
+    "cosmology_table": ["oompy.cosmology:ComovingDistanceTable.__init__"],
+}
+
+# modules which need numpy: only instrumented if numpy is available
+_NumpyModules = ("oompy.arrays", "oompy.cosmology")
+
+
+class ProfileStats:
+    """
+    Call counts and (inclusive) times of the instrumented functions, and the
+    hits/misses of the unit caches, collected during a `profile()` block.
+    """
+
+    def __init__(self) -> None:
+        self.calls = {}  # type: Dict[str, List[float]]
+        self.caches = {}  # type: Dict[str, Dict[str, float]]
+        self.wall_time = 0.0
+        self._start = 0.0
+        self._cache_start = {}  # type: Dict[str, Dict[str, int]]
+
+    def _Begin(self) -> None:
+        self._cache_start = CacheInfo()
+        self._start = time.perf_counter()
+
+    def _End(self) -> None:
+        self.wall_time = time.perf_counter() - self._start
+        for name, end in CacheInfo().items():
+            start = self._cache_start.get(name, {"hits": 0, "misses": 0})
+            hits = end["hits"] - start["hits"]
+            misses = end["misses"] - start["misses"]
+            if hits or misses:
+                self.caches[name] = {
+                    "hits": hits,
+                    "misses": misses,
+                    "hit_rate": hits / (hits + misses),
+                }
+
+    def _Record(self, name: str, elapsed: float) -> None:
+        entry = self.calls.get(name)
+        if entry is None:
+            self.calls[name] = [1, elapsed]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "wall_time": self.wall_time,
+            "calls": {
+                name: {"calls": int(n), "time": t, "mean_time": t / n}
+                for name, (n, t) in sorted(self.calls.items())
+            },
+            "caches": dict(sorted(self.caches.items())),
+        }
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.as_dict(), **kwargs)
+
+    def report(self) -> str:
+        lines = [f"{'':>20s} {'calls':>10s} {'total [s]':>12s} {'mean [us]':>12s}"]
+        for name, (n, t) in sorted(self.calls.items(), key=lambda kv: -kv[1][1]):
+            lines.append(f"{name:>20s} {int(n):>10d} {t:>12.6f} {1e6 * t / n:>12.3f}")
+        lines.append(f"{'wall time':>20s} {'':>10s} {self.wall_time:>12.6f}")
+        if self.caches:
+            lines.append("")
+            lines.append(
+                f"{'cache':>20s} {'hits':>10s} {'misses':>12s} {'hit rate':>12s}"
+            )
+            for name, c in self.caches.items():
+                lines.append(
+                    f"{name:>20s} {c['hits']:>10d} {c['misses']:>12d} {c['hit_rate']:>12.1%}"
+                )
+        return "\n".join(lines)
+
+
+_Active = []  # type: List[ProfileStats]
+_Patched = []  # type: List[Tuple[Any, str, Any]]
+
+# the instrumentation is process-wide: blocks in different threads share it
+_Lock = threading.Lock()
+
+
+def _Timed(name: str, func: Callable) -> Callable:
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            for stats in tuple(_Active):
+                stats._Record(name, elapsed)
+
+    return wrapper
+
+
+def _Wrap(name: str, attr: Any) -> Any:
+    if isinstance(attr, property):
+        assert attr.fget is not None
+        return property(_Timed(name, attr.fget), attr.fset, attr.fdel, attr.__doc__)
+    elif isinstance(attr, classmethod):
+        return classmethod(_Timed(name, attr.__func__))
+    elif isinstance(attr, staticmethod):
+        return staticmethod(_Timed(name, attr.__func__))
+    return _Timed(name, attr)
+
+
+def _Modules() -> List[Any]:
+    return [m for n, m in list(sys.modules.items()) if n.split(".")[0] == "oompy"]
+
+
+def _Instrument() -> None:
+    import importlib
+
+    for name, paths in Instrumented.items():
+        for path in paths:
+            module_name, qualname = path.split(":")
+            if module_name in _NumpyModules:
+                try:
+                    import numpy  # noqa: F401
+                except ImportError:
+                    continue
+            owner = importlib.import_module(module_name)
+            *parents, attr_name = qualname.split(".")
+            for parent in parents:
+                owner = getattr(owner, parent)
+            if parents:
+                # class attribute (method, classmethod or property)
+                original = owner.__dict__[attr_name]
+                _Patched.append((owner, attr_name, original))
+                setattr(owner, attr_name, _Wrap(name, original))
+                continue
+            # module function: also replace the names imported by other modules
+            original = getattr(owner, attr_name)
+            wrapped = _Wrap(name, original)
+            for module in _Modules():
+                for key, value in list(vars(module).items()):
+                    if value is original:
+                        _Patched.append((module, key, original))
+                        setattr(module, key, wrapped)
+
+
+def _Restore() -> None:
+    while _Patched:
+        owner, attr_name, original = _Patched.pop()
+        setattr(owner, attr_name, original)
+
+
+@contextmanager
+def profile() -> Iterator[ProfileStats]:
+    """
+    Counts and times the calls to the hot paths of oompy (unit parsing and
+    compilation, reduction to base units, base types, conversions, assumptions,
+    cosmological tables) and the cache hit rates within the block.
+
+    Examples
+    --------
+    >>> with oompy.profile() as stats:
+    ...     (5 * u.GHz) >> assume.Light >> "eV"
+    >>> stats.as_dict()["calls"]["assumption"]["calls"]
+    1
+    """
+    stats = ProfileStats()
+    with _Lock:
+        if not _Active:
+            _Instrument()
+        _Active.append(stats)
+    stats._Begin()
+    try:
+        yield stats
+    finally:
+        stats._End()
+        with _Lock:
+            _Active.remove(stats)
+            if not _Active:
+                _Restore()
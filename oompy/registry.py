@@ -0,0 +1,158 @@
+"""
+Runtime definitions of units, aliases and constants.
+
+Definitions update the unit table incrementally: only the new (or redefined)
+units, their prefixed variants and the units defined in terms of them are
+resolved again. Likewise, only the cached conversions, compiled units and
+`Units`/`Constants` entries which refer to a unit whose definition has actually
+changed are dropped, so adding new units invalidates nothing at all. Quantities
+created before a unit is *redefined* keep its old definition.
+
+(Modifying `UnitEquivalencies` & co. directly still works, but rebuilds the
+whole table and empties all the caches.)
+
+Examples
+--------
+>>> define_unit("Jy", 1e-23, "erg sec^-1 cm^-2 Hz^-1")
+>>> define_units({"Pa": (1.0, "N m^-2"), "bar": (1e5, "Pa")})
+>>> define_alias("s", "sec")
+>>> define_constant("m_n", 1.67492749804e-24, "g")
+"""
+
+import re
+from typing import Dict, Optional, Tuple
+
+from .cache import Caches, RegistryLock, UnitsChanged
+from .constants import ConstantValues
+from .oom import Quantity, _ConstantQuantities
+from .units import LatexUnitMapping, UnitEquivalencies, GetUnitTable, _ResetUnitTable
+
+_Name = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+# constants captured by the built-in equivalencies (see `RegisterDefaultEquivalencies`)
+_EquivalencyConstants = {"h", "hbar", "c", "k_B"}
+
+
+def define_units(
+    definitions: Dict[str, Tuple[float, str]],
+    latex: Optional[Dict[str, str]] = None,
+) -> None:
+    """
+    Defines (or redefines) several units at once.
+
+    Parameters
+    ----------
+    definitions : dict
+        unit name -> (coefficient, unit), e.g. {"Jy": (1e-23, "erg sec^-1
+        cm^-2 Hz^-1")}; the definitions may refer to each other
+    latex : dict, optional
+        unit name -> LaTeX representation
+
+    Examples
+    --------
+    >>> define_units({"Pa": (1.0, "N m^-2"), "bar": (1e5, "Pa")})
+    >>> 1 * u.mbar >> "Pa"
+    """
+    for name in definitions:
+        if not _Name.fullmatch(name):
+            raise Exception(f"Invalid unit name: {name}")
+    with RegistryLock:
+        table = GetUnitTable()
+        previous = {name: UnitEquivalencies.get(name) for name in definitions}
+        # (through dict methods: modifying a RegistryDict resets everything)
+        dict.update(
+            UnitEquivalencies,
+            {name: (float(coeff), unit) for name, (coeff, unit) in definitions.items()},
+        )
+        try:
+            changed = table.Update(definitions)
+        except Exception:
+            for name, definition in previous.items():
+                if definition is None:
+                    dict.pop(UnitEquivalencies, name)
+                else:
+                    dict.__setitem__(UnitEquivalencies, name, definition)
+            _ResetUnitTable()
+            raise
+        if changed:
+            UnitsChanged(changed)
+        if latex:
+            dict.update(LatexUnitMapping, latex)
+            # (`UnitLatex` substitutes the mapped names anywhere in a unit string)
+            for name in ("latex", "mpl_labels"):
+                if name in Caches:
+                    Caches[name].discard(lambda key: any(n in str(key) for n in latex))
+
+
+def define_unit(
+    name: str, value: float, unit: str = "", latex: Optional[str] = None
+) -> None:
+    """
+    Defines (or redefines) a unit as `value` times `unit` (see `define_units`).
+
+    Examples
+    --------
+    >>> define_unit("Jy", 1e-23, "erg sec^-1 cm^-2 Hz^-1")
+    >>> (3 * u.mJy * 1 * u.GHz) >> "erg sec^-1 cm^-2"
+    >>> define_unit("Lsun", 3.828e33, "erg sec^-1", latex="L_\\odot")
+    """
+    define_units({name: (value, unit)}, None if latex is None else {name: latex})
+
+
+def define_aliases(aliases: Dict[str, str]) -> None:
+    """
+    Defines alternative names of units (with the same LaTeX representation).
+
+    Examples
+    --------
+    >>> define_aliases({"s": "sec", "Angstrom": "1e-10 m"})
+    """
+    latex = {
+        a: LatexUnitMapping[u] for a, u in aliases.items() if u in LatexUnitMapping
+    }
+    define_units({alias: (1.0, unit) for alias, unit in aliases.items()}, latex)
+
+
+def define_alias(alias: str, unit: str) -> None:
+    """
+    Defines an alternative name of a unit (see `define_aliases`).
+    """
+    define_aliases({alias: unit})
+
+
+def define_constants(constants: Dict[str, Tuple[float, str]]) -> None:
+    """
+    Defines (or redefines) physical constants, available as `Constants.<name>`.
+
+    Changing `h`, `hbar`, `c` or `k_B` registers the built-in equivalencies
+    again (see `RegisterDefaultEquivalencies`).
+
+    Parameters
+    ----------
+    constants : dict
+        name -> (value, unit)
+    """
+    for name, (value, unit) in constants.items():
+        if not _Name.fullmatch(name):
+            raise Exception(f"Invalid constant name: {name}")
+        Quantity(value, unit)
+    with RegistryLock:
+        ConstantValues.update(constants)
+        for name in constants:
+            _ConstantQuantities.pop(name, None)
+        if not _EquivalencyConstants.isdisjoint(constants):
+            from .equivalencies import RegisterDefaultEquivalencies
+
+            RegisterDefaultEquivalencies()
+
+
+def define_constant(name: str, value: float, unit: str = "") -> None:
+    """
+    Defines (or redefines) a physical constant (see `define_constants`).
+
+    Examples
+    --------
+    >>> define_constant("m_n", 1.67492749804e-24, "g")
+    >>> c.m_n / c.m_p
+    """
+    define_constants({name: (value, unit)})
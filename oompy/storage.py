@@ -0,0 +1,167 @@
+"""
+Binary on-disk format for quantities and arrays of quantities.
+
+A file holds one quantity (or one array of quantities sharing a unit):
+
+    magic  b"\\x93OOMPY" + major/minor version bytes         (8 bytes)
+    length of the header, little-endian uint32             (4 bytes)
+    JSON header, space-padded to a multiple of 64 bytes
+    raw C-contiguous values
+
+The header records the unit, its dimension and CGS scale, the optional
+assumption, and the dtype and shape of the values, e.g.,
+
+    {"unit": "erg sec^-1", "dims": {"LENGTH": "2", "TIME": "-3", "MASS": "1"},
+     "scale": 1.0, "assumption": "Light", "dtype": "<f8", "shape": [1000000]}
+
+On loading, the unit is compiled again and checked against the recorded
+dimension and scale (so that a unit redefined since saving is not silently
+mistaken for the original). Assumptions other than the built-in ones are
+looked up among the assumptions with registered equivalencies. The values are
+memory-mapped by default: opening a file is instant whatever its size, and the
+values are paged in on demand.
+
+Examples
+--------
+>>> oompy.save("distances.oom", distances)
+>>> distances = oompy.load("distances.oom")  # memory-mapped QuantityArray
+"""
+
+import json
+import struct
+from enum import Enum
+from typing import Any, Dict, Optional, Union
+
+import numpy as np
+
+from .arrays import QuantityArray
+from .oom import Assumptions, Quantity, _isclose
+from .units import Unit
+
+MAGIC = b"\x93OOMPY"
+VERSION = (1, 0)
+ALIGNMENT = 64
+BlockSize = 1 << 20
+
+
+def _AssumptionName(assumption: Optional[Enum]) -> Optional[str]:
+    if assumption is None:
+        return None
+    elif isinstance(assumption, Assumptions):
+        return assumption.name
+    cls = type(assumption)
+    return f"{cls.__module__}:{cls.__qualname__}.{assumption.name}"
+
+
+def _Assumption(name: Optional[str]) -> Optional[Enum]:
+    if name is None:
+        return None
+    elif ":" not in name:
+        return Assumptions[name]
+    # only the assumptions with registered equivalencies (nothing is imported)
+    from .equivalencies import Equivalencies
+
+    for assumption in list(Equivalencies):
+        if _AssumptionName(assumption) == name:
+            return assumption
+    raise Exception(
+        f"Unknown assumption {name} (register its equivalencies before loading)"
+    )
+
+
+def _Dims(unit: Unit) -> Dict[str, str]:
+    return {t.name: str(p) for t, p in unit.base_type.items() if p != 0}
+
+
+def save(path: str, quantity: Union[Quantity, QuantityArray, list]) -> None:
+    """
+    Saves a `Quantity`, a `QuantityArray` or a list of quantities (converted to
+    the unit of the first one) to `path`.
+    """
+    if isinstance(quantity, list):
+        quantity = QuantityArray(quantity)
+    if isinstance(quantity, Quantity):
+        values = np.asarray(quantity.value, dtype=float)
+    elif isinstance(quantity, QuantityArray):
+        values = quantity.value
+    else:
+        raise Exception(f"Cannot save {type(quantity).__name__}")
+    if values.dtype.hasobject:
+        raise Exception("Cannot save values of dtype object")
+    header = {
+        "unit": str(quantity.unit),
+        "dims": _Dims(quantity.unit),
+        "scale": quantity.unit.scale,
+        "assumption": _AssumptionName(quantity.assumption),
+        "dtype": values.dtype.str,
+        "shape": list(values.shape),
+    }
+    text = json.dumps(header).encode("utf-8")
+    # the values start on an aligned offset (for memory mapping)
+    prefix = len(MAGIC) + 2 + 4
+    text += b" " * (-(prefix + len(text)) % ALIGNMENT)
+    with open(path, "wb") as f:
+        f.write(MAGIC + bytes(VERSION) + struct.pack("<I", len(text)) + text)
+        # written block by block (no full copy of non-contiguous/mapped values)
+        flat = values.reshape(-1) if values.flags.c_contiguous else values.flat
+        for start in range(0, values.size, BlockSize):
+            np.ascontiguousarray(flat[start : start + BlockSize]).tofile(f)
+
+
+def ReadHeader(path: str) -> Dict[str, Any]:
+    """
+    Header of a file written by `save` (with the offset of the values).
+    """
+    with open(path, "rb") as f:
+        magic = f.read(len(MAGIC) + 2)
+        if magic[: len(MAGIC)] != MAGIC:
+            raise Exception(f"{path}: not an oompy file")
+        if magic[len(MAGIC)] != VERSION[0]:
+            raise Exception(f"{path}: unsupported version {tuple(magic[len(MAGIC):])}")
+        (length,) = struct.unpack("<I", f.read(4))
+        header = json.loads(f.read(length).decode("utf-8"))
+    header["offset"] = len(MAGIC) + 2 + 4 + length
+    return header
+
+
+def load(path: str, mmap: bool = True) -> Union[Quantity, QuantityArray]:
+    """
+    Loads a quantity saved with `save`.
+
+    Parameters
+    ----------
+    path : str
+        file to load
+    mmap : bool
+        whether to memory-map the values (read-only) instead of reading them
+
+    Returns
+    -------
+    Quantity or QuantityArray
+        a `Quantity` if a single quantity was saved
+    """
+    header = ReadHeader(path)
+    unit = Unit(header["unit"])
+    if _Dims(unit) != header["dims"] or not _isclose(unit.scale, header["scale"]):
+        raise Exception(
+            f"{path}: unit {unit!s} is {_Dims(unit)} x {unit.scale}, "
+            f"but was saved as {header['dims']} x {header['scale']}"
+        )
+    dtype, shape = np.dtype(header["dtype"]), tuple(header["shape"])
+    assumption = _Assumption(header["assumption"])
+    if not shape:
+        with open(path, "rb") as f:
+            f.seek(header["offset"])
+            value = np.fromfile(f, dtype=dtype, count=1)[0].item()
+        return Quantity._new(value, unit, assumption)
+    if mmap and int(np.prod(shape)) > 0:
+        values = np.memmap(
+            path, dtype, "r", header["offset"], shape
+        )  # type: np.ndarray
+    else:
+        with open(path, "rb") as f:
+            f.seek(header["offset"])
+            values = np.fromfile(f, dtype=dtype, count=int(np.prod(shape)))
+        values = values.reshape(shape)
+    quantities = QuantityArray(values, unit)
+    return quantities if assumption is None else quantities >> assumption
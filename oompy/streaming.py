@@ -0,0 +1,341 @@
+"""
+Chunked unit conversion of large tabular files.
+
+Columns carry their units in the header, e.g., `flux [erg sec^-1 cm^-2]` or
+`wavelength [nm]` (a column without brackets is dimensionless). Files are
+streamed through generators in chunks of a fixed number of rows, and every
+column of a chunk is converted with a single precompiled `Converter` (one
+vectorized multiply, or a compiled equivalency under an assumption), so the
+memory use is bounded by the chunk size whatever the size of the file.
+
+Supported formats are CSV (first line is the header) and `.npy`: either a
+structured array (the field names are the headers) or a 2D array with the
+headers given explicitly. `.npy` inputs are memory-mapped, and outputs are
+written sequentially, chunk after chunk.
+
+Examples
+--------
+>>> ConvertFile(
+...     "spectra.csv", "spectra_eV.npy",
+...     {"wavelength": ("eV", Assumptions.Light), "flux": "W m^-2"},
+... )
+
+or from the command line:
+
+    oompy-convert spectra.csv spectra_eV.npy --to "wavelength=eV:Light" --to "flux=W m^-2"
+"""
+
+import argparse
+import itertools
+import os
+import re
+import struct
+from enum import Enum
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .converter import Converter
+from .oom import Assumptions
+
+Target = Union[str, Tuple[str, Optional[Enum]]]
+Chunk = List[np.ndarray]
+
+DefaultChunkSize = 1 << 20
+
+_HEADER = re.compile(r"^\s*(.*?)\s*(?:\[(.*)\])?\s*$")
+
+
+def ParseHeader(header: str) -> Tuple[str, str]:
+    """
+    Splits a column header into its name and unit.
+
+    Examples
+    --------
+    >>> ParseHeader("flux [erg sec^-1 cm^-2]")
+    ('flux', 'erg sec^-1 cm^-2')
+    """
+    match = _HEADER.match(header)
+    assert match is not None
+    name, unit = match.groups()
+    return name, " ".join((unit or "").split())
+
+
+def FormatHeader(name: str, unit: str) -> str:
+    return f"{name} [{unit}]" if unit else name
+
+
+def _IsNpy(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() == ".npy"
+
+
+def ReadChunks(
+    path: str,
+    chunksize: int = DefaultChunkSize,
+    headers: Optional[Sequence[str]] = None,
+    delimiter: str = ",",
+) -> Tuple[List[str], Iterator[Chunk]]:
+    """
+    Headers of a CSV/`.npy` file and a generator of its chunks (as lists of
+    columns).
+
+    Parameters
+    ----------
+    path : str
+        input file (`.npy` or delimited text)
+    chunksize : int
+        number of rows per chunk
+    headers : list of str, optional
+        headers of a plain 2D `.npy` array (or to override those of the file)
+    delimiter : str
+        delimiter of the text files
+    """
+    if _IsNpy(path):
+        data = np.load(path, mmap_mode="r")
+        if data.dtype.names is not None:
+            names = list(data.dtype.names)
+            columns = [lambda a, n=n: a[n] for n in names]
+        elif data.ndim == 2:
+            names = list(headers or [])
+            if len(names) != data.shape[1]:
+                raise Exception(f"{path}: {data.shape[1]} headers are required")
+            columns = [lambda a, i=i: a[:, i] for i in range(data.shape[1])]
+        else:
+            raise Exception(f"{path}: expected a structured or a 2D array")
+
+        rows = len(data)
+
+        def npy_chunks() -> Iterator[Chunk]:
+            for start in range(0, rows, chunksize):
+                # mapped chunk by chunk (and the columns copied out), so that the
+                # pages of the rows already processed are unmapped
+                block = np.load(path, mmap_mode="r")[start : start + chunksize]
+                yield [np.array(column(block)) for column in columns]
+
+        return list(headers or names), npy_chunks()
+
+    with open(path) as f:
+        names = [h.strip() for h in f.readline().split(delimiter)]
+
+    def text_chunks() -> Iterator[Chunk]:
+        with open(path) as f:
+            f.readline()
+            while True:
+                lines = list(itertools.islice(f, chunksize))
+                if not lines:
+                    break
+                # (the comment and blank lines are skipped, as by np.loadtxt)
+                lines = [line for line in lines if line.split("#", 1)[0].strip()]
+                if not lines:
+                    continue
+                block = np.loadtxt(lines, delimiter=delimiter, ndmin=2)
+                yield [block[:, i] for i in range(block.shape[1])]
+
+    return list(headers or names), text_chunks()
+
+
+def MakeConverters(
+    headers: Sequence[str], targets: Dict[str, Target]
+) -> Tuple[List[str], List[Optional[Converter]]]:
+    """
+    Output headers and the (precompiled) converter of every column (None for
+    the columns which are passed through).
+
+    Parameters
+    ----------
+    headers : list of str
+        input headers (with units)
+    targets : dict
+        column name -> target unit, or (target unit, assumption)
+    """
+    names = [ParseHeader(h)[0] for h in headers]
+    for name in targets:
+        if name not in names:
+            raise Exception(f"Unknown column: {name}")
+    out_headers, converters = [], []  # type: List[str], List[Optional[Converter]]
+    for header, name in zip(headers, names):
+        if name not in targets:
+            out_headers.append(header)
+            converters.append(None)
+            continue
+        target = targets[name]
+        unit, assumption = (target, None) if isinstance(target, str) else target
+        converter = Converter(ParseHeader(header)[1], unit, assumption)
+        out_headers.append(FormatHeader(name, " ".join(unit.split())))
+        converters.append(converter)
+    return out_headers, converters
+
+
+def ConvertChunks(
+    chunks: Iterable[Chunk], converters: Sequence[Optional[Converter]]
+) -> Iterator[Chunk]:
+    """
+    Converts every column of every chunk (lazily).
+    """
+    for chunk in chunks:
+        yield [
+            column if converter is None else converter(column)
+            for column, converter in zip(chunk, converters)
+        ]
+
+
+def WriteCSV(
+    path: str,
+    headers: Sequence[str],
+    chunks: Iterable[Chunk],
+    delimiter: str = ",",
+    fmt: str = "%.17g",
+) -> int:
+    """
+    Writes the chunks to a delimited text file as they come; returns the number
+    of rows.
+    """
+    rows = 0
+    with open(path, "w") as f:
+        f.write(delimiter.join(headers) + "\n")
+        for chunk in chunks:
+            np.savetxt(f, np.column_stack(chunk), delimiter=delimiter, fmt=fmt)
+            rows += len(chunk[0])
+    return rows
+
+
+def _NpyHeader(dtype: np.dtype, rows: int, size: int = 0) -> bytes:
+    # `.npy` (version 1.0) header, padded to `size` bytes at least (and to a
+    # multiple of 64 bytes)
+    text = repr(
+        {
+            "descr": np.lib.format.dtype_to_descr(dtype),
+            "fortran_order": False,
+            "shape": (rows,),
+        }
+    ).encode("latin1")
+    prefix = len(np.lib.format.magic(1, 0)) + 2
+    length = max(size, prefix + len(text) + 1)
+    length += -length % 64
+    text += b" " * (length - prefix - len(text) - 1) + b"\n"
+    return np.lib.format.magic(1, 0) + struct.pack("<H", len(text)) + text
+
+
+def WriteNpy(path: str, headers: Sequence[str], chunks: Iterable[Chunk]) -> int:
+    """
+    Writes the chunks as they come to a structured `.npy` file (whose field
+    names are the headers); returns the number of rows.
+
+    The header is written with a placeholder shape and rewritten once all the
+    rows are written (so that the input is read only once).
+    """
+    chunks = iter(chunks)
+    first = next(chunks, None)
+    if first is None:
+        dtype = np.dtype([(h, np.float64) for h in headers])
+    else:
+        dtype = np.dtype([(h, c.dtype) for h, c in zip(headers, first)])
+    placeholder = _NpyHeader(dtype, np.iinfo(np.int64).max)
+    written = 0
+    with open(path, "wb") as f:
+        f.write(placeholder)
+        for chunk in itertools.chain([] if first is None else [first], chunks):
+            block = np.empty(len(chunk[0]), dtype=dtype)
+            for header_name, column in zip(headers, chunk):
+                block[header_name] = column
+            block.tofile(f)
+            written += len(block)
+        f.seek(0)
+        f.write(_NpyHeader(dtype, written, len(placeholder)))
+    return written
+
+
+def ConvertFile(
+    src: str,
+    dst: str,
+    targets: Dict[str, Target],
+    chunksize: int = DefaultChunkSize,
+    headers: Optional[Sequence[str]] = None,
+    delimiter: str = ",",
+) -> List[str]:
+    """
+    Converts the columns of a CSV/`.npy` file chunk by chunk and writes the
+    result (CSV or structured `.npy`, from the extension of `dst`).
+
+    Parameters
+    ----------
+    src, dst : str
+        input and output files
+    targets : dict
+        column name -> target unit, or (target unit, assumption)
+    chunksize : int
+        number of rows held in memory at once
+    headers : list of str, optional
+        headers of a plain 2D `.npy` input
+
+    Returns
+    -------
+    list of str
+        headers of the output file
+    """
+    in_headers, chunks = ReadChunks(src, chunksize, headers, delimiter)
+    out_headers, converters = MakeConverters(in_headers, targets)
+    converted = ConvertChunks(chunks, converters)
+    try:
+        if _IsNpy(dst):
+            WriteNpy(dst, out_headers, converted)
+        else:
+            WriteCSV(dst, out_headers, converted, delimiter)
+    except BaseException:
+        # (no partial output is left behind)
+        if os.path.exists(dst):
+            os.remove(dst)
+        raise
+    return out_headers
+
+
+def ParseTarget(spec: str) -> Tuple[str, Target]:
+    """
+    Parses a command line target, `column=unit` or `column=unit:Assumption`.
+    """
+    name, _, target = spec.partition("=")
+    if not target:
+        raise argparse.ArgumentTypeError(f"Invalid target: {spec}")
+    unit, _, assumption = target.partition(":")
+    if not assumption:
+        return name.strip(), unit
+    try:
+        return name.strip(), (unit, Assumptions[assumption.strip()])
+    except KeyError:
+        raise argparse.ArgumentTypeError(f"Unknown assumption: {assumption}")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="oompy-convert",
+        description="Converts the columns of a CSV/.npy file with units in the headers, "
+        'e.g., "flux [erg sec^-1 cm^-2]", chunk by chunk.',
+    )
+    parser.add_argument("src", help="input file (.csv or .npy)")
+    parser.add_argument("dst", help="output file (.csv or .npy)")
+    parser.add_argument(
+        "--to",
+        dest="targets",
+        action="append",
+        type=ParseTarget,
+        default=[],
+        metavar="COLUMN=UNIT[:ASSUMPTION]",
+        help='target unit of a column, e.g., "flux=W m^-2" or "wavelength=eV:Light"',
+    )
+    parser.add_argument("--chunksize", type=int, default=DefaultChunkSize)
+    parser.add_argument("--headers", nargs="+", help="headers of a plain 2D .npy input")
+    parser.add_argument("--delimiter", default=",")
+    args = parser.parse_args(argv)
+    headers = ConvertFile(
+        args.src,
+        args.dst,
+        dict(args.targets),
+        args.chunksize,
+        args.headers,
+        args.delimiter,
+    )
+    print(f"{args.dst}: {', '.join(headers)}")
+
+
+if __name__ == "__main__":
+    main()
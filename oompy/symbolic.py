@@ -0,0 +1,223 @@
+"""
+Compilation of sympy formulas with units into vectorized NumPy kernels.
+
+The units of the symbols of a formula are attached once: the dimensions are
+checked symbolically (terms of a sum, arguments of exp/log/..., the requested
+output unit), and every constant and unit-conversion factor is folded into the
+numerical coefficients of the expression. The result is `lambdify`-ed into a
+plain NumPy function of raw arrays, so evaluating it has no per-element unit
+overhead at all.
+
+Examples
+--------
+>>> import sympy as sp
+>>> gamma, B, q_e, m_e, c = sp.symbols("gamma B q_e m_e c")
+>>> nu_syn = compile_formula(
+...     gamma**2 * q_e * B / (2 * sp.pi * m_e * c), {gamma: "", B: "G"}, "GHz"
+... )
+>>> nu_syn(np.logspace(1, 6, 10**8), 1e-3)  # in GHz
+"""
+
+from fractions import Fraction
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import sympy as sp  # type: ignore
+
+from .constants import ConstantValues
+from .converter import _Format, _Parse
+from .oom import Quantity
+from .ufuncs import ANGLE
+from .units import Unit
+
+Dims = Tuple[Fraction, ...]
+
+# functions preserving the dimension of their (first) argument
+_DimensionPreserving = (sp.Abs, sp.sign, sp.floor, sp.ceiling, sp.re, sp.im)
+# functions which accept angles or dimensionless arguments (as
+# `ufuncs.TRIGONOMETRIC`; the angles are in radians once folded into CGS)
+_Trigonometric = (sp.sin, sp.cos, sp.tan, sp.cot, sp.sec, sp.csc)
+
+
+def _Dimensionless() -> Dims:
+    return Unit("").dims
+
+
+def _Fraction(number: Any) -> Fraction:
+    if number.is_Rational:
+        return Fraction(int(number.p), int(number.q))
+    return Fraction(float(number)).limit_denominator(1000)
+
+
+def _Name(dims: Dims) -> str:
+    from .units import Type
+
+    return str({t: p for t, p in zip(Type, dims) if p != 0})
+
+
+def CheckDimensions(expr: Any, dims: Dict[Any, Dims]) -> Dims:
+    """
+    Dimension of a sympy expression given those of its symbols (raises if the
+    expression is dimensionally inconsistent).
+    """
+    if expr.is_Symbol:
+        return dims[expr]
+    elif expr.is_Number or expr.is_NumberSymbol:
+        return _Dimensionless()
+    elif expr.is_Mul:
+        result = _Dimensionless()
+        for arg in expr.args:
+            result = tuple(a + b for a, b in zip(result, CheckDimensions(arg, dims)))
+        return result
+    elif expr.is_Pow:
+        base, exponent = expr.args
+        if CheckDimensions(exponent, dims) != _Dimensionless():
+            raise Exception(f"Dimensional exponent in {expr}")
+        base_dims = CheckDimensions(base, dims)
+        if base_dims == _Dimensionless():
+            return base_dims
+        if not exponent.is_Number:
+            raise Exception(f"Dimensional base raised to a symbolic power in {expr}")
+        power = _Fraction(exponent)
+        return tuple(d * power for d in base_dims)
+    elif expr.is_Add or isinstance(expr, (sp.Min, sp.Max)):
+        terms = [CheckDimensions(arg, dims) for arg in expr.args]
+        for term, arg in zip(terms[1:], expr.args[1:]):
+            if term != terms[0]:
+                raise Exception(
+                    f"Cannot add {expr.args[0]} {_Name(terms[0])} and {arg} {_Name(term)}"
+                )
+        return terms[0]
+    elif isinstance(expr, _DimensionPreserving):
+        return CheckDimensions(expr.args[0], dims)
+    elif isinstance(expr, _Trigonometric):
+        if CheckDimensions(expr.args[0], dims) not in (_Dimensionless(), ANGLE):
+            raise Exception(f"Argument of {expr} is neither an angle nor dimensionless")
+        return _Dimensionless()
+    elif isinstance(expr, sp.Function):
+        for arg in expr.args:
+            if CheckDimensions(arg, dims) != _Dimensionless():
+                raise Exception(f"Dimensional argument in {expr}")
+        return _Dimensionless()
+    raise Exception(f"Unsupported expression: {expr}")
+
+
+class CompiledFormula:
+    """
+    NumPy kernel compiled from a sympy formula with units (see
+    `compile_formula`).
+
+    Attributes
+    ----------
+    args : list of sympy.Symbol
+        arguments of the kernel, in order
+    units : list of str
+        units in which the arguments are expected
+    unit : str
+        unit of the result
+    expr : sympy.Expr
+        the formula with all the constants and conversion factors folded in,
+        i.e., evaluated by the kernel
+    """
+
+    def __init__(
+        self,
+        args: List[Any],
+        units: List[Tuple[float, Unit]],
+        unit: str,
+        expr: Any,
+        func: Callable,
+    ) -> None:
+        self.args, self.unit, self.expr = args, unit, expr
+        self.units = [_Format(coeff, u) for coeff, u in units]
+        self._units = units
+        self._func = func
+
+    def __repr__(self) -> str:
+        args = ", ".join(f"{a} [{u}]" for a, u in zip(self.args, self.units))
+        return f"CompiledFormula({args} -> [{self.unit}]: {self.expr})"
+
+    def __call__(self, *values: Any) -> Any:
+        """
+        Evaluates the formula on raw values (numbers or arrays, broadcast
+        together) in the units of the arguments; `Quantity`/`QuantityArray`
+        arguments are converted first. Returns raw values in `unit`.
+        """
+        if len(values) != len(self.args):
+            raise TypeError(f"Expected {len(self.args)} arguments, got {len(values)}")
+        values = tuple(
+            v.value * v.unit.factor_to(u) / coeff if hasattr(v, "unit") else v
+            for v, (coeff, u) in zip(values, self._units)
+        )
+        return self._func(*values)
+
+
+def compile_formula(
+    expr: Any,
+    units: Dict[Any, Union[str, Unit, Quantity]],
+    unit: Union[str, Unit] = "",
+    modules: Optional[Union[str, List]] = "numpy",
+) -> CompiledFormula:
+    """
+    Compiles a sympy formula with units into a vectorized function of raw values.
+
+    Parameters
+    ----------
+    expr : sympy.Expr
+        the formula
+    units : dict
+        symbol (or its name) -> unit (str) for the arguments of the function, or
+        -> `Quantity` for constants; the remaining symbols named after the
+        constants of oompy (e.g., `c`, `m_e`, `q_e`) are taken to be those
+    unit : str
+        unit of the result
+    modules : str or list
+        passed to `sympy.lambdify`
+
+    Returns
+    -------
+    CompiledFormula
+        function of the arguments (raw values in their units, in the order of
+        `units`) returning the raw values of the formula in `unit`
+
+    Examples
+    --------
+    >>> T, m, k_B = sp.symbols("T m k_B")
+    >>> v_th = compile_formula(sp.sqrt(k_B * T / m), {T: "K", m: "amu"}, "km sec^-1")
+    >>> v_th(np.array([1e4, 1e6]), 1.0)
+    """
+    symbols = {s.name: s for s in expr.free_symbols}
+    args, arg_units = [], []  # type: List[Any], List[Tuple[float, Unit]]
+    dims, values = {}, {}  # type: Dict[Any, Dims], Dict[Any, Any]
+    for key, spec in units.items():
+        symbol = symbols.get(key) if isinstance(key, str) else key
+        if symbol is None:
+            raise Exception(f"Unknown symbol: {key}")
+        if isinstance(spec, Quantity):
+            dims[symbol] = spec.unit.dims
+            values[symbol] = sp.Float(spec.cgs.value)
+            continue
+        coeff, arg_unit = _Parse(spec)
+        dims[symbol] = arg_unit.dims
+        values[symbol] = coeff * arg_unit.scale * symbol
+        args.append(symbol)
+        arg_units.append((coeff, arg_unit))
+    for symbol in expr.free_symbols - set(dims):
+        if symbol.name not in ConstantValues:
+            raise Exception(f"No unit given for {symbol} (and no such constant)")
+        constant = Quantity(*ConstantValues[symbol.name])
+        dims[symbol] = constant.unit.dims
+        values[symbol] = sp.Float(constant.cgs.value)
+
+    coeff, target = _Parse(unit)
+    result_dims = CheckDimensions(expr, dims)
+    if result_dims != target.dims:
+        raise Exception(
+            f"Cannot convert from {_Name(result_dims)} to {_Name(target.dims)}"
+        )
+    # everything in CGS, then to the target unit: the numerical factors combine
+    folded = sp.expand_power_base(expr.xreplace(values) / (coeff * target.scale))
+    folded = folded.xreplace(
+        {n: sp.Float(n.evalf()) for n in folded.atoms(sp.NumberSymbol)}
+    )
+    func = sp.lambdify(args, folded, modules=modules)
+    return CompiledFormula(args, arg_units, str(unit), folded, func)
@@ -0,0 +1,188 @@
+"""
+LaTeX/Markdown tables of quantities.
+
+Every column is converted to a single unit (one vectorized conversion), which
+goes to the header; the unit is rendered once (and cached), the values are
+formatted in vectorized batches, and the rows are streamed to the output chunk
+by chunk.
+
+Values follow the format of `Quantity.value_latex`: 5 decimals, in scientific
+notation outside of [0.001, 9999].
+
+Examples
+--------
+>>> write_table(
+...     "results.tex",
+...     {"M": masses, "R": radii, "L": luminosities},
+...     units={"R": "Rsun", "L": "erg sec^-1"},
+...     fmt="latex",
+... )
+"""
+
+import io
+import itertools
+import re
+from typing import IO, Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .arrays import QuantityArray
+from .oom import Quantity, UnitLatex
+
+Column = Union[QuantityArray, Sequence[Quantity], np.ndarray]
+
+DefaultChunkSize = 10000
+
+
+# exponents of "%.5e": e+00 is dropped, e+05 -> \cdot 10^{5}, e-05 -> \cdot 10^{-5}
+_ZeroExponent = re.compile(r"e[+-]00(?!\d)")
+_Exponent = re.compile(r"e\+0*(\d+)")
+_NegativeExponent = re.compile(r"e-0*(\d+)")
+
+
+def FormatValues(values: Any, latex: bool = True) -> List[str]:
+    """
+    Formats an array of values (as `Quantity.value_latex` does for one value).
+
+    The whole batch is formatted with a single %-formatting of a joined format
+    string, and the exponents are rewritten with regular expressions.
+
+    Parameters
+    ----------
+    values : array_like
+        values to format
+    latex : bool
+        whether to write the powers of 10 as "\\cdot 10^{n}" (or as "e+n")
+
+    Returns
+    -------
+    list of str
+        formatted values (of the flattened array)
+    """
+    values = np.ravel(np.asarray(values, dtype=float))
+    if not len(values):
+        return []
+    scientific = ((values < 0.001) | (values > 9999)) & np.isfinite(values)
+    formats = np.where(scientific, "%.5e", "%.5f").tolist()
+    text = "\n".join(formats) % tuple(values.tolist())
+    if latex and scientific.any():
+        text = _ZeroExponent.sub("", text)
+        text = _Exponent.sub(r"\\cdot 10^{\1}", text)
+        text = _NegativeExponent.sub(r"\\cdot 10^{-\1}", text)
+    return text.split("\n")
+
+
+def _Column(column: Column, unit: Optional[str]) -> Tuple[np.ndarray, str]:
+    # raw values (in a single unit) and the unit of a column
+    if not isinstance(column, QuantityArray):
+        if len(column) and isinstance(column[0], Quantity):
+            column = QuantityArray(column)
+        elif unit:
+            raise Exception(f"Cannot convert plain values to {unit}")
+        else:
+            return np.ravel(np.asarray(column, dtype=float)), ""
+    if unit is not None:
+        column = column >> unit
+    return np.ravel(column.value), str(column.unit)
+
+
+def _Header(name: str, unit: str, latex: bool) -> str:
+    if not unit:
+        return name
+    return f"{name} [${UnitLatex(unit)}$]" if latex else f"{name} [{unit}]"
+
+
+def TableRows(
+    columns: Dict[str, Column],
+    units: Optional[Dict[str, str]] = None,
+    fmt: str = "markdown",
+    chunksize: int = DefaultChunkSize,
+) -> Iterator[str]:
+    """
+    Generator of the lines of a table (header, rows in chunks, footer).
+
+    Parameters
+    ----------
+    columns : dict
+        column name -> `QuantityArray`, sequence of quantities or plain array
+    units : dict, optional
+        column name -> unit to convert the column to
+    fmt : str
+        "markdown" or "latex"
+    chunksize : int
+        number of rows formatted at once
+    """
+    if fmt not in ("markdown", "latex"):
+        raise Exception(f"Unknown table format: {fmt}")
+    latex = fmt == "latex"
+    units = units or {}
+    data, headers = [], []  # type: List[np.ndarray], List[str]
+    for name, column in columns.items():
+        values, unit = _Column(column, units.get(name))
+        data.append(values)
+        headers.append(_Header(name, unit, latex))
+    rows = len(data[0]) if data else 0
+    if any(len(values) != rows for values in data):
+        raise Exception("All the columns must have the same length")
+
+    if latex:
+        yield "\\begin{tabular}{" + "c" * len(headers) + "}"
+        yield "\\hline"
+        yield " & ".join(headers) + " \\\\"
+        yield "\\hline"
+        start, separator, end = "$", "$ & $", "$ \\\\"
+    else:
+        yield "| " + " | ".join(headers) + " |"
+        yield "|" + "|".join("---" for _ in headers) + "|"
+        start, separator, end = "| ", " | ", " |"
+    for first in range(0, rows, chunksize):
+        cells = [FormatValues(v[first : first + chunksize], latex) for v in data]
+        for row in zip(*cells):
+            yield start + separator.join(row) + end
+    if latex:
+        yield "\\hline"
+        yield "\\end{tabular}"
+
+
+def write_table(
+    file: Union[str, IO[str]],
+    columns: Dict[str, Column],
+    units: Optional[Dict[str, str]] = None,
+    fmt: str = "markdown",
+    chunksize: int = DefaultChunkSize,
+) -> None:
+    """
+    Streams a LaTeX/Markdown table of quantities to a file (a path or an open
+    text file); see `TableRows` for the parameters.
+    """
+    if isinstance(file, str):
+        with open(file, "w") as f:
+            write_table(f, columns, units, fmt, chunksize)
+        return
+    lines = TableRows(columns, units, fmt, chunksize)
+    while True:
+        chunk = list(itertools.islice(lines, chunksize))
+        if not chunk:
+            break
+        file.write("\n".join(chunk) + "\n")
+
+
+def format_table(
+    columns: Dict[str, Column],
+    units: Optional[Dict[str, str]] = None,
+    fmt: str = "markdown",
+) -> str:
+    """
+    LaTeX/Markdown table of quantities as a string (see `TableRows`).
+
+    Examples
+    --------
+    >>> print(format_table({"d": [1 * u.pc, 2 * u.ly]}, units={"d": "ly"}))
+    | d [ly] |
+    |---|
+    | 3.26156 |
+    | 2.00000 |
+    """
+    out = io.StringIO()
+    write_table(out, columns, units, fmt)
+    return out.getvalue()
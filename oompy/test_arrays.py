@@ -0,0 +1,82 @@
+import numpy as np
+
+from oompy import Units as u, Constants as c, Assumptions as assume, Quantity
+from oompy import QuantityArray, Unit
+
+
+def test_construction():
+    lengths = QuantityArray([1 * u.ft, 2 * u.m, 0.5 * u.km])
+    assert lengths.unit == "ft" and lengths.shape == (3,)
+    assert np.all(lengths == [1 * u.ft, 2 * u.m, 500 * u.m])
+    assert isinstance(np.array([1, 2, 3]) * u.erg, QuantityArray)
+    assert isinstance(u.erg * np.array([1, 2, 3]), QuantityArray)
+    assert QuantityArray([1, 2], "1e3 m").unit == "m"
+    assert np.all(QuantityArray([1, 2], "1e3 m").value == [1000, 2000])
+
+
+def test_arithmetic():
+    x = QuantityArray(np.arange(1.0, 4.0), "km")
+    assert np.all((x + 1 * u.m).value == [1.001, 2.001, 3.001])
+    assert np.all((1 * u.m + x).value == [1001, 2001, 3001])
+    assert np.all((x - x).value == 0)
+    assert (x / u.hr).unit == "km hr^-1"
+    assert (x**2).unit == "km^2"
+    assert np.all((1 / x).value == [1, 0.5, 1 / 3])
+    assert (x * x / x == x).all()
+
+
+def test_conversion():
+    x = QuantityArray(np.logspace(0, 3, 4), "pc")
+    y = x >> "ly"
+    assert y.unit == "ly"
+    assert np.all(y == [q >> "ly" for q in x])
+    assert np.all(x.cgs.value == x.value * u.pc.unit.scale)
+    freqs = QuantityArray([1.0, 5.0], "GHz")
+    assert np.all(
+        (freqs >> assume.Light >> "cm")
+        == [(f >> assume.Light >> "cm") for f in [1 * u.GHz, 5 * u.GHz]]
+    )
+    assert freqs.assumption is None
+
+
+def test_comparisons_and_reductions():
+    x = QuantityArray([1.0, 2.0, 3.0], "m")
+    assert np.all((x < 2 * u.m) == [True, False, False])
+    assert np.all((x >= 200 * u.cm) == [False, True, True])
+    assert x.sum() == 6 * u.m
+    assert x.mean() == 2 * u.m
+    assert x.min() == 100 * u.cm and x.max() == 3 * u.m
+    assert isinstance(x[0], Quantity) and isinstance(x[1:], QuantityArray)
+    assert QuantityArray(np.ones((2, 3)), "m").sum(axis=0).shape == (3,)
+    assert ~x == ~u.m
+
+
+def test_parse_many():
+    strings = ["1 km", "2 mi", "3e5 cm", "4*ft", "ly", "  5  "]
+    lengths = Quantity.parse_many(strings[:5], "m")
+    assert lengths.unit == "m" and lengths.shape == (5,)
+    assert np.all(lengths == [Quantity(s) for s in strings[:5]])
+    groups, indices = Quantity.parse_many(strings, return_indices=True)
+    assert list(groups) == ["km", "mi", "cm", "ft", "ly", ""]
+    assert np.all(groups[Unit("")].value == [5])
+    assert np.all(indices[Unit("km")] == [0])
+    grid = Quantity.parse_many(
+        np.array([["1 GHz", "1 keV"], ["1 nm", "2 nm"]]), "nm", assume.Light
+    )
+    assert grid.shape == (2, 2)
+    assert grid[0, 1] == Quantity("1 keV") >> assume.Light >> "nm"
+    assert np.all(
+        Quantity.parse_many(["1 km", "1e3 m", "2 km"])[Unit("km")]
+        == np.array([1, 2]) * u.km
+    )
+
+
+def test_parse_many_matches_scalar():
+    strings = ["5", "5 ", "1e3", "5.", "inf cm", "-INF cm", "Infinity cm"]
+    strings += ["nan cm", "-1_000 m", ".5 m", "2*km", "km", " 3 km/sec ", "1. cm"]
+    groups, indices = Quantity.parse_many(strings, return_indices=True)
+    for unit, group in groups.items():
+        for value, i in zip(group.value, indices[unit]):
+            q = Quantity(strings[i])
+            assert q.unit == unit
+            assert value == q.value or np.isnan(value) and np.isnan(q.value)
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+import oompy
+from oompy import Units as u, QuantityArray
+
+
+@oompy.units_checked(B="G", n="cm^-3", returns="erg cm^-3")
+def energy_density(B, n=1.0):
+    return B**2 / (8 * np.pi) + n * 1.6e-12
+
+
+def test_units_checked():
+    from oompy.cache import Caches
+
+    expected = energy_density(1e-3, 1e-6)
+    assert expected.unit == "erg cm^-3"
+    assert energy_density(1 * u.mG, 1 * u.m**-3) == expected
+    hits = Caches["signatures"].hits
+    assert energy_density(n=1 * u.m**-3, B=1 * u.mG) == expected
+    assert Caches["signatures"].hits == hits + 1
+    assert energy_density(1e-3 * u.G).value == energy_density(1e-3, 1.0).value
+    densities = energy_density(QuantityArray([1.0, 2.0], "G"), 0.0)
+    assert isinstance(densities, QuantityArray)
+    assert np.allclose(densities.value, [1 / (8 * np.pi), 4 / (8 * np.pi)])
+    with pytest.raises(Exception):
+        energy_density(1 * u.km, 1 * u.cm**-3)
+
+
+def test_units_checked_returns():
+    @oompy.units_checked(T="1e3 K", returns=("eV", "1e3 K"))
+    def thermal(T):
+        return 8.617333262e-2 * T, T
+
+    energy, temperature = thermal(2000 * u.K)
+    assert np.isclose(energy.value, 0.17234666524) and temperature == 2000 * u.K
+    assert oompy.units_checked(x="m")(lambda x: x)(1 * u.km) == 1000.0
+    with pytest.raises(TypeError):
+        oompy.units_checked(y="m")(lambda x: x)
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+import oompy
+from oompy import Units as u, Assumptions as assume, QuantityArray
+
+
+def test_converter():
+    to_km = oompy.converter("au", "km")
+    assert to_km.factor == u.au.unit.factor_to(u.km.unit)
+    assert to_km(2.0) == ((2 * u.au) >> "km").value
+    assert np.allclose(to_km(np.arange(3.0)), np.arange(3.0) * to_km.factor)
+    assert to_km(1 * u.pc) == (1 * u.pc) >> "km"
+    assert to_km(1 * u.pc).unit == "km"
+    lengths = to_km(QuantityArray([1.0, 2.0], "pc"))
+    assert isinstance(lengths, QuantityArray) and lengths.unit == "km"
+    assert np.all(lengths == [1 * u.pc, 2 * u.pc])
+    with pytest.raises(Exception):
+        oompy.converter("au", "sec")
+
+
+def test_converter_coefficients():
+    to_Mm = oompy.converter("1e-3 km", "1e3 km")
+    assert np.isclose(to_Mm(1e6), 1.0, rtol=1e-12)
+    assert to_Mm(1e6 * u.m) == 1e3 * u.km
+
+
+def test_converter_assuming():
+    to_eV = oompy.converter("nm", "eV", assume.Light)
+    assert to_eV.factor is None
+    assert to_eV(500.0) == ((500 * u.nm) >> assume.Light >> "eV").value
+    assert to_eV(0.5 * u.um) == (0.5 * u.um) >> assume.Light >> "eV"
+    energies = to_eV(QuantityArray([500.0, 1000.0], "nm"))
+    assert np.allclose(energies.value, [to_eV(500.0), to_eV(1000.0)], rtol=1e-12)
+    to_K = oompy.converter("1e3 eV", "K", assume.Thermal)
+    assert to_K(1.0) == ((1 * u.keV) >> assume.Thermal >> "K").value
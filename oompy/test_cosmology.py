@@ -0,0 +1,136 @@
+import math
+import numpy as np
+from scipy.integrate import quad  # type: ignore
+
+from oompy import Units as u, Constants as c, Assumptions as assume, Quantity
+import oompy
+from oompy import QuantityArray
+from oompy.cache import Caches
+from oompy.cosmology import (
+    ComovingDistanceTable,
+    Cosmology,
+    GetComovingDistanceTable,
+    TableSize,
+)
+
+
+def quad_distance(z, om=0.315, ol=0.685):
+    integrand = lambda x: 1 / math.sqrt(om * (1 + x) ** 3 + ol)
+    return quad(integrand, 0, z, epsabs=0, epsrel=1e-13, limit=200)[0]
+
+
+def test_table_accuracy():
+    redshifts = np.concatenate([np.logspace(-5, 3.5, 40), [0.5, 1, 2, 5]])
+    reference = np.array([quad_distance(z) for z in redshifts])
+    for rtol in [1e-6, 1e-9, 1e-12]:
+        table = ComovingDistanceTable(0.315, 0.685, TableSize(rtol))
+        assert np.all(np.abs(table.Distance(redshifts) / reference - 1) < rtol)
+        assert np.all(np.abs(table.Redshift(reference) / redshifts - 1) < 1e-12)
+        assert np.all(
+            np.abs(table.Redshift(reference, refine=False) / redshifts - 1) < 100 * rtol
+        )
+    table = ComovingDistanceTable(0.315, 0.685, 64)
+    assert np.all(np.abs(table.Distance(redshifts, exact=True) / reference - 1) < 1e-13)
+
+
+def test_table_cache():
+    table = GetComovingDistanceTable(0.3, 0.7, 1e-8, 1e4)
+    assert GetComovingDistanceTable(0.3, 0.7, 1e-8, 1e4) is table
+    assert GetComovingDistanceTable(0.25, 0.75, 1e-8, 1e4) is not table
+    sizes = {name: cache.maxsize for name, cache in Caches.items()}
+    oompy.cache.SetCacheSize(4)
+    try:
+        for name, cache in Caches.items():
+            assert cache.maxsize == (16 if name == "comoving_tables" else 4)
+    finally:
+        for name, size in sizes.items():
+            Caches[name].resize(size)
+
+
+def test_beyond_table():
+    # continued by direct quadrature beyond z_max
+    table = ComovingDistanceTable(0.315, 0.685, TableSize(1e-12), z_max=10)
+    redshifts = np.array([5.0, 10.0, 10.5, 50.0, 3000.0])
+    reference = np.array([quad_distance(z) for z in redshifts])
+    assert np.all(np.abs(table.Distance(redshifts) / reference - 1) < 1e-12)
+    assert np.all(np.abs(table.Redshift(reference) / redshifts - 1) < 1e-10)
+    hubble = (c.c / c.H_0 >> "Gpc").value
+    distance = Quantity(1e6, "") >> assume.Redshift >> "Gpc"
+    # (log-spaced breakpoints: the integrand spans many decades)
+    integrand = lambda x: math.exp(x) / math.sqrt(0.315 * math.exp(3 * x) + 0.685)
+    points = np.arange(1.0, math.log1p(1e6))
+    expected = quad(integrand, 0, math.log1p(1e6), points=points, limit=200)[0]
+    assert abs(distance.value / (hubble * expected) - 1) < 1e-12
+    z = distance >> assume.Redshift >> ""
+    assert abs(z.value / 1e6 - 1) < 1e-6
+
+
+def test_age():
+    # non-flat: the curvature matters at high redshift
+    om, ol = 0.3, 0.5
+    table = ComovingDistanceTable(om, ol, TableSize(1e-12), z_max=1e3)
+    E = lambda x: math.sqrt(om * (1 + x) ** 3 + (1 - om - ol) * (1 + x) ** 2 + ol)
+    for z in (0.0, 2.0, 999.0, 1e3, 1e4, 1e8):
+        # (in a = 1/(1+z): int_0^a da / (a E))
+        a = 1 / (1 + z)
+        expected = quad(lambda b: 1 / (b * E(1 / b - 1)), 0, a, epsabs=0, epsrel=1e-13)[
+            0
+        ]
+        for exact in (False, True):
+            assert abs(table.Age(z, exact) / expected - 1) < 1e-12
+
+
+def test_redshift_arrays():
+    redshifts = QuantityArray([0.1, 1.0, 5.0])
+    distances = redshifts >> assume.Redshift >> "Gpc"
+    assert isinstance(distances, QuantityArray) and distances.unit == "Gpc"
+    hubble = (c.c / c.H_0 >> "Gpc").value
+    assert np.allclose(
+        distances.value,
+        [hubble * quad_distance(z) for z in redshifts.value],
+        rtol=1e-12,
+    )
+    assert np.all((distances >> assume.Redshift >> "") == redshifts)
+    assert (Quantity(1, "") >> assume.Redshift >> "Gpc") == distances[1]
+
+
+def test_cosmology():
+    om, ol, H_0 = 0.3, 0.5, 70 * u.km / u.sec / u.Mpc
+    cosmology = Cosmology(H_0, om, ol)
+    E = lambda x: math.sqrt(om * (1 + x) ** 3 + (1 - om - ol) * (1 + x) ** 2 + ol)
+    hubble_distance = (c.c / H_0 >> "Mpc").value
+    hubble_time = (1 / H_0 >> "Gyr").value
+    redshifts = np.array([0.01, 0.5, 2.0, 100.0])
+    D_C = np.array([quad(lambda x: 1 / E(x), 0, z)[0] for z in redshifts])
+    D_M = hubble_distance * np.sinh(math.sqrt(0.2) * D_C) / math.sqrt(0.2)
+    D_L = cosmology.luminosity_distance(redshifts)
+    assert isinstance(D_L, QuantityArray) and D_L.unit == "Mpc"
+    assert np.allclose(D_L.value, (1 + redshifts) * D_M, rtol=1e-10)
+    D_A = cosmology.angular_diameter_distance(QuantityArray(redshifts), "Gpc")
+    assert np.allclose(D_A.value, 1e-3 * D_M / (1 + redshifts), rtol=1e-10)
+    modulus = cosmology.distance_modulus(redshifts).value
+    assert np.allclose(modulus, 5 * np.log10((1 + redshifts) * D_M * 1e5))
+
+    inverse = lambda x: 1 / ((1 + x) * E(x))
+    lookback = np.array([quad(inverse, 0, z)[0] for z in redshifts])
+    assert np.allclose(
+        cosmology.lookback_time(redshifts).value, hubble_time * lookback, rtol=1e-10
+    )
+    age = cosmology.age(0)
+    assert isinstance(age, Quantity)
+    assert abs(age.value / (hubble_time * quad(inverse, 0, np.inf)[0]) - 1) < 1e-8
+
+
+def test_register_cosmology():
+    from oompy.equivalencies import RegisterDefaultEquivalencies
+
+    cosmology = Cosmology(70, 0.3, 0.7)
+    try:
+        cosmology.register()
+        distances = QuantityArray([1.0, 2.0]) >> assume.Redshift >> "Gpc"
+        expected = cosmology.comoving_distance([1, 2], "Gpc")
+        assert np.allclose(distances.value, expected.value, rtol=1e-14)
+    finally:
+        RegisterDefaultEquivalencies()
+    distance = Quantity(1, "") >> assume.Redshift >> "Mpc"
+    assert distance == Cosmology().comoving_distance(1)
@@ -0,0 +1,55 @@
+from enum import Enum
+import numpy as np
+import pytest
+
+from oompy import Units as u, Constants as c, Assumptions as assume, QuantityArray
+from oompy.cache import Caches
+from oompy.equivalencies import AddEquivalency, CompileEquivalency, Equivalencies
+
+
+class Doppler(Enum):
+    Radio = 0
+
+
+def test_builtin_equivalencies():
+    assert ((1 * u.eV) >> assume.Light >> "Hz") == (1 * u.eV / c.h) >> "Hz"
+    assert ((1 * u.eV) >> assume.Light >> "cm") == (c.h * c.c / u.eV) >> "cm"
+    assert ((6000 * u.K) >> assume.Thermal >> "eV") == (6000 * u.K * c.k_B) >> "eV"
+    # multi-step path: angular frequency -> energy -> frequency
+    nu = (1 * u.rad / u.sec) >> assume.Light >> "Hz"
+    assert np.isclose(nu.value, 1 / (2 * np.pi), rtol=1e-8)
+    with pytest.raises(Exception):
+        (1 * u.K) >> assume.Light >> "eV"
+
+
+def test_compiled_cache():
+    cache = Caches["equivalencies"]
+    convert = CompileEquivalency(assume.Light, u.nm.unit, u.eV.unit)
+    hits = cache.hits
+    assert CompileEquivalency(assume.Light, u.nm.unit, u.eV.unit) is convert
+    assert cache.hits == hits + 1
+    wavelengths = np.array([100.0, 500.0, 1000.0])
+    assert np.allclose(
+        convert(wavelengths),
+        [((w * u.nm) >> assume.Light >> "eV").value for w in wavelengths],
+        rtol=1e-12,
+    )
+
+
+def test_custom_assumption():
+    nu0 = (1420.405751 * u.MHz).value
+    AddEquivalency(
+        Doppler.Radio,
+        "MHz",
+        "km sec^-1",
+        lambda nu: (c.c >> "km sec^-1").value * (1 - nu / nu0),
+        lambda v: nu0 * (1 - v / (c.c >> "km sec^-1").value),
+    )
+    try:
+        assert ((nu0 * u.MHz) >> Doppler.Radio >> "km sec^-1").value == 0
+        velocities = QuantityArray([1.42, 1.41], "GHz") >> Doppler.Radio >> "m sec^-1"
+        assert velocities.unit == "m sec^-1" and velocities.shape == (2,)
+        back = velocities >> Doppler.Radio >> "GHz"
+        assert np.allclose(back.value, [1.42, 1.41], rtol=1e-12)
+    finally:
+        del Equivalencies[Doppler.Radio]
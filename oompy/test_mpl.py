@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+from oompy import Units as u, QuantityArray, matplotlib_support
+
+matplotlib = pytest.importorskip("matplotlib")
+matplotlib.use("Agg")
+
+
+def test_mpl():
+    import matplotlib.pyplot as plt
+    from oompy.mpl import MplUnitConverter
+
+    matplotlib_support()
+    fig, ax = plt.subplots()
+    ax.plot([10 * u.cm, 2.5 * u.ft], np.array([1.0, 2.0]) * u.Msun)
+    ax.plot(QuantityArray([1.0], "m"), QuantityArray([1.0], "Msun"))
+    assert ax.xaxis.get_units() == "cm" and ax.get_xlabel() == r"$\text{cm}$"
+    assert np.allclose(ax.lines[0].get_xdata(orig=False), [10.0, 76.2])
+    assert np.allclose(ax.lines[1].get_xdata(orig=False), [100.0])
+    plt.close(fig)
+
+    series = np.array([1 * u.km, 2 * u.m], dtype=object)
+    assert np.allclose(MplUnitConverter.convert(series, "m", None), [1000.0, 2.0])
+    with pytest.raises(Exception):
+        MplUnitConverter.convert([1 * u.km, 2 * u.sec], "m", None)
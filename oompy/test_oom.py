@@ -1,4 +1,4 @@
-from oompy import Units as u, Constants as c, Assumptions as assume, Quantity
+from oompy import Units as u, Constants as c, Assumptions as assume, Quantity, Unit
 
 
 def test_constants():
@@ -36,13 +36,17 @@ def test_units():
 
 
 def test_assumptions():
-    assert (5 * u.GHz >> assume.Light >> "cm") == 5.995849160000001 * u.cm
-    assert (
-        6000 * u.K >> assume.Thermal >> "eV" >> assume.Light >> "nm"
-        == 2397.95920462134 * u.nm
-    )
-    assert (Quantity(1, "") >> assume.Redshift >> "pc") == 3396224009.3212013 * u.pc
-    assert (5 * u.Gpc >> assume.Redshift >> "") == 1.8018944589315433
+    # (compiled from the CGS formulas of the equivalencies: equal to the
+    # expressions with the constants up to the last bits)
+    l = 5 * u.GHz >> assume.Light >> "cm"
+    assert l.unit == "cm" and abs(l - 5.995849160000001 * u.cm) / l < 1e-15
+    l = 6000 * u.K >> assume.Thermal >> "eV" >> assume.Light >> "nm"
+    assert l.unit == "nm" and abs(l - 2397.95920462134 * u.nm) / l < 1e-15
+    # (the redshift conversions are tabulated, to `cosmology.RelativeAccuracy`)
+    D = Quantity(1, "") >> assume.Redshift >> "pc"
+    assert abs(D - 3396224009.3212013 * u.pc) / D < 1e-12
+    z = 5 * u.Gpc >> assume.Redshift >> ""
+    assert abs(z - 1.8018944589315433) / z < 1e-12
     print(f"rest-mass energy of an electron is {c.m_e * c.c**2 >> 'MeV':.2f}")
 
 
@@ -86,3 +90,112 @@ def test_repr():
     assert f"{c.c:.2e}" == "3.00e+08 m sec^-1"
     assert f"{25.0 * u.Msun * c.c**2 >> 'erg':.2e}" == "4.47e+55 erg"
     assert f"{(u.Nmi / u.fathom >> ''):.4f}" == "1012.6859"
+
+
+def test_unit():
+    assert Unit("m sec^-1") is Unit("m sec^-1")
+    assert (c.G * c.M_sun).unit is Unit("m^3 kg^-1 sec^-2 g")
+    assert Unit("erg") == "erg"
+    assert Unit("erg").dims == Unit("g cm^2 sec^-2").dims
+    assert Unit("km").factor_to(Unit("m")) == 1000.0
+    assert Unit("km").scale == 1e5
+    assert Unit("erg^1/2").cgs == "g^1/2 cm sec^-1"
+    assert (Unit("m") / Unit("m")).dimensionless
+    assert Quantity(5, "1e3 m") == 5 * u.km
+
+
+def test_parse_unit():
+    import pytest
+    from fractions import Fraction
+    from oompy.utils import ParseUnit
+
+    assert ParseUnit("kg*m/sec^2") == ParseUnit("kg m sec^-2")
+    assert ParseUnit("(erg/sec)/cm^2") == ParseUnit("erg/(sec cm^2)")
+    assert ParseUnit("1e3 sec**(-1/2)") == (1e3, {"sec": Fraction(-1, 2)})
+    assert ParseUnit("m^1/2 kg^-1.5") == (
+        1.0,
+        {"m": Fraction(1, 2), "kg": Fraction(-3, 2)},
+    )
+    assert ParseUnit("") == (1.0, {})
+    for invalid in ("m^", "(m", "m)", "m/", "m $", "m^x"):
+        with pytest.raises(Exception):
+            ParseUnit(invalid)
+    assert Quantity("2.5 km/sec") == Quantity(2.5, "km sec^-1")
+    assert Quantity(1, "kg*m/sec**2") >> "N" == 1 * u.N
+    # leading coefficients as accepted by `float`
+    import math
+
+    assert Quantity("inf cm").value == math.inf and Quantity("-inf cm").unit == "cm"
+    assert math.isnan(Quantity("nan cm").value) and Quantity("nan cm").unit == "cm"
+    assert Quantity("5 ") == Quantity(5, "") and Quantity("5 ").unit.dimensionless
+    assert Quantity("1_000 m") == 1 * u.km and Quantity("Infinity m").value == math.inf
+
+
+def test_cache():
+    from oompy.cache import Caches, ClearCaches, CacheInfo, LRUCache
+    from oompy.units import ReduceUnitToBase, GetBaseType, UnitEquivalencies
+
+    ClearCaches()
+    hits = Caches["reduce"].hits
+    assert ReduceUnitToBase("fathom") == ReduceUnitToBase(" fathom ")
+    assert Caches["reduce"].hits > hits
+    assert GetBaseType("erg") == GetBaseType("g cm^2 sec^-2")
+    assert {"reduce", "base_type", "convert"} <= set(CacheInfo())
+
+    UnitEquivalencies["smoot"] = (1.7018, "m")
+    assert len(Caches["reduce"]) == 0
+    assert 2 * u.m >> "smoot" == 2 * u.m
+    del UnitEquivalencies["smoot"]
+
+    lru = LRUCache("test", maxsize=2)
+    for i in range(3):
+        lru.put(i, i)
+    assert lru.get(0) is None and lru.get(2) == 2
+    assert lru.stats["evictions"] == 1 and lru.stats["misses"] == 1
+
+
+def test_unit_table():
+    from oompy.units import GetUnitTable
+
+    table = GetUnitTable()
+    assert table["kpc"].dims == Unit("m").dims
+    assert table["kpc"].scale == 3.085677581491362e21
+    assert table["GHz"].scale == 1e9
+    assert "G" in table and "Msun" in table and "sun" not in table
+    assert table.ambiguities["min"] == [("", "min"), ("m", "in")]
+    assert (1 * u.min >> "sec").value == 60.0
+
+
+def test_lazy_import():
+    import subprocess, sys
+
+    code = (
+        "import sys, oompy; oompy.Units.kpc; oompy.Constants.c;"
+        "print(*(m in sys.modules for m in ('sympy', 'matplotlib', 'numpy')))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert out.stdout.split() == ["False", "False", "False"]
+    assert "kpc" in dir(u) and u.kpc is u.kpc
+
+
+def test_immutable():
+    import pickle, pytest
+
+    q = 5 * u.GHz
+    with pytest.raises(AttributeError):
+        q.value = 1
+    assert not hasattr(q, "__dict__")
+    light = q >> assume.Light
+    assert light is not q and q.assumption is None
+    assert light.assumption is assume.Light
+    assert u.eV >> assume.Light >> "cm" and u.eV.assumption is None
+    restored = pickle.loads(pickle.dumps(light))
+    assert restored == q and restored.assumption is assume.Light
+    assert hash(1 * u.km) == hash(1000 * u.m) and (1 * u.km).magnitude == 1e5
+    near = Quantity(1.000000000049999, "cm"), Quantity(1.00000000005, "cm")
+    assert near[0] != near[1] and len(set(near)) == 2
+    lengths = [3 * u.ft, 1 * u.m, 2 * u.cm, 1 * u.au, 1 * u.km]
+    assert sorted(lengths) == [2 * u.cm, 3 * u.ft, 1 * u.m, 1 * u.km, 1 * u.au]
+    assert 1 * u.km <= 1000 * u.m and 1 * u.km >= 1000 * u.m
+    assert not (1 * u.km < 1000 * u.m) and not (1 * u.km > 1000 * u.m)
+    assert -1 * u.km < 1 * u.m and 0.5 < Quantity(1, "") and Quantity(1, "") >= 1
@@ -0,0 +1,51 @@
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import oompy
+from oompy import Units as u, Assumptions as assume, Quantity, QuantityArray
+
+
+def test_map_convert():
+    lengths = [1 * u.km, 2 * u.ft, 3 * u.pc, 4 * u.au, 5 * u.cm]
+    expected = [q >> "m" for q in lengths]
+    for n_jobs, processes in ((1, True), (2, True), (2, False)):
+        result = oompy.map_convert(
+            lengths, "m", n_jobs=n_jobs, chunksize=2, processes=processes
+        )
+        assert result == expected
+        assert all(q.unit == "m" for q in result)
+    assert oompy.map_convert(lengths[:1], "1e3 m") == [1 * u.km]
+    assert oompy.map_convert([], "m") == []
+
+
+def test_map_convert_assuming():
+    zs = [Quantity(z, "") for z in np.linspace(0.1, 3, 10)]
+    expected = [z >> assume.Redshift >> "Gpc" for z in zs]
+    with ThreadPoolExecutor(2) as executor:
+        result = oompy.map_convert(
+            zs, "Gpc", assume.Redshift, executor=executor, workers=2
+        )
+    assert [q.value for q in result] == [q.value for q in expected]
+    photons = [500 * u.nm >> assume.Light, 1 * u.GHz >> assume.Light]
+    energies = oompy.map_convert(photons, "eV", n_jobs=2)
+    assert energies == [q >> "eV" for q in photons]
+    array = QuantityArray(np.linspace(0.1, 3, 10), "") >> assume.Redshift
+    distances = oompy.map_convert(array, "Gpc", n_jobs=2, chunksize=3)
+    assert np.allclose(distances.value, [q.value for q in expected], rtol=1e-12)
+
+
+def test_map_quantities():
+    quantities = [-1 * u.km, 2 * u.m, -3 * u.ft]
+    assert oompy.map_quantities(abs, quantities, n_jobs=2, chunksize=1) == [
+        1 * u.km,
+        2 * u.m,
+        3 * u.ft,
+    ]
+
+
+def test_pickle():
+    assert len(pickle.dumps(u)) < 100 and pickle.loads(pickle.dumps(u)).kpc == u.kpc
+    to_au = pickle.loads(pickle.dumps(oompy.converter("1e3 km", "au")))
+    assert to_au(1.0) == oompy.converter("1e3 km", "au")(1.0)
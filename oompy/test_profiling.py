@@ -0,0 +1,29 @@
+import json
+
+import oompy
+from oompy import Units as u, Assumptions as assume, Quantity
+from oompy.units import Unit
+
+
+def test_profile():
+    parse, from_factors = oompy.utils.ParseUnit, Unit.__dict__["_FromFactors"]
+    erg = u.erg
+    with oompy.profile() as stats:
+        assert oompy.oom.ParseUnit is not parse
+        for _ in range(3):
+            (5 * u.GHz) >> assume.Light >> "eV"
+            Quantity(2.0, "km sec^-1") >> "m sec^-1"
+        with oompy.profile() as inner:
+            ~u.erg
+    report = stats.as_dict()
+    assert report["calls"]["assumption"]["calls"] == 3
+    assert report["calls"]["convert"]["calls"] == 6
+    assert report["calls"]["parse"]["calls"] >= 3
+    assert report["calls"]["base_type"]["calls"] == 1
+    assert report["caches"]["equivalencies"]["hits"] >= 2
+    assert list(inner.as_dict()["calls"]) == ["base_type"]
+    assert json.loads(stats.to_json()) == report
+    assert "assumption" in stats.report()
+    # the original functions are restored
+    assert oompy.utils.ParseUnit is parse and oompy.oom.ParseUnit is parse
+    assert Unit.__dict__["_FromFactors"] is from_factors
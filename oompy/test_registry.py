@@ -0,0 +1,65 @@
+import pytest
+
+import oompy
+from oompy import Units as u, Constants as c, Quantity
+from oompy.cache import Caches, RegistryChanged
+from oompy.constants import ConstantValues
+from oompy.units import GetUnitTable, LatexUnitMapping, ReduceUnitToBase, Unit
+from oompy.units import UnitEquivalencies
+
+
+@pytest.fixture(autouse=True)
+def registry():
+    # the tests define units and constants in the global registry: restore it
+    saved = [
+        (d, dict(d)) for d in (UnitEquivalencies, LatexUnitMapping, ConstantValues)
+    ]
+    try:
+        yield
+    finally:
+        for table, definitions in saved:
+            dict.clear(table)
+            dict.update(table, definitions)
+        RegistryChanged()
+
+
+def test_define_units():
+    Quantity(1, "km") >> "m"
+    sizes = {name: len(cache) for name, cache in Caches.items() if name != "parse"}
+    oompy.define_unit("Jy", 1e-23, "erg sec^-1 cm^-2 Hz^-1", latex="Jy")
+    oompy.define_units({"mJy_beam": (1.0, "mJy"), "Pa": (1.0, "N m^-2")})
+    oompy.define_alias("sec_", "sec")
+    # nothing cached depends on new units
+    assert sizes == {n: len(cache) for n, cache in Caches.items() if n != "parse"}
+    assert (3 * u.mJy * u.GHz >> "erg sec^-1 cm^-2").value == pytest.approx(3e-17)
+    assert (1 * u.kPa >> "dyn cm^-2").value == pytest.approx(1e4)
+    assert (2 * u.mJy_beam >> "Jy").value == pytest.approx(2e-3)
+    assert (Quantity(1, "erg sec_^-1") >> "erg sec^-1").value == 1
+    assert (1 * u.Jy).unit_latex() == "\\text{Jy}"
+
+
+def test_redefine_units():
+    oompy.define_units({"widget": (2.0, "m"), "gadget": (3.0, "widget")})
+    ReduceUnitToBase("km"), ReduceUnitToBase("kgadget")
+    km, kgadget = Unit("km"), Unit("kgadget")
+    assert u.gadget.cgs.value == pytest.approx(600)
+    oompy.define_unit("widget", 5.0, "m")
+    # only the entries depending on the redefined unit are dropped
+    assert "km" in Caches["reduce"] and "kgadget" not in Caches["reduce"]
+    assert Unit("km") is km and Unit("kgadget") is not kgadget
+    assert (Quantity(1, "kgadget") >> "m").value == pytest.approx(15000)
+    assert u.gadget.cgs.value == pytest.approx(1500)
+
+    with pytest.raises(Exception):
+        oompy.define_units({"widget": (1.0, "gizmo"), "gizmo": (1.0, "widget")})
+    assert UnitEquivalencies["widget"] == (5.0, "m") and "gizmo" not in GetUnitTable()
+    assert (Quantity(1, "kgadget") >> "m").value == pytest.approx(15000)
+    with pytest.raises(Exception):
+        oompy.define_unit("m", 100.0, "cm")
+
+
+def test_define_constants():
+    oompy.define_constant("m_n", 1.67492749804e-24, "g")
+    assert (c.m_n / c.m_p).value == pytest.approx(1.00137841931)
+    oompy.define_constants({"m_n": (1.0, "g")})
+    assert c.m_n.value == 1.0
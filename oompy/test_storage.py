@@ -0,0 +1,77 @@
+import json
+from enum import Enum
+
+import numpy as np
+import pytest
+
+import oompy
+from oompy import Units as u, Assumptions as assume, QuantityArray
+
+
+def test_save_load(tmp_path):
+    path = str(tmp_path / "q.oom")
+    oompy.save(path, 5 * u.GHz >> assume.Light)
+    q = oompy.load(path)
+    assert q == 5 * u.GHz and q.assumption is assume.Light
+    assert q >> "eV" == (5 * u.GHz) >> assume.Light >> "eV"
+
+    distances = QuantityArray(np.arange(12.0).reshape(3, 4), "kpc")
+    oompy.save(path, distances)
+    loaded = oompy.load(path)
+    assert isinstance(loaded, QuantityArray) and loaded.unit is distances.unit
+    assert loaded.shape == (3, 4) and np.array_equal(loaded.value, distances.value)
+    assert not loaded.value.flags.writeable  # memory-mapped
+    assert oompy.load(path, mmap=False).value.flags.writeable
+
+    oompy.save(path, QuantityArray(np.arange(6.0), "pc")[::2])
+    assert np.array_equal(oompy.load(path).value, [0.0, 2.0, 4.0])
+    oompy.save(path, [1 * u.km, 2 * u.m])
+    assert np.array_equal(oompy.load(path).value, [1.0, 0.002])
+
+
+def test_load_checks_unit(tmp_path):
+    from oompy.units import UnitEquivalencies
+
+    path = str(tmp_path / "q.oom")
+    UnitEquivalencies["smoot"] = (1.7018, "m")
+    try:
+        oompy.save(path, QuantityArray([1.0, 2.0], "smoot"))
+        UnitEquivalencies["smoot"] = (2.0, "m")
+        with pytest.raises(Exception):
+            oompy.load(path)
+    finally:
+        del UnitEquivalencies["smoot"]
+    with open(path, "wb") as f:
+        f.write(b"not an oompy file")
+    with pytest.raises(Exception):
+        oompy.load(path)
+
+
+class Doppler(Enum):
+    Optical = 0
+
+
+def test_load_assumption(tmp_path):
+    from oompy.equivalencies import AddEquivalency, Equivalencies
+
+    path = str(tmp_path / "q.oom")
+    oompy.save(path, 5 * u.GHz >> Doppler.Optical)
+    with pytest.raises(Exception):
+        oompy.load(path)  # not registered
+    AddEquivalency(Doppler.Optical, "GHz", "km sec^-1", lambda nu: nu)
+    try:
+        assert oompy.load(path).assumption is Doppler.Optical
+    finally:
+        del Equivalencies[Doppler.Optical]
+    # the header cannot name arbitrary objects
+    header = oompy.storage.ReadHeader(path)
+    offset = header.pop("offset")
+    with open(path, "rb") as f:
+        data = f.read()
+    for name in ("os:system", "oompy.oom:Assumptions.Light"):
+        text = json.dumps(dict(header, assumption=name)).encode("utf-8")
+        text += b" " * (offset - 12 - len(text))
+        with open(path, "wb") as f:
+            f.write(data[:12] + text + data[offset:])
+        with pytest.raises(Exception, match="Unknown assumption"):
+            oompy.load(path)
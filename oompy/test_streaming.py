@@ -0,0 +1,94 @@
+import os
+
+import numpy as np
+import pytest
+
+from oompy import Units as u, Assumptions as assume
+from oompy.streaming import ConvertFile, ParseHeader, ReadChunks, main
+
+
+def _WriteCSV(path, n):
+    x = np.arange(1.0, n + 1)
+    np.savetxt(
+        path,
+        np.column_stack([x, 100 * x, x]),
+        delimiter=",",
+        header="flux [erg sec^-1 cm^-2],wavelength [nm],index",
+        comments="",
+    )
+    return x
+
+
+def test_parse_header():
+    assert ParseHeader("flux [erg  sec^-1 cm^-2]") == ("flux", "erg sec^-1 cm^-2")
+    assert ParseHeader(" index ") == ("index", "")
+
+
+def test_convert_csv(tmp_path):
+    src, dst = str(tmp_path / "in.csv"), str(tmp_path / "out.csv")
+    x = _WriteCSV(src, 25)
+    headers = ConvertFile(
+        src,
+        dst,
+        {"flux": "W m^-2", "wavelength": ("eV", assume.Light)},
+        chunksize=7,
+    )
+    assert headers == ["flux [W m^-2]", "wavelength [eV]", "index"]
+    out = np.loadtxt(dst, delimiter=",", skiprows=1)
+    assert out.shape == (25, 3)
+    assert np.allclose(out[:, 0], x * 1e-3, rtol=1e-12)
+    energies = [((w * u.nm) >> assume.Light >> "eV").value for w in 100 * x]
+    assert np.allclose(out[:, 1], energies, rtol=1e-12)
+    assert np.all(out[:, 2] == x)
+
+
+def test_convert_npy(tmp_path):
+    src, dst, back = (str(tmp_path / f) for f in ("in.csv", "out.npy", "back.csv"))
+    x = _WriteCSV(src, 10)
+    ConvertFile(src, dst, {"wavelength": "um"}, chunksize=3)
+    data = np.load(dst, mmap_mode="r")
+    assert data.dtype.names == ("flux [erg sec^-1 cm^-2]", "wavelength [um]", "index")
+    assert np.allclose(data["wavelength [um]"], 0.1 * x, rtol=1e-12)
+    # memory-mapped structured input, converted back to text through the CLI
+    main([dst, back, "--to", "wavelength=nm", "--chunksize", "4"])
+    headers, chunks = ReadChunks(back)
+    assert headers[1] == "wavelength [nm]"
+    assert np.allclose(np.concatenate([c[1] for c in chunks]), 100 * x, rtol=1e-12)
+
+
+def test_convert_plain_npy(tmp_path):
+    src, dst = str(tmp_path / "in.npy"), str(tmp_path / "out.npy")
+    np.save(src, np.ones((5, 2)))
+    ConvertFile(src, dst, {"T": ("keV", assume.Thermal)}, headers=["T [K]", "n"])
+    data = np.load(dst)
+    assert np.allclose(data["T [keV]"], ((1 * u.K) >> assume.Thermal >> "keV").value)
+
+
+def test_read_chunks_closes(tmp_path):
+    import gc, warnings
+
+    src = str(tmp_path / "in.csv")
+    _WriteCSV(src, 5)
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        headers, chunks = ReadChunks(src)  # never iterated
+        del chunks
+        gc.collect()
+    assert headers[2] == "index"
+    assert not [w for w in caught if issubclass(w.category, ResourceWarning)]
+
+
+def test_convert_comments(tmp_path):
+    src, dst = str(tmp_path / "in.csv"), str(tmp_path / "out.npy")
+    with open(src, "w") as f:
+        f.write("length [m],index\n# comment\n1,1\n\n2,2\n  # indented comment\n")
+        f.write("3,3 # trailing comment\n\n")
+    ConvertFile(src, dst, {"length": "km"}, chunksize=2)
+    data = np.load(dst)
+    assert data.shape == (3,) and np.allclose(data["length [km]"], [1e-3, 2e-3, 3e-3])
+    # a failed conversion leaves no partial output
+    with open(src, "a") as f:
+        f.write("4,not a number\n")
+    with pytest.raises(Exception):
+        ConvertFile(src, dst, {"length": "km"}, chunksize=2)
+    assert not os.path.exists(dst)
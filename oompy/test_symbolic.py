@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+import oompy
+from oompy import Units as u, Constants as c
+
+sp = pytest.importorskip("sympy")
+
+
+def test_compile_formula():
+    gamma, B, q_e, m_e, c_ = sp.symbols("gamma B q_e m_e c")
+    nu = oompy.compile_formula(
+        gamma**2 * q_e * B / (2 * sp.pi * m_e * c_), {gamma: "", B: "G"}, "GHz"
+    )
+    expected = 1e6 * c.q_e * (1e-3 * u.G) / (2 * np.pi * c.m_e * c.c) >> "GHz"
+    assert np.isclose(nu(1e3, 1e-3), expected.value, rtol=1e-12)
+    assert nu.expr.free_symbols == {gamma, B} and nu.expr.atoms(sp.Float)
+    assert nu.units == ["", "G"] and nu.unit == "GHz"
+    grid = nu(np.array([1e2, 1e3]), np.array([[1e-3], [1e-2]]))
+    assert grid.shape == (2, 2) and np.isclose(grid[0, 1], expected.value)
+
+    T, m, k_B = sp.symbols("T m k_B")
+    v_th = oompy.compile_formula(
+        sp.sqrt(k_B * T / m), {T: "K", "m": "1e-3 kg"}, "km sec^-1"
+    )
+    expected = (c.k_B * 1e4 * u.K / u.g) ** 0.5 >> "km sec^-1"
+    assert np.isclose(v_th(1e4, 1.0), expected.value, rtol=1e-12)
+    assert np.isclose(v_th(1e4 * u.K, 1 * u.g), expected.value, rtol=1e-12)
+    scaled = oompy.compile_formula(sp.exp(T / m), {T: "K", m: "1e3 K"})
+    assert np.allclose(scaled(np.array([0.0, 1e3]), 1.0), [1.0, np.e])
+
+    theta, r = sp.symbols("theta r")
+    chord = oompy.compile_formula(
+        2 * r * sp.sin(theta / 2), {r: "m", theta: "deg"}, "m"
+    )
+    assert np.allclose(chord(1.0, np.array([60.0, 180.0])), [1.0, 2.0])
+
+
+def test_compile_formula_dimensions():
+    T, m = sp.symbols("T m")
+    for expr, units, unit in (
+        (T + m, {T: "K", m: "g"}, ""),
+        (sp.exp(T), {T: "K"}, ""),
+        (T, {T: "K"}, "cm"),
+        (T**m, {T: "K", m: ""}, ""),
+        (T * m, {T: "K"}, ""),
+        (sp.cos(T), {T: "K"}, ""),
+    ):
+        with pytest.raises(Exception):
+            oompy.compile_formula(expr, units, unit)
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+import oompy
+from oompy import Units as u, Quantity, QuantityArray
+from oompy.tables import FormatValues
+
+
+def test_format_values():
+    values = [0.0, 1e-3, 5e-4, 12.5, 9999, 1e4, 123456.0, -2.0, 1e120, np.inf, np.nan]
+    expected = [Quantity(v, "").value_latex() for v in values]
+    assert FormatValues(values) == expected
+    assert FormatValues([123456.0], latex=False) == ["1.23456e+05"]
+    assert FormatValues([]) == []
+
+
+def test_format_table():
+    table = oompy.format_table(
+        {"d": [1 * u.pc, 2 * u.ly], "n": np.array([1.0, 2e5])}, units={"d": "ly"}
+    )
+    assert table.splitlines() == [
+        "| d [ly] | n |",
+        "|---|---|",
+        "| 3.26156 | 1.00000 |",
+        "| 2.00000 | 2.00000e+05 |",
+    ]
+    lines = oompy.format_table(
+        {"M": QuantityArray([1.0, 2e5], "Msun")}, fmt="latex"
+    ).splitlines()
+    assert lines[2] == "M [$M_\\bigodot$] \\\\"
+    assert lines[5] == "$2.00000\\cdot 10^{5}$ \\\\"
+    with pytest.raises(Exception):
+        oompy.format_table({"a": [1 * u.m], "b": [1 * u.m, 2 * u.m]})
+
+
+def test_write_table(tmp_path):
+    path = str(tmp_path / "table.md")
+    lengths = np.arange(25.0) * u.km
+    oompy.write_table(path, {"L": lengths}, units={"L": "m"}, chunksize=10)
+    with open(path) as f:
+        lines = f.read().splitlines()
+    assert (
+        len(lines) == 27 and lines[0] == "| L [m] |" and lines[-1] == "| 2.40000e+04 |"
+    )
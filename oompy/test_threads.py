@@ -0,0 +1,75 @@
+import random
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import oompy
+from oompy import Units as u, Constants as c, Quantity, Assumptions as assume
+from oompy.cache import Caches, LRUCache
+
+LENGTHS = ["km", "m", "cm", "pc", "kpc", "au", "ly", "ft", "mi", "Rsun"]
+TIMES = ["sec", "msec", "min", "hr", "day", "yr"]
+
+
+def convert(seed):
+    rng = random.Random(seed)
+    results = []
+    for _ in range(500):
+        src = f"{rng.choice(LENGTHS)} {rng.choice(TIMES)}^-1"
+        dst = f"{rng.choice(LENGTHS)} {rng.choice(TIMES)}^-1"
+        results.append((Quantity(1.5, src) >> dst).value)
+        results.append((c.c >> assume.Light).assumption)
+        results.append((u.GHz >> assume.Light >> "eV").value)
+    return results
+
+
+def test_shared_singletons():
+    light = c.c >> assume.Light
+    assert light is not c.c and c.c.assumption is None
+    with pytest.raises(AttributeError):
+        c.c = 1 * u.m
+    with pytest.raises(AttributeError):
+        u.GHz = 1 * u.Hz
+    with pytest.raises(AttributeError):
+        del u.units
+
+
+def test_concurrent_use():
+    expected = [convert(seed) for seed in range(16)]
+    sizes = {name: cache.maxsize for name, cache in Caches.items()}
+    interval = sys.getswitchinterval()
+    # tiny caches and frequent thread switches: constant evictions and races
+    oompy.cache.SetCacheSize(4)
+    sys.setswitchinterval(1e-6)
+    try:
+        with ThreadPoolExecutor(8) as executor:
+            results = list(executor.map(convert, range(16)))
+            defined = list(
+                executor.map(
+                    lambda i: oompy.define_unit(f"thread_unit{i}", i + 1.0, "m"),
+                    range(8),
+                )
+            )
+    finally:
+        sys.setswitchinterval(interval)
+        for name, maxsize in sizes.items():
+            Caches[name].resize(maxsize)
+    assert results == expected and len(defined) == 8
+    assert (1 * u.kthread_unit3 >> "m").value == 4000
+    assert c.c.assumption is None and u.GHz.assumption is None
+
+
+def test_lru_cache_threads():
+    cache = LRUCache("threads", 4)
+
+    def work(seed):
+        for i in range(20000):
+            key = (7 * i + seed) % 10
+            if cache.get(key) is None:
+                cache.put(key, i)
+
+    with ThreadPoolExecutor(8) as executor:
+        list(executor.map(work, range(8)))
+    stats = cache.stats
+    assert stats["hits"] + stats["misses"] == 8 * 20000 and stats["size"] == 4
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from oompy import Units as u, Constants as c, Quantity, QuantityArray
+
+
+def test_multiplicative():
+    assert np.sqrt(4 * u.m**2) == 2 * u.m
+    assert np.square(3 * u.sec).unit == "sec^2"
+    assert np.multiply(2 * u.m, 3 * u.sec) == 6 * u.m * u.sec
+    assert np.all(
+        np.divide(QuantityArray([2, 4], "m"), 2 * u.sec)
+        == QuantityArray([1, 2], "m sec^-1")
+    )
+    assert np.power(QuantityArray([1, 2], "km"), 3).unit == "km^3"
+
+
+def test_additive():
+    assert np.hypot(3 * u.m, 400 * u.cm) == 5 * u.m
+    assert np.add(1 * u.m, 1 * u.km) == 1001 * u.m
+    assert np.maximum(1 * u.km, 2 * u.m) == 1 * u.km
+    assert np.all(np.less(QuantityArray([1, 2], "km"), 1500 * u.m) == [True, False])
+    with pytest.raises(Exception):
+        np.add(1 * u.km, 1 * u.sec)
+    assert np.copysign(3 * u.m, -1 * u.sec) == -3 * u.m
+    assert np.all(
+        np.copysign(QuantityArray([1, -2], "km"), 1) == QuantityArray([1, 2], "km")
+    )
+    assert np.nextafter(1 * u.km, 2000 * u.m) > 1 * u.km
+
+
+def test_transcendental():
+    assert np.exp(2 * u.m / (1 * u.m)) == np.exp(2)
+    assert np.log10(1 * u.km / u.m) == 3
+    assert abs(np.sin(90 * u.deg) - 1) < 1e-15
+    assert np.arctan2(1 * u.m, 100 * u.cm).unit == "rad"
+    with pytest.raises(Exception):
+        np.exp(c.c)
+
+
+def test_array_functions():
+    a = QuantityArray([1.0, 2.0], "km")
+    joined = np.concatenate([a, QuantityArray([5.0], "m")])
+    assert joined.unit == "km" and np.all(joined.value == [1, 2, 0.005])
+    assert np.sum(a) == 3 * u.km and np.mean(a) == 1.5 * u.km
+    assert np.var(a).unit == "km^2"
+    assert np.all(np.linspace(0 * u.m, 1 * u.km, 3).value == [0, 500, 1000])
+    powers = np.logspace(0.001 * u.km / u.m, 4, 2)
+    assert powers.unit == "" and np.allclose(powers.value, [10, 1e4])
+    with pytest.raises(Exception):
+        np.logspace(1 * u.m, 2 * u.m)
+    where = QuantityArray([1.0, 5.0], "m") > 2 * u.m
+    assert np.all(np.where(where)[0] == [1])
+    assert np.all(np.where(where, a, 0 * u.m).value == [0, 2])
+    assert np.all(np.argsort(QuantityArray([3, 1, 2], "m")) == [1, 2, 0])
+    assert np.all(np.isclose(a, [1000 * u.m, 2 * u.km]))
+    assert np.dot(a, a) == 5 * u.km**2
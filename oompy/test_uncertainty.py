@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from oompy import Units as u, Constants as c, Assumptions, Quantity, UncertainArray
+
+
+def test_linear_propagation():
+    masses = UncertainArray([1.0, 2.0], [0.1, 0.3], "Msun")
+    radius = (2 * c.G * masses / c.c**2) >> "km"
+    assert str(radius.unit) == "km"
+    assert np.allclose(radius.relative, [0.1, 0.15])
+    # (the operands are taken to be independent)
+    others = UncertainArray([3.0, 4.0], [0.3, 0.2], "Msun")
+    product = masses * others
+    assert np.allclose(product.relative, np.hypot(masses.relative, others.relative))
+    assert np.allclose((masses**2).error, 2 * masses.value * masses.error)
+    assert np.allclose((masses - others).error, np.hypot(masses.error, others.error))
+    assert np.allclose((1 * u.Msun + masses).value, [2.0, 3.0])
+    assert np.allclose((masses >> "g").relative, masses.relative)
+    with pytest.raises(Exception):
+        UncertainArray([1.0], [-0.1], "m")
+
+
+def test_monte_carlo():
+    z = UncertainArray([0.5, 1.0, 2.0], [0.01, 0.05, 0.05]) >> Assumptions.Redshift
+    linear = z >> "Gpc"
+    sampled = z.to("Gpc", samples=20000, rng=0)
+    assert np.allclose(sampled.value, linear.value)
+    assert np.allclose(sampled.error, linear.error, rtol=0.05)
+
+
+def test_derivative_step():
+    # errors far below the resolution of the values
+    z = UncertainArray([1.0], [1e-12]) >> Assumptions.Redshift
+    distance = z >> "Gpc"
+    exact = UncertainArray([1.0], [1e-6]) >> Assumptions.Redshift >> "Gpc"
+    assert np.allclose(distance.error, exact.error * 1e-6, rtol=1e-5)
+    energy = UncertainArray([1e6], [1e-9], "nm") >> Assumptions.Light >> "eV"
+    assert np.allclose(energy.relative, 1e-15, rtol=1e-5)
+    # (one-sided at the edge of the domain)
+    edge = UncertainArray([0.0, 1.0], [0.01, 0.01]) >> Assumptions.Redshift >> "Gpc"
+    slope = (Quantity(1e-4, "") >> Assumptions.Redshift >> "Gpc").value / 1e-4
+    assert np.isclose(edge.error[0], 0.01 * slope, rtol=1e-3)
+    assert np.isclose(edge.error[1], exact.error[0] * 1e4)
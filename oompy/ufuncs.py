@@ -0,0 +1,314 @@
+"""
+Unit rules for numpy ufuncs and array functions applied to quantities.
+
+This module is only imported once numpy calls `__array_ufunc__` or
+`__array_function__` of a `Quantity`/`QuantityArray`, so numpy is already loaded.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+from fractions import Fraction
+import numpy as np
+
+from .oom import Quantity
+from .arrays import QuantityArray
+from .units import Unit
+
+ANGLE = Unit("rad").dims
+
+# ufuncs whose result has the product/quotient of the input units
+MULTIPLICATIVE = {
+    np.multiply: lambda u1, u2: u1 * u2,
+    np.divide: lambda u1, u2: u1 / u2,
+    np.true_divide: lambda u1, u2: u1 / u2,
+    np.matmul: lambda u1, u2: u1 * u2,
+}
+# ufuncs raising the unit to a fixed power
+POWERS = {
+    np.sqrt: Fraction(1, 2),
+    np.cbrt: Fraction(1, 3),
+    np.square: Fraction(2),
+    np.reciprocal: Fraction(-1),
+}
+# ufuncs which require all the inputs in the same unit and return that unit
+ADDITIVE = {
+    np.add,
+    np.subtract,
+    np.hypot,
+    np.maximum,
+    np.minimum,
+    np.fmax,
+    np.fmin,
+    np.remainder,
+    np.fmod,
+    np.nextafter,
+    np.negative,
+    np.positive,
+    np.absolute,
+    np.fabs,
+    np.rint,
+    np.floor,
+    np.ceil,
+    np.trunc,
+    np.conjugate,
+    np.spacing,
+}
+# ufuncs which require all the inputs in the same unit and return plain values
+COMPARISONS = {
+    np.equal,
+    np.not_equal,
+    np.less,
+    np.less_equal,
+    np.greater,
+    np.greater_equal,
+    np.isfinite,
+    np.isinf,
+    np.isnan,
+    np.signbit,
+}
+# ufuncs which require dimensionless inputs (and return dimensionless values)
+DIMENSIONLESS = {
+    np.exp,
+    np.exp2,
+    np.expm1,
+    np.log,
+    np.log2,
+    np.log10,
+    np.log1p,
+    np.sinh,
+    np.cosh,
+    np.tanh,
+    np.arcsinh,
+    np.arccosh,
+    np.arctanh,
+    np.logaddexp,
+    np.logaddexp2,
+}
+# ufuncs which accept angles or dimensionless inputs
+TRIGONOMETRIC = {np.sin, np.cos, np.tan}
+# ufuncs which return angles (in radians)
+INVERSE_TRIGONOMETRIC = {np.arcsin, np.arccos, np.arctan, np.arctan2}
+
+
+def Split(obj: Any) -> Tuple[Any, Optional[Unit]]:
+    """
+    Separates the values from the unit (None for plain numbers and arrays).
+    """
+    if isinstance(obj, (Quantity, QuantityArray)):
+        return obj.value, obj.unit
+    elif isinstance(obj, (list, tuple, np.ndarray)):
+        if any(
+            isinstance(q, Quantity) for q in np.ravel(np.asarray(obj, dtype=object))
+        ):
+            qa = QuantityArray(obj)
+            return qa.value, qa.unit
+    return obj, None
+
+
+def Wrap(value: Any, unit: Unit) -> Union[Quantity, QuantityArray]:
+    """
+    Wraps the values into a `Quantity` (for scalars) or a `QuantityArray`.
+    """
+    if np.ndim(value) == 0:
+        return Quantity(np.asarray(value).item(), unit)
+    return QuantityArray(np.asarray(value), unit)
+
+
+def Convert(value: Any, unit: Optional[Unit], target: Unit) -> Any:
+    unit = Unit("") if unit is None else unit
+    return value if unit is target else value * unit.factor_to(target)
+
+
+def CommonUnit(units: Sequence[Optional[Unit]]) -> Unit:
+    for unit in units:
+        if unit is not None:
+            return unit
+    return Unit("")
+
+
+def ArrayUfunc(ufunc: np.ufunc, method: str, *inputs, **kwargs) -> Any:
+    if ("out" in kwargs) or method not in ("__call__", "reduce", "accumulate", "outer"):
+        return NotImplemented
+    values, units = zip(*[Split(x) for x in inputs])
+    call = getattr(ufunc, method)
+    if ufunc in MULTIPLICATIVE and method in ("__call__", "outer"):
+        u1, u2 = [Unit("") if u is None else u for u in units]
+        return Wrap(call(*values, **kwargs), MULTIPLICATIVE[ufunc](u1, u2))
+    elif ufunc in POWERS and method == "__call__":
+        unit = CommonUnit(units)
+        return Wrap(call(*values, **kwargs), unit ** POWERS[ufunc])
+    elif ufunc is np.power and method == "__call__":
+        base, exponent = values
+        if units[1] is not None:
+            exponent = Convert(exponent, units[1], Unit(""))
+        unit = CommonUnit(units[:1])
+        if np.ndim(exponent) != 0:
+            if not unit.dimensionless:
+                raise Exception("Array exponents require a dimensionless base")
+            return Wrap(call(Convert(base, unit, Unit("")), exponent), Unit(""))
+        return Wrap(call(base, exponent, **kwargs), unit ** float(exponent))
+    elif ufunc in ADDITIVE:
+        unit = CommonUnit(units)
+        values = tuple(Convert(v, u, unit) for v, u in zip(values, units))
+        return Wrap(call(*values, **kwargs), unit)
+    elif ufunc in COMPARISONS:
+        unit = CommonUnit(units)
+        values = tuple(Convert(v, u, unit) for v, u in zip(values, units))
+        return call(*values, **kwargs)
+    elif ufunc is np.copysign and method == "__call__":
+        # (only the sign of the second input matters, whatever its unit)
+        return Wrap(call(*values, **kwargs), CommonUnit(units[:1]))
+    elif ufunc is np.sign and method == "__call__":
+        return Wrap(call(*values, **kwargs), Unit(""))
+    elif ufunc in DIMENSIONLESS:
+        values = tuple(Convert(v, u, Unit("")) for v, u in zip(values, units))
+        return Wrap(call(*values, **kwargs), Unit(""))
+    elif ufunc in TRIGONOMETRIC:
+        unit = CommonUnit(units)
+        target = Unit("rad") if unit.dims == ANGLE else Unit("")
+        values = tuple(Convert(v, u, target) for v, u in zip(values, units))
+        return Wrap(call(*values, **kwargs), Unit(""))
+    elif ufunc in INVERSE_TRIGONOMETRIC:
+        unit = CommonUnit(units) if ufunc is np.arctan2 else Unit("")
+        values = tuple(Convert(v, u, unit) for v, u in zip(values, units))
+        return Wrap(call(*values, **kwargs), Unit("rad"))
+    return NotImplemented
+
+
+HandledFunctions = {}  # type: Dict[Callable, Callable]
+
+
+def Implements(*funcs: Callable) -> Callable:
+    def decorator(impl: Callable) -> Callable:
+        for func in funcs:
+            HandledFunctions[func] = impl
+        return impl
+
+    return decorator
+
+
+def ArrayFunction(func: Callable, types, args, kwargs) -> Any:
+    if func not in HandledFunctions:
+        return NotImplemented
+    return HandledFunctions[func](func, *args, **kwargs)
+
+
+def _SplitMany(arrays: Sequence) -> Tuple[List[Any], Unit]:
+    values, units = zip(*[Split(x) for x in arrays])
+    unit = CommonUnit(units)
+    return [Convert(v, u, unit) for v, u in zip(values, units)], unit
+
+
+@Implements(np.concatenate, np.stack, np.vstack, np.hstack, np.column_stack)
+def _Join(func, arrays, *args, **kwargs):
+    values, unit = _SplitMany(arrays)
+    return Wrap(func(values, *args, **kwargs), unit)
+
+
+@Implements(
+    np.sum,
+    np.mean,
+    np.median,
+    np.min,
+    np.max,
+    np.amin,
+    np.amax,
+    np.ptp,
+    np.std,
+    np.cumsum,
+    np.sort,
+    np.round,
+    np.copy,
+    np.reshape,
+    np.ravel,
+    np.transpose,
+    np.squeeze,
+    np.atleast_1d,
+    np.diff,
+    np.nansum,
+    np.nanmean,
+    np.nanmin,
+    np.nanmax,
+    np.nanmedian,
+    np.nanstd,
+    np.percentile,
+    np.nanpercentile,
+    np.quantile,
+)
+def _SameUnit(func, a, *args, **kwargs):
+    value, unit = Split(a)
+    return Wrap(func(value, *args, **kwargs), CommonUnit([unit]))
+
+
+@Implements(np.var, np.nanvar)
+def _Variance(func, a, *args, **kwargs):
+    value, unit = Split(a)
+    return Wrap(func(value, *args, **kwargs), CommonUnit([unit]) ** 2)
+
+
+@Implements(
+    np.argmin,
+    np.argmax,
+    np.argsort,
+    np.shape,
+    np.ndim,
+    np.size,
+    np.nonzero,
+    np.count_nonzero,
+)
+def _Plain(func, a, *args, **kwargs):
+    return func(Split(a)[0], *args, **kwargs)
+
+
+@Implements(np.dot, np.outer, np.inner, np.cross)
+def _Product(func, a, b, *args, **kwargs):
+    (va, ua), (vb, ub) = Split(a), Split(b)
+    return Wrap(func(va, vb, *args, **kwargs), CommonUnit([ua]) * CommonUnit([ub]))
+
+
+@Implements(np.isclose, np.allclose, np.array_equal)
+def _Compare(func, a, b, *args, **kwargs):
+    values, _ = _SplitMany([a, b])
+    return func(*values, *args, **kwargs)
+
+
+@Implements(np.clip)
+def _Clip(func, a, a_min, a_max, *args, **kwargs):
+    values, unit = _SplitMany([a, a_min, a_max])
+    return Wrap(func(*values, *args, **kwargs), unit)
+
+
+@Implements(np.linspace, np.geomspace)
+def _Space(func, start, stop, *args, **kwargs):
+    values, unit = _SplitMany([start, stop])
+    return Wrap(func(*values, *args, **kwargs), unit)
+
+
+@Implements(np.logspace)
+def _LogSpace(func, start, stop, *args, **kwargs):
+    # (the start and stop are exponents)
+    values = [Convert(*Split(x), Unit("")) for x in (start, stop)]
+    return Wrap(func(*values, *args, **kwargs), Unit(""))
+
+
+@Implements(np.where)
+def _Where(func, condition, x=None, y=None):
+    if x is None and y is None:
+        return func(Split(condition)[0])
+    values, unit = _SplitMany([x, y])
+    return Wrap(func(Split(condition)[0], *values), unit)
+
+
+@Implements(np.interp)
+def _Interp(func, x, xp, fp, *args, **kwargs):
+    (vx, vxp), _ = _SplitMany([x, xp])
+    vfp, ufp = Split(fp)
+    return Wrap(func(vx, vxp, vfp, *args, **kwargs), CommonUnit([ufp]))
+
+
+@Implements(getattr(np, "trapezoid", None) or getattr(np, "trapz"))
+def _Trapezoid(func, y, x=None, *args, **kwargs):
+    vy, uy = Split(y)
+    if x is None:
+        return Wrap(func(vy, *args, **kwargs), CommonUnit([uy]))
+    vx, ux = Split(x)
+    return Wrap(func(vy, vx, *args, **kwargs), CommonUnit([uy]) * CommonUnit([ux]))
@@ -0,0 +1,311 @@
+"""
+Arrays of quantities with (independent, Gaussian) uncertainties.
+
+`UncertainArray` stores the nominal values and the standard deviations as two
+arrays sharing one unit. The uncertainties are propagated to first order
+through `+ - * / **` and unit conversions (including conversions under an
+assumption, whose derivatives are taken numerically), so that every operation
+costs a few extra vectorized array operations.
+
+For strongly nonlinear conversions, `propagate` (or `to(unit, samples=N)`)
+estimates the standard deviations by vectorized Monte Carlo sampling instead.
+
+Examples
+--------
+>>> z = UncertainArray(redshifts, redshift_errors) >> Assumptions.Redshift
+>>> z >> "Gpc"                   # linear propagation
+>>> z.to("Gpc", samples=1000)    # Monte Carlo
+"""
+
+from enum import Enum
+from typing import Any, Callable, Optional, Tuple, Union
+
+import numpy as np
+
+from .arrays import QuantityArray
+from .oom import Quantity
+from .units import Unit
+
+# largest number of samples evaluated at once in the Monte Carlo mode
+MaxSamples = 1 << 24
+
+# step of the numerical derivatives, relative to the standard deviations (but
+# no smaller than sqrt(eps) relative to the values, so that it does not vanish)
+DerivativeStep = 1e-5
+
+
+def _Coerce(other: Any) -> Tuple[np.ndarray, Optional[np.ndarray], Unit]:
+    # values, errors (None for exact values) and unit of an operand
+    if isinstance(other, UncertainArray):
+        return other.value, other.error, other.unit
+    elif isinstance(other, (Quantity, QuantityArray)):
+        return np.asarray(other.value), None, other.unit
+    elif isinstance(other, (int, float, list, np.ndarray, np.generic)):
+        return np.asarray(other), None, Unit("")
+    raise TypeError
+
+
+def _Hypot(a: np.ndarray, b: Optional[np.ndarray]) -> np.ndarray:
+    # (np.hypot is several times slower)
+    return a if b is None else np.sqrt(a * a + b * b)
+
+
+class UncertainArray:
+    """
+    Array of values with standard deviations, sharing a single unit.
+
+    The uncertainties of the operands are taken to be independent.
+
+    Parameters
+    ----------
+    value : array_like, QuantityArray or Quantity
+        nominal values
+    error : array_like, QuantityArray or Quantity
+        standard deviations (in the unit of `value` if plain numbers)
+    unit : str, optional
+        unit of plain `value`s
+
+    Examples
+    --------
+    >>> masses = UncertainArray([1.0, 2.0], [0.1, 0.3], "Msun")
+    >>> (c.G * masses / c.c**2) >> "km"
+    """
+
+    # numpy defers to the reflected operators of this class
+    __array_ufunc__ = None
+
+    def __init__(
+        self, value: Any, error: Any = 0.0, unit: Union[str, Unit] = ""
+    ) -> None:
+        if isinstance(value, (Quantity, QuantityArray)):
+            values = (
+                QuantityArray(value) if unit == "" else QuantityArray(value) >> unit
+            )
+        else:
+            values = QuantityArray(np.asarray(value, dtype=float), str(unit))
+        if isinstance(error, (Quantity, QuantityArray)):
+            error = (QuantityArray(error) >> values.unit).value
+        error = np.asarray(error, dtype=float)
+        if np.any(error < 0):
+            raise Exception("Standard deviations cannot be negative")
+        self.value = np.asarray(values.value, dtype=float)  # type: np.ndarray
+        self.error = error  # type: np.ndarray
+        self.unit = values.unit  # type: Unit
+        self.assumption = values.assumption  # type: Union[Enum, None]
+
+    def _new(self, value: Any, error: Any, unit: Unit) -> "UncertainArray":
+        new = UncertainArray.__new__(UncertainArray)
+        new.value, new.error, new.unit, new.assumption = value, error, unit, None
+        return new
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return np.shape(self.value)
+
+    def __len__(self) -> int:
+        return len(self.value)
+
+    def __getitem__(self, key) -> "UncertainArray":
+        error = np.broadcast_to(self.error, self.shape)[key]
+        return self._new(self.value[key], error, self.unit)
+
+    def __repr__(self) -> str:
+        return f"{self.value} ± {self.error} {self.unit}"
+
+    def __str__(self) -> str:
+        return self.__repr__()
+
+    @property
+    def nominal(self) -> QuantityArray:
+        return QuantityArray(self.value, self.unit)
+
+    @property
+    def std(self) -> QuantityArray:
+        return QuantityArray(np.broadcast_to(self.error, self.shape), self.unit)
+
+    @property
+    def relative(self) -> np.ndarray:
+        """
+        Relative uncertainties (standard deviations over absolute values).
+        """
+        return self.error / np.abs(self.value)
+
+    # --- conversions -------------------------------------------------------
+
+    @property
+    def cgs(self) -> "UncertainArray":
+        scale = self.unit.scale
+        return self._new(self.value * scale, self.error * scale, self.unit.cgs)
+
+    def to(
+        self,
+        unit: Union[str, Unit],
+        samples: Optional[int] = None,
+        rng: Any = None,
+    ) -> "UncertainArray":
+        """
+        Converts to `unit`, under the assumption of the array if the dimensions
+        differ (see `oompy.equivalencies`).
+
+        Parameters
+        ----------
+        unit : str
+            target unit
+        samples : int, optional
+            number of Monte Carlo samples (see `propagate`); the uncertainties
+            are propagated to first order if None
+        rng : int or numpy.random.Generator, optional
+            seed or generator of the Monte Carlo samples
+        """
+        if unit == "CGS":
+            return self.cgs
+        target = Unit(unit)
+        if samples is not None:
+            return self.propagate(lambda q: q >> target, samples, rng)
+        if self.unit.dims == target.dims:
+            factor = self.unit.factor_to(target)
+            return self._new(self.value * factor, self.error * factor, target)
+        if self.assumption is None:
+            raise Exception(
+                "Cannot convert between different base types (no assumption)"
+            )
+        from .equivalencies import CompileEquivalency
+
+        func = CompileEquivalency(self.assumption, self.unit, target)
+        value = np.asarray(func(self.value), dtype=float)
+        step = np.maximum(
+            DerivativeStep * self.error,
+            np.sqrt(np.finfo(float).eps) * np.abs(self.value),
+        )
+        with np.errstate(invalid="ignore", divide="ignore"):
+            forward = np.asarray(func(self.value + step), dtype=float)
+            # central differences, one-sided at the edge of the domain
+            try:
+                backward = np.asarray(func(self.value - step), dtype=float)
+            except Exception:
+                backward = np.full(np.shape(forward), np.nan)
+            derivative = np.where(
+                np.isfinite(backward),
+                (forward - backward) / (2 * step),
+                (forward - value) / step,
+            )
+            derivative = np.where(step > 0, derivative, 0.0)
+        return self._new(value, np.abs(derivative) * self.error, target)
+
+    def __rshift__(self, unit: Union[str, Unit, Enum]) -> "UncertainArray":
+        if isinstance(unit, Enum):
+            new = self._new(self.value, self.error, self.unit)
+            new.assumption = unit
+            return new
+        elif isinstance(unit, (Quantity, QuantityArray, UncertainArray)):
+            return self.to(unit.unit)
+        elif isinstance(unit, str):
+            return self.to(unit)
+        raise Exception("Invalid unit")
+
+    def propagate(
+        self, func: Callable, samples: int = 1000, rng: Any = None
+    ) -> "UncertainArray":
+        """
+        Applies `func` (a vectorized function of a `QuantityArray`) and
+        estimates the standard deviations of the result by Monte Carlo
+        sampling (Gaussian, vectorized over the samples and the elements).
+
+        The nominal values of the result are `func` of the nominal values.
+
+        Examples
+        --------
+        >>> z.propagate(lambda q: (q >> "Gpc") ** 2, samples=500, rng=0)
+        """
+        rng = np.random.default_rng(rng)
+        nominal = QuantityArray(func(self._Sampled(self.value)))
+        values = np.ravel(self.value)
+        errors = np.ravel(np.broadcast_to(self.error, self.shape))
+        std = np.empty(values.size)
+        chunk = max(MaxSamples // samples, 1)
+        for start in range(0, values.size, chunk):
+            v, e = values[start : start + chunk], errors[start : start + chunk]
+            drawn = v + e * rng.standard_normal((samples, len(v)))
+            result = QuantityArray(func(self._Sampled(drawn))) >> nominal.unit
+            std[start : start + chunk] = np.std(result.value, axis=0)
+        return self._new(nominal.value, std.reshape(self.shape), nominal.unit)
+
+    def _Sampled(self, values: np.ndarray) -> QuantityArray:
+        q = QuantityArray(values, self.unit)
+        return q if self.assumption is None else q >> self.assumption
+
+    # --- arithmetic --------------------------------------------------------
+
+    def _Add(self, other: Any, sign: float) -> "UncertainArray":
+        try:
+            value, error, unit = _Coerce(other)
+        except TypeError:
+            return NotImplemented
+        if unit is not self.unit:
+            factor = unit.factor_to(self.unit)
+            value = value * factor
+            error = None if error is None else error * factor
+        value = self.value + value if sign > 0 else self.value - value
+        return self._new(value, _Hypot(self.error, error), self.unit)
+
+    def __add__(self, other: Any) -> "UncertainArray":
+        return self._Add(other, 1)
+
+    def __radd__(self, other: Any) -> "UncertainArray":
+        return self._Add(other, 1)
+
+    def __neg__(self) -> "UncertainArray":
+        return self._new(-self.value, self.error, self.unit)
+
+    def __sub__(self, other: Any) -> "UncertainArray":
+        return self._Add(other, -1)
+
+    def __rsub__(self, other: Any) -> "UncertainArray":
+        return -self + other
+
+    def __mul__(self, other: Any) -> "UncertainArray":
+        try:
+            value, error, unit = _Coerce(other)
+        except TypeError:
+            return NotImplemented
+        result = self.value * value
+        errors = self.error * np.abs(value)
+        if error is not None:
+            errors = _Hypot(errors, np.abs(self.value) * error)
+        return self._new(result, errors, self.unit * unit)
+
+    def __rmul__(self, other: Any) -> "UncertainArray":
+        return self * other
+
+    def __truediv__(self, other: Any) -> "UncertainArray":
+        try:
+            value, error, unit = _Coerce(other)
+        except TypeError:
+            return NotImplemented
+        result = self.value / value
+        errors = self.error / np.abs(value)
+        if error is not None:
+            errors = _Hypot(errors, np.abs(result) * error / np.abs(value))
+        return self._new(result, errors, self.unit / unit)
+
+    def __rtruediv__(self, other: Any) -> "UncertainArray":
+        try:
+            value, error, unit = _Coerce(other)
+        except TypeError:
+            return NotImplemented
+        result = value / self.value
+        errors = np.abs(result) * self.error / np.abs(self.value)
+        if error is not None:
+            errors = _Hypot(errors, error / np.abs(self.value))
+        return self._new(result, errors, unit / self.unit)
+
+    def __pow__(self, other: Union[int, float]) -> "UncertainArray":
+        if not isinstance(other, (int, float)):
+            return NotImplemented
+        result = self.value**other
+        # d(x^p)/dx = p x^p / x (0 at x = 0 for p > 1)
+        ratio = np.divide(
+            result, self.value, out=np.zeros(result.shape), where=self.value != 0
+        )
+        errors = np.abs(other * ratio) * self.error
+        return self._new(result, errors, self.unit**other)
@@ -1,8 +1,28 @@
 from enum import Enum
 from fractions import Fraction
-from typing import Union, Dict, Tuple
+from typing import (
+    Any,
+    Union,
+    Dict,
+    Tuple,
+    List,
+    Set,
+    Iterable,
+    Iterator,
+    NamedTuple,
+    Optional,
+)
 
 from .utils import addOrAppend, Stringize, ParseUnit, StripCoeff
+from .cache import (
+    RegistryLock,
+    Caches,
+    Memoize,
+    NormalizeUnit,
+    RegistryDict,
+    OnRegistryChange,
+    OnUnitsChange,
+)
 
 Powers = {
     "y": 1e-24,
@@ -116,62 +136,291 @@ UnitEquivalencies = {
     "arcmin": (0.0002908882086657216, "rad"),
 }
 
-LatexUnitMapping = {
-    "Msun": "M_\\bigodot",
-    "Rsun": "R_\\bigodot",
-    "me": "m_e",
-    "au": "AU",
-    "sec": "s",
-}
+# registries notify the dependent caches whenever they are modified
+Powers = RegistryDict(Powers)
+CGSUnits = RegistryDict(CGSUnits)
+BaseUnits = RegistryDict(BaseUnits)
+UnitEquivalencies = RegistryDict(UnitEquivalencies)
 
+LatexUnitMapping = RegistryDict(
+    {
+        "Msun": "M_\\bigodot",
+        "Rsun": "R_\\bigodot",
+        "me": "m_e",
+        "au": "AU",
+        "sec": "s",
+    }
+)
 
-def ReduceUnitToBase(unit: str = "") -> str:
+
+_Dimensions = {}  # type: Dict[Tuple[Fraction, ...], Tuple[Fraction, ...]]
+
+
+def _InternDims(dims: Tuple["Fraction", ...]) -> Tuple["Fraction", ...]:
+    return _Dimensions.setdefault(dims, dims)
+
+
+def _Pow(x: float, p: "Fraction") -> float:
+    # float ** Fraction, without its overhead
+    return x ** (p.numerator if p.denominator == 1 else float(p))
+
+
+# (dims, coefficient of the reduction to `BaseUnits`, prefix, base types in order)
+Resolved = Tuple[
+    Tuple["Fraction", ...], float, float, Tuple[Tuple[int, "Fraction"], ...]
+]
+
+
+class TableEntry(NamedTuple):
+    dims: Tuple["Fraction", ...]
+    base_scale: float
+    scale: float
+    # `base_scale` is `prefix` times `root`: a unit to the power p contributes
+    # root**p * prefix**p to a reduction (in this order, as it always has)
+    root: float
+    prefix: float
+    # indices in `Type` of the base units the token reduces to, in the order
+    # of the reduction (which gives the order of the CGS unit names)
+    bases: Tuple[Tuple[int, "Fraction"], ...]
+
+
+class UnitTable:
+    """
+    Flat table of every valid unit token, including all the prefixed ones.
+
+    Each token (e.g., "kpc", "MeV", "ug" or "GHz") is mapped to its dimension
+    vector over `Type` and its scale factors to `BaseUnits` and to `CGSUnits`,
+    so reducing a token is a single dictionary lookup. Tokens which can be read
+    in more than one way (e.g., "min" is both minutes and milli-inches) are
+    listed in `ambiguities`; plain units always take precedence over prefixed
+    ones.
+
+    Units can be added (or redefined) later with `Update`, which re-resolves
+    only the affected tokens: the units themselves, their prefixed variants and
+    the tokens defined in terms of them.
+
+    Attributes
+    ----------
+    entries : dict[str, TableEntry]
+        all the valid tokens
+    ambiguities : dict[str, list[tuple[str, str]]]
+        ambiguous tokens and their possible (prefix, unit) readings
+    """
+
+    def __init__(self) -> None:
+        self.entries = {}  # type: Dict[str, TableEntry]
+        self.ambiguities = {}  # type: Dict[str, List[Tuple[str, str]]]
+        self._plain = dict.fromkeys(
+            [u for u in BaseUnits.values() if u != ""] + list(UnitEquivalencies.keys())
+        )  # type: Dict[str, None]
+        self._base = {u: t for t, u in BaseUnits.items() if u != ""}
+        # position of each prefix in `Powers` (the order of the readings)
+        self._order = {p: i for i, p in enumerate(Powers.keys())}
+        self._prefixes = sorted({len(p) for p in Powers.keys()})
+        self._resolving = []  # type: List[str]
+        self._raw = {}  # type: Dict[str, Resolved]
+        # token -> tokens whose resolution used it
+        self._dependents = {}  # type: Dict[str, Set[str]]
+        for u in self._plain:
+            self._Resolve(u)
+        for u in list(self._plain):
+            for p in Powers.keys():
+                self._Resolve(p + u)
+        cgs = {t: self._Scale(CGSUnits[t]) for t in Type if CGSUnits.get(t)}
+        self._cgs = [cgs.get(t, 1.0) for t in Type]
+        # dims -> powers of the CGS scales to divide by
+        self._powers = {}  # type: Dict[Tuple[Fraction, ...], List[float]]
+        for token in self._raw:
+            self.entries[token] = self._Entry(token)
+        for token in self.entries.keys():
+            self._Ambiguity(token)
+
+    def _Scale(self, token: str) -> float:
+        _, root, prefix, _ = self._Resolve(token)
+        return prefix * root
+
+    def _Entry(self, token: str) -> TableEntry:
+        dims, root, prefix, bases = self._raw[token]
+        powers = self._powers.get(dims)
+        if powers is None:
+            powers = [_Pow(c, d) for c, d in zip(self._cgs, dims) if d]
+            self._powers[dims] = powers
+        base_scale = prefix * root
+        scale = base_scale
+        for power in powers:
+            scale /= power
+        return TableEntry(dims, base_scale, scale, root, prefix, bases)
+
+    def _Ambiguity(self, token: str) -> None:
+        readings = self.Readings(token)
+        if len(readings) > 1:
+            self.ambiguities[token] = readings
+        else:
+            self.ambiguities.pop(token, None)
+
+    def Update(self, names: Iterable[str]) -> Set[str]:
+        """
+        Adds (or redefines) the plain units `names`, as currently defined in
+        `UnitEquivalencies`, along with their prefixed variants, and re-resolves
+        the tokens depending on them.
+
+        Returns
+        -------
+        set of str
+            previously valid tokens whose entries have changed
+        """
+        names = list(names)
+        for name in names:
+            if name in self._base or name in CGSUnits.values():
+                raise Exception(f"Cannot redefine the base unit {name}")
+            self._plain.setdefault(name)
+        pending = [p + name for name in names for p in Powers.keys()] + names
+        stale = set()  # type: Set[str]
+        while pending:
+            token = pending.pop()
+            if token not in stale:
+                stale.add(token)
+                pending.extend(self._dependents.get(token, ()))
+        for token in stale:
+            self._raw.pop(token, None)
+        # (all of them are valid: units are only added or redefined)
+        for token in stale:
+            self._Resolve(token)
+        changed = set()
+        for token in stale:
+            previous = self.entries.pop(token, None)
+            if token in self._raw:
+                self.entries[token] = self._Entry(token)
+            if previous is not None and previous != self.entries.get(token):
+                changed.add(token)
+            self._Ambiguity(token)
+        return changed
+
+    def Readings(self, token: str) -> List[Tuple[str, str]]:
+        """
+        All the possible (prefix, unit) readings of a token.
+        """
+        readings = [("", token)] if token in self._plain else []
+        for n in self._prefixes:
+            if token[:n] in Powers and token[n:] in self._plain:
+                readings.append((token[:n], token[n:]))
+        if len(readings) > 2:
+            readings[1:] = sorted(readings[1:], key=lambda r: self._order[r[0]])
+        return readings
+
+    def _Resolve(self, token: str) -> Resolved:
+        if self._resolving:
+            self._dependents.setdefault(token, set()).add(self._resolving[-1])
+        if token in self._raw:
+            return self._raw[token]
+        if token in self._resolving:
+            raise Exception(f"Circular unit definition: {token}")
+        self._resolving.append(token)
+        resolved: Resolved
+        if token in self._base:
+            index = list(Type).index(self._base[token])
+            dims = [Fraction(0)] * len(Type)
+            dims[index] = Fraction(1)
+            resolved = (_InternDims(tuple(dims)), 1.0, 1.0, ((index, Fraction(1)),))
+        elif token in UnitEquivalencies:
+            eq_c, eq_u = UnitEquivalencies[token]
+            dims_eq, root, bases = self._Combine(eq_u, eq_c)
+            resolved = (dims_eq, root, 1.0, bases)
+        else:
+            readings = [r for r in self.Readings(token) if r[0] != ""]
+            if not readings:
+                self._resolving.pop()
+                raise Exception(f"Invalid unit: {token}")
+            p, u = readings[0]
+            dims_u, root, _, bases = self._Resolve(u)
+            resolved = (dims_u, root, Powers[p], bases)
+        self._resolving.pop()
+        self._raw[token] = resolved
+        return resolved
+
+    def _Combine(
+        self, unit: str, coeff: float = 1.0
+    ) -> Tuple[Tuple["Fraction", ...], float, Tuple[Tuple[int, "Fraction"], ...]]:
+        c, factorized = ParseUnit(unit)
+        coeff *= c
+        dims = [Fraction(0)] * len(Type)
+        bases = {}  # type: Dict[int, Fraction]
+        for u, p in factorized.items():
+            if u == "" or p == 0:
+                continue
+            dims_u, root, prefix, bases_u = self._Resolve(u)
+            for i, d in enumerate(dims_u):
+                if d:
+                    dims[i] += p * d
+            coeff *= _Pow(root, p) * _Pow(prefix, p)
+            for i, d in bases_u:
+                addOrAppend(bases, i, p * d)
+        ordered = tuple((i, d) for i, d in bases.items() if d != 0)
+        return _InternDims(tuple(dims)), coeff, ordered
+
+    def __contains__(self, token: str) -> bool:
+        return token in self.entries
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.entries)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __getitem__(self, token: str) -> TableEntry:
+        try:
+            return self.entries[token]
+        except KeyError:
+            raise Exception(f"Invalid unit: {token}")
+
+
+_Table = None  # type: Optional[UnitTable]
+
+
+def GetUnitTable() -> UnitTable:
+    """
+    Returns the table of all valid unit tokens (built on first use).
+    """
+    global _Table
+    table = _Table
+    if table is None:
+        with RegistryLock:
+            if _Table is None:
+                _Table = UnitTable()
+            table = _Table
+    return table
+
+
+def _ResetUnitTable() -> None:
+    global _Table
+    _Table = None
+
+
+def _Reduce(unit: str) -> Tuple[float, Tuple["Fraction", ...]]:
+    table = GetUnitTable()
     coeff, factorized = ParseUnit(unit)
-    newunits = {}  # type: dict[str, Fraction]
+    dims = [Fraction(0)] * len(Type)
     for u, p in factorized.items():
-        if u in BaseUnits.values():
-            addOrAppend(newunits, u, p)
-        elif u in UnitEquivalencies.keys():
-            eq_c, eq_u = UnitEquivalencies[u]
-            eq_str = Stringize((eq_c, eq_u))
-            eq_base = ReduceUnitToBase(eq_str)
-            nc, nu = ParseUnit(eq_base)
-            for u2, p2 in nu.items():
-                addOrAppend(newunits, u2, p * p2)
-            coeff *= nc**p
-        elif u[1:] in BaseUnits.values() and u[0] in Powers.keys() and u[1:] != "":
-            addOrAppend(newunits, u[1:], p)
-            coeff *= Powers[u[0]] ** p
-        elif (
-            u[1:] in UnitEquivalencies.keys() and u[0] in Powers.keys() and u[1:] != ""
-        ):
-            eq_c, eq_u = UnitEquivalencies[u[1:]]
-            eq_str = Stringize((eq_c, eq_u))
-            eq_base = ReduceUnitToBase(eq_str)
-            nc, nu = ParseUnit(eq_base)
-            for u2, p2 in nu.items():
-                addOrAppend(newunits, u2, p * p2)
-            coeff *= nc**p * Powers[u[0]] ** p
-        else:
-            raise Exception(f"Invalid unit: {u}")
-    return Stringize((coeff, newunits))
+        if u == "" or p == 0:
+            continue
+        entry = table[u]
+        for i, d in enumerate(entry.dims):
+            dims[i] += p * d
+        coeff *= _Pow(entry.root, p) * _Pow(entry.prefix, p)
+    return coeff, tuple(dims)
+
+
+@Memoize("reduce", key=NormalizeUnit)
+def ReduceUnitToBase(unit: str = "") -> str:
+    coeff, dims = _Reduce(unit)
+    return Stringize((coeff, {BaseUnits[t]: p for t, p in zip(Type, dims) if p != 0}))
 
 
+@Memoize("base_type", key=NormalizeUnit, copy=dict)
 def GetBaseType(unit: str = "") -> Dict["Type", "Fraction"]:
-    _, factorized = ParseUnit(ReduceUnitToBase(unit))
-    newf = {}
-    for f in factorized.keys():
-        for k, v in BaseUnits.items():
-            if f == v:
-                newf[k] = factorized[f]
-                break
-    assert len(newf) == len(factorized), "Wrong base type inferrence"
-    if len(newf) > 1:
-        for f2 in newf.keys():
-            if f2 == Type.DIMENSIONLESS:
-                newf.pop(f2)
-                break
-    return newf
+    _, dims = _Reduce(unit)
+    newf = {t: p for t, p in zip(Type, dims) if p != 0}
+    return newf if newf else {Type.DIMENSIONLESS: Fraction(0)}
 
 
 def RaiseUnitsToPower(unit: str, pwr: Union[int, float, Fraction]) -> str:
@@ -183,12 +432,234 @@ def RaiseUnitsToPower(unit: str, pwr: Union[int, float, Fraction]) -> str:
 
 
 def ConvertUnit(src: str, dst: str) -> Tuple[float, str]:
+    coeff, src_u = StripCoeff(src)
+    factor, dst_u = _ConversionFactor(src_u, dst)
+    return coeff * factor, dst_u
+
+
+@Memoize("convert", key=lambda src, dst: (NormalizeUnit(src), NormalizeUnit(dst)))
+def _ConversionFactor(src: str, dst: str) -> Tuple[float, str]:
     assert GetBaseType(src) == GetBaseType(
         dst
     ), "Cannot convert between different base types"
     _, dst_u = StripCoeff(dst)
-    red_src = ReduceUnitToBase(src)
-    red_dst = ReduceUnitToBase(dst)
-    c1, _ = StripCoeff(red_src)
-    c2, _ = StripCoeff(red_dst)
+    c1, _ = _Reduce(src)
+    c2, _ = _Reduce(dst)
     return c1 / c2, dst_u
+
+
+class Unit(str):
+    """
+    Compiled physical unit.
+
+    A `Unit` is the (normalized) unit string itself, so it prints, compares and
+    hashes exactly like one. On top of that it carries its dimension vector over
+    `Type` and its scale factors, which are computed once when the unit is first
+    seen. Instances are interned: the same unit string always maps to the same
+    object, and products/powers of units are memoized.
+
+    Attributes
+    ----------
+    factors : dict[str, Fraction]
+        named unit tokens and their powers (e.g., {"m": 1, "sec": -1})
+    dims : tuple[Fraction, ...]
+        exponents of the base dimensions, indexed by `Type`
+    scale : float
+        multiplicative factor to the corresponding CGS unit
+    base_scale : float
+        multiplicative factor to the corresponding `BaseUnits` combination
+    steps : tuple[float, ...]
+        the factors whose product is `base_scale`, one per unit token (see
+        `convert`)
+    order : tuple[Type, ...]
+        the base dimensions in the order they appear in the reduction of the
+        unit (the order of the names of `cgs` and of `base_type`)
+    """
+
+    factors: Dict[str, "Fraction"]
+    dims: Tuple["Fraction", ...]
+    scale: float
+    base_scale: float
+    steps: Tuple[float, ...]
+    order: Tuple["Type", ...]
+
+    _interned = {}  # type: Dict[str, Unit]
+    _products = {}  # type: Dict[Tuple[Unit, Unit], Unit]
+    _powers = {}  # type: Dict[Tuple[Unit, Fraction], Unit]
+
+    def __new__(cls, unit: str = "") -> "Unit":
+        if isinstance(unit, Unit):
+            return unit
+        try:
+            return cls._interned[unit]
+        except KeyError:
+            pass
+        coeff, factorized = ParseUnit(unit)
+        if coeff != 1:
+            raise Exception(f"Unit cannot contain a coefficient: {unit}")
+        new = cls._FromFactors(factorized)
+        # (setdefault: threads creating the same unit get the same object)
+        return cls._interned.setdefault(unit, new)
+
+    @classmethod
+    def _FromFactors(cls, factors: Dict[str, "Fraction"]) -> "Unit":
+        factors = {u: p for u, p in factors.items() if p != 0 and u != ""}
+        name = Stringize(factors)
+        if name in cls._interned:
+            return cls._interned[name]
+        table = GetUnitTable()
+        dims = [Fraction(0)] * len(Type)
+        base_scale, scale = 1.0, 1.0
+        steps = []  # type: List[float]
+        bases = {}  # type: Dict[int, Fraction]
+        for u, p in factors.items():
+            entry = table[u]
+            for i, d in enumerate(entry.dims):
+                dims[i] += p * d
+            step = _Pow(entry.root, p) * _Pow(entry.prefix, p)
+            if step != 1.0:
+                steps.append(step)
+            base_scale *= step
+            scale *= entry.scale**p
+            for i, d in entry.bases:
+                addOrAppend(bases, i, p * d)
+        types = list(Type)
+        new = str.__new__(cls, name)
+        new.factors = factors
+        new.dims = _InternDims(tuple(dims))
+        new.base_scale = float(base_scale)
+        new.scale = float(scale)
+        new.steps = tuple(steps)
+        new.order = tuple(types[i] for i, d in bases.items() if d != 0)
+        return cls._interned.setdefault(name, new)
+
+    @classmethod
+    def _ClearTables(cls) -> None:
+        for table in (cls._interned, cls._products, cls._powers):
+            table.clear()
+
+    @classmethod
+    def _Forget(cls, tokens: Set[str]) -> None:
+        # drops the interned units (and products/powers) involving `tokens`
+        for name, unit in list(cls._interned.items()):
+            if not tokens.isdisjoint(unit.factors):
+                cls._interned.pop(name, None)
+        for a, b in list(cls._products):
+            if not (tokens.isdisjoint(a.factors) and tokens.isdisjoint(b.factors)):
+                cls._products.pop((a, b), None)
+        for unit, pwr in list(cls._powers):
+            if not tokens.isdisjoint(unit.factors):
+                cls._powers.pop((unit, pwr), None)
+
+    def __reduce__(self):
+        return (Unit, (str(self),))
+
+    def __repr__(self) -> str:
+        return f"Unit({str.__repr__(self)})"
+
+    def __str__(self) -> str:
+        return str.__str__(self)
+
+    def __mul__(self, other: "Unit") -> "Unit":  # type: ignore[override]
+        if not isinstance(other, Unit):
+            return NotImplemented
+        key = (self, other)
+        try:
+            return Unit._products[key]
+        except KeyError:
+            pass
+        factors = dict(self.factors)
+        for u, p in other.factors.items():
+            addOrAppend(factors, u, p)
+        return Unit._products.setdefault(key, Unit._FromFactors(factors))
+
+    def __rmul__(self, other):  # type: ignore[override]
+        return NotImplemented
+
+    def __pow__(self, pwr: Union[int, float, "Fraction"]) -> "Unit":
+        pwr = Fraction(pwr).limit_denominator(1000000)
+        key = (self, pwr)
+        try:
+            return Unit._powers[key]
+        except KeyError:
+            pass
+        new = Unit._FromFactors({u: p * pwr for u, p in self.factors.items()})
+        return Unit._powers.setdefault(key, new)
+
+    def __truediv__(self, other: "Unit") -> "Unit":
+        if not isinstance(other, Unit):
+            return NotImplemented
+        return self * other ** (-1)
+
+    @property
+    def dimensionless(self) -> bool:
+        return not any(self.dims)
+
+    @property
+    def base_type(self) -> Dict["Type", "Fraction"]:
+        """
+        Dimension of the unit in the format of `GetBaseType`.
+        """
+        dims = self.dims
+        newf = {t: dims[t.value] for t in self.order}
+        return newf if newf else {Type.DIMENSIONLESS: Fraction(0)}
+
+    @property
+    def cgs(self) -> "Unit":
+        try:
+            return self.__dict__["_cgs"]
+        except KeyError:
+            dims = self.dims
+            cgs = Unit._FromFactors({CGSUnits[t]: dims[t.value] for t in self.order})
+            self.__dict__["_cgs"] = cgs
+            return cgs
+
+    def convert(self, value: float, other: "Unit") -> float:
+        """
+        Converts a value in `self` to `other` (which must have the same
+        dimensions).
+
+        Unlike multiplying by `factor_to`, the value is scaled by the factor of
+        each unit token in turn and then divided by the scale of `other`, so
+        that conversions of single values are bit-for-bit those of the string
+        based reduction.
+        """
+        if self.dims != other.dims:
+            raise Exception("Cannot convert between different base types")
+        for step in self.steps:
+            value *= step
+        return value / other.base_scale
+
+    def factor_to(self, other: "Unit") -> float:
+        """
+        Multiplicative factor converting values in `self` to values in `other`.
+        """
+        if self.dims != other.dims:
+            raise Exception("Cannot convert between different base types")
+        return self.base_scale / other.base_scale
+
+
+def _Mentions(key: Any, tokens: Set[str]) -> bool:
+    # whether a cache key refers to any of the unit tokens
+    if isinstance(key, Unit):
+        return not tokens.isdisjoint(key.factors)
+    elif isinstance(key, str):
+        try:
+            return not tokens.isdisjoint(ParseUnit(key)[1])
+        except Exception:
+            return True
+    elif isinstance(key, tuple):
+        return any(_Mentions(k, tokens) for k in key)
+    return False
+
+
+def _ForgetUnits(tokens: Set[str]) -> None:
+    Unit._Forget(tokens)
+    for name, cache in Caches.items():
+        # (parsing does not depend on the definitions)
+        if name != "parse":
+            cache.discard(lambda key: _Mentions(key, tokens))
+
+
+OnRegistryChange.extend([_ResetUnitTable, Unit._ClearTables])
+OnUnitsChange.append(_ForgetUnits)
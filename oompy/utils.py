@@ -1,5 +1,8 @@
+import re
 from fractions import Fraction
-from typing import Union, Dict, Tuple
+from typing import Union, Dict, List, Tuple
+
+from .cache import Memoize
 
 
 def addOrAppend(dct, ky, vl):
@@ -8,15 +11,27 @@ def addOrAppend(dct, ky, vl):
     )
 
 
+# a number as accepted by `float` (including inf, nan and "_"-grouped digits)
+_DIGITS = r"\d(?:_?\d)*"
+NUMBER = (
+    rf"[+-]?(?:(?:{_DIGITS}(?:\.(?:{_DIGITS})?)?|\.{_DIGITS})(?:[eE][+-]?{_DIGITS})?"
+    r"|(?i:inf(?:inity)?|nan))"
+)
+
+# a leading coefficient, followed by the unit (or by nothing: dimensionless)
+_COEFF = re.compile(rf"\s*({NUMBER})(?:\s*\*\s*(?=\S)|\s+(?=\S)|\s*$)")
+
+
 def StripCoeff(unit_str: str) -> Tuple[float, str]:
-    coeff = 1.0
-    if len(unit_str.split(" ")) > 1:
-        try:
-            coeff = float(unit_str.split(" ")[0])
-            unit_str = " ".join(unit_str.split(" ")[1:])
-        except:
-            pass
-    return coeff, unit_str
+    """
+    Splits a leading numerical coefficient from a unit string, e.g., "1e3 m"
+    (a lone number, e.g., "5", has an empty unit).
+    """
+    unit_str = unit_str.rstrip()
+    match = _COEFF.match(unit_str)
+    if match is None:
+        return 1.0, unit_str
+    return float(match.group(1)), unit_str[match.end() :]
 
 
 def ParseFraction(frac: str) -> "Fraction":
@@ -26,16 +41,134 @@ def ParseFraction(frac: str) -> "Fraction":
     )
 
 
+# numbers, names, operators (anything else is a single invalid token)
+_TOKENS = re.compile(
+    r"(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?|[A-Za-z_][A-Za-z0-9_]*|\*\*|\S"
+)
+
+# exponents are kept as ints while parsing (Fraction arithmetic is slow)
+_Power = Union[int, Fraction]
+
+
+def _IsName(token: str) -> bool:
+    return token[:1].isalpha() or token[:1] == "_"
+
+
+def _IsNumber(token: str) -> bool:
+    return token[:1].isdigit() or token[:1] == "."
+
+
+class _UnitParser:
+    """
+    Single-pass recursive-descent parser of unit strings.
+
+    Grammar (juxtaposition, i.e., whitespace, means multiplication; `*` and `/`
+    are applied from left to right):
+
+        product  := factor { ["*" | "/"] factor }
+        factor   := atom [ ("^" | "**") exponent ]
+        atom     := NAME | NUMBER | "(" product ")"
+        exponent := ["+" | "-"] NUMBER ["/" INTEGER] | "(" exponent ")"
+    """
+
+    def __init__(self, unit_str: str) -> None:
+        self.unit_str = unit_str
+        self.tokens = _TOKENS.findall(unit_str) + [""]  # type: List[str]
+        self.i = 0
+
+    def Error(self) -> Exception:
+        return Exception(f"Invalid unit: {self.unit_str}")
+
+    def Next(self) -> str:
+        token = self.tokens[self.i]
+        if not token:
+            raise self.Error()
+        self.i += 1
+        return token
+
+    def Parse(self) -> Tuple[float, Dict[str, "Fraction"]]:
+        coeff, factors = 1.0, {}  # type: float, Dict[str, _Power]
+        if self.tokens[0]:
+            coeff = self.Product(factors, 1)
+        if self.tokens[self.i]:
+            raise self.Error()
+        return coeff, {u: Fraction(p) for u, p in factors.items()}
+
+    def Product(self, factors: Dict[str, _Power], power: _Power) -> float:
+        coeff = self.Factor(factors, power)
+        while True:
+            token = self.tokens[self.i]
+            if token == "*" or token == "/":
+                self.i += 1
+                coeff *= self.Factor(factors, power if token == "*" else -power)
+            elif token == "(" or _IsName(token) or _IsNumber(token):
+                coeff *= self.Factor(factors, power)
+            else:
+                return coeff
+
+    def Factor(self, factors: Dict[str, _Power], power: _Power) -> float:
+        token = self.Next()
+        if token == "(":
+            group = {}  # type: Dict[str, _Power]
+            coeff = self.Product(group, 1)
+            if self.Next() != ")":
+                raise self.Error()
+            power = power * self.Exponent()
+            for u, p in group.items():
+                factors[u] = factors.get(u, 0) + p * power
+            return coeff ** float(power)
+        power = power * self.Exponent()
+        if _IsName(token):
+            factors[token] = factors.get(token, 0) + power
+            return 1.0
+        elif _IsNumber(token):
+            return float(token) ** float(power)
+        raise self.Error()
+
+    def Exponent(self) -> _Power:
+        token = self.tokens[self.i]
+        if token != "^" and token != "**":
+            return 1
+        self.i += 1
+        return self.Power()
+
+    def Power(self) -> _Power:
+        token = self.Next()
+        if token == "(":
+            grouped = self.Power()
+            if self.Next() != ")":
+                raise self.Error()
+            return grouped
+        sign = 1
+        if token == "+" or token == "-":
+            sign = -1 if token == "-" else 1
+            token = self.Next()
+        if not _IsNumber(token):
+            raise self.Error()
+        power = int(token) if token.isdigit() else Fraction(token)  # type: _Power
+        # "m^1/2" is m^(1/2) (a "/" directly followed by an integer)
+        if self.tokens[self.i] == "/" and self.tokens[self.i + 1].isdigit():
+            power = Fraction(power, int(self.tokens[self.i + 1]))
+            self.i += 2
+        return sign * power
+
+
+@Memoize("parse", key=lambda unit_str: unit_str, copy=lambda r: (r[0], dict(r[1])))
 def ParseUnit(unit_str: str) -> Tuple[float, Dict[str, "Fraction"]]:
-    coeff, unit_str = StripCoeff(unit_str)
-    unit_dict = {}  # type: dict[str, Fraction]
-    for u in unit_str.split(" "):
-        pwr = (
-            ParseFraction(u.split("^")[1]) if len(u.split("^")) > 1 else Fraction(1, 1)
-        )
-        unit = u.split("^")[0]
-        addOrAppend(unit_dict, unit, pwr if unit != "" else Fraction(0, 1))
-    return coeff, unit_dict
+    """
+    Parses a unit string into a numerical coefficient and the powers of the unit
+    tokens (in the order of their first appearance).
+
+    Besides the space-separated form ("erg sec^-1 cm^-2"), `*`, `/`, parentheses,
+    `**` and decimal/fractional exponents are understood (e.g., "kg*m/sec^2",
+    "(erg/sec)/cm^2", "cm^-1.5", "m^1/2"). Results are cached.
+
+    Examples
+    --------
+    >>> ParseUnit("1e3 kg*m/sec**2")
+    (1000.0, {'kg': Fraction(1, 1), 'm': Fraction(1, 1), 'sec': Fraction(-2, 1)})
+    """
+    return _UnitParser(unit_str).Parse()
 
 
 def Stringize(fct: Union[Dict, Tuple]) -> str: